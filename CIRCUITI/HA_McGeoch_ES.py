@@ -49,7 +49,10 @@ print("--------------------------")
 print("Rappresentazione QUBO:\n", bqm)
 
 # "Campionamento" esaustivo spazio degli stati
-from dimod import ExactSolver
-ES = ExactSolver()
+from gray_exact import GrayCodeExactSolver
+
+NUM_STATES = None  # tutti i 2^n stati, come ExactSolver; k per i soli k di energia minima
+
+ES = GrayCodeExactSolver()
 print("--------------------------")
-print("Visita BF spazio stati:\n", ES.sample(bqm))
+print("Visita BF spazio stati:\n", ES.sample(bqm, num_states=NUM_STATES))
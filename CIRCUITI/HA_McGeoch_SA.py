@@ -94,3 +94,27 @@ while (not found):
                                              # campioni generati
 
 print("{}+{} = (s:{}, c:{}) con {} tentativi".format(str(a),str(b),str(bit_sum[0]["s"]),str(bit_sum[0]["c"]),str(num_iter)))
+
+####################################################################
+# Preprocessing con le persistenze
+# --------------------------------
+# Fissati gli ingressi a, b nel BQM, i valori ottimi di s e c sono
+# determinati: PersistencyComposite (QUBO_TOOLS/persistency.py) li
+# ricava con la dualità del tetto (roof duality) e con regole di
+# dominanza, e passa al campionatore solo il BQM delle variabili
+# rimaste libere. Qui non ne resta nessuna: SA non viene neanche
+# chiamato e la risposta arriva al primo tentativo.
+# info['reduction_ratio'] è la frazione di variabili fissate.
+####################################################################
+from persistency import PersistencyComposite
+
+print("-----------------------------")
+bqm_ab = bqm.copy()
+bqm_ab.fix_variables({'a': a, 'b': b})
+
+PC = PersistencyComposite(SA)
+sampleset_PC = PC.sample(bqm_ab, num_reads=num_reads_count)
+print(sampleset_PC)
+print("Variabili fissate:", sampleset_PC.info['fixed_variables'])
+print("Frazione di variabili fissate:", sampleset_PC.info['reduction_ratio'])
+print("{}+{} = (s:{}, c:{})".format(a, b, sampleset_PC.first.sample['s'], sampleset_PC.first.sample['c']))
@@ -5,7 +5,15 @@ import os
 import itertools
 import click
 import pandas as pd
-from dwave.system import LeapHybridCQMSampler
+
+# Con LOCALE = True il CQM viene risolto da LocalHybridCQMSampler
+# (QUBO_TOOLS/local_hybrid.py), che ha la stessa interfaccia di
+# LeapHybridCQMSampler ma gira senza connessione al cloud D-Wave.
+LOCALE = True
+if LOCALE:
+    from local_hybrid import LocalHybridCQMSampler as LeapHybridCQMSampler
+else:
+    from dwave.system import LeapHybridCQMSampler
 from dimod import ConstrainedQuadraticModel, BinaryQuadraticModel, QuadraticModel
 
 def parse_inputs(data_file, capacity):
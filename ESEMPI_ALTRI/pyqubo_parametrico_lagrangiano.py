@@ -45,14 +45,25 @@ for l in range(5,6,1):
 import neal
 sa = neal.SimulatedAnnealingSampler()
 sampleset = sa.sample(qubo, num_reads=10)
-decoded_samples = qubo_implicit.decode_sampleset(sampleset)
+# decode_sampleset è applicato a qubo_implicit che non è completamente
+# determinato: esso contiene il lagrangiano L. Senza feed_dict il processo
+# termina con "the value of L is not provided in feed_dict"; il valore di L
+# va quindi fornito anche in decodifica.
+decoded_samples = qubo_implicit.decode_sampleset(sampleset, feed_dict={'L': l})
 best_sample = min(decoded_samples, key=lambda x: x.energy)
 print(best_sample.sample)
-# Secondo me, dà segmentation fault perché decoded_samples
-# è applicato a qubo_implicit che non è completamente determinato:
-# esso contiene il lagrangiano L con valore ignoto.
 # Questo tentativo è stato giustificato dalla curiosità di
 # "automatizzare" la verifica che non ci siano false risposte,
 # cioè risposte che assicurano il valore minimo per l'intero
 # modello, costituito da Hamiltino obiettivo ed Hamiltoniano
-# penalty.
\ No newline at end of file
+# penalty.
+
+### Verifica automatica al variare di L
+# =====================================
+print("### Verifica automatica al variare di L")
+# Lo stesso controllo del ciclo precedente, per più valori di L: con L = 0.5
+# lo stato a = b = 0 (obiettivo 0, penalità 1) vale meno della risposta b = 1.
+from lagrange_sweep import LagrangeSweep, format_results
+
+sweep = LagrangeSweep.from_model(qubo_implicit)
+print(format_results(sweep.run([0.5, 1, 2, 3, 5], num_reads=10)))
\ No newline at end of file
@@ -115,16 +115,26 @@ print(" -- lista dei sample che non soddisfano il constraint:", \
 # si può usare:
 #feasible_sampleset = sampleset.filter(lambda d: d.is_feasible)
 
+print("-----------------------------")
+# Verifica vettoriale del vincolo (QUBO_TOOLS/constraint_masks.py).
+# Le liste precedenti decodificano un campione alla volta con pyqubo;
+# con migliaia di campioni conviene tradurre una volta sola il polinomio
+# del vincolo in matrici e valutarlo su tutto il sampleset.
+from constraint_masks import ConstraintMatrix
+
+vincoli = ConstraintMatrix.from_expressions({'a + b = 1': ham_penalita})
+print(" -- matrice campioni x vincoli (True se il vincolo è soddisfatto):\n", vincoli.feasibility(sampleset))
+
 print("-----------------------------")
 # Energia minima dei sample che soddisfano il constraint.
-best_energy = min([s.energy for s in decoded_sampleset if (s.constraints().get('a + b = 1')[0]) ])
+best_energy = vincoli.best_feasible_energy(sampleset)
 print("Energia minima dei sample che soddisfano il constraint: ", best_energy)
 # Un'alternativa è usare 
 # print(sampleset.first.energy) per avere l'ergia del sample con energia minima.
 
 print("-----------------------------")
 # Lista con tutte risposte, cioè soluzioni con energia minima che soddisfano i vincoli
-answers = [s.sample for s in decoded_sampleset if (s.energy == best_energy) and (s.constraints().get('a + b = 1')[0])]
+answers = [{v: int(x) for v, x in s.items()} for s in vincoli.optimal_feasible(sampleset).samples()]
 print("Tutte e sole le risposte con energia minima {} sono {}.".format(best_energy,answers))
 
 ####################################################
@@ -61,4 +61,31 @@ print("Sampleset:\n",sampleset_SA)
 #              5
 #
 # Il numero di archi a "cavallo del taglio" corrisponde 
-# all'energia calcolata.
\ No newline at end of file
+# all'energia calcolata.
+####################################################################
+# Lo stesso modello come QUBO sparso, costruito dalla lista degli archi
+####################################################################
+# Per grafi con 10^5-10^6 archi conviene non passare da pyqubo:
+# SparseQUBO costruisce il QUBO direttamente dagli archi e calcola
+# le energie di tutti i campioni con un solo prodotto matrice sparsa.
+import numpy as np
+from sparse_qubo import SparseQUBO, max_cut
+
+# Vertici 1..5 del grafo numerati 0..4.
+edges = np.array([(0, 1), (0, 2), (1, 3), (2, 3), (2, 4), (3, 4)])
+mc = max_cut(5, edges)
+
+# Le etichette di pyqubo non coincidono con gli indici 0..4:
+# si riordinano le colonne dei campioni secondo 'x1', ..., 'x5'.
+mc_labels = SparseQUBO(mc.linear, mc.quadratic, mc.offset, ('x1', 'x2', 'x3', 'x4', 'x5'))
+X = mc_labels.sample_matrix(sampleset_SA)
+print("Energie SparseQUBO:", mc_labels.energies(X))
+print("Energie dimod     :", sampleset_SA.record.energy)
+
+print("-----------------------------")
+# Un grafo casuale con 10^4 vertici e 10^5 archi.
+rng = np.random.default_rng(0)
+n_big = 10_000
+big = max_cut(n_big, rng.integers(0, n_big, (100_000, 2)))
+sampleset_big = SA.sample(big.to_bqm(), num_reads=4, num_sweeps=100)
+print("Tagli trovati:", -big.energies(big.sample_matrix(sampleset_big)))
@@ -31,13 +31,15 @@ print(" -- bqm (--->> OFFSET):\n", bqm.offset)                       # scostamen
 ####################################################################
 # Campionamento esaustivo
 ####################################################################
-from dimod import ExactSolver
+from gray_exact import GrayCodeExactSolver
+
+NUM_STATES = None  # tutti gli 8 tagli; con k = 2 restano solo i due tagli massimi
 
 print("-----------------------------")
 # Istanza del campionatore scelto
-ES = ExactSolver()
+ES = GrayCodeExactSolver()
 
 print("-----------------------------")
 # Campionatura sul BQM.
-sampleset = ES.sample(bqm)
+sampleset = ES.sample(bqm, num_states=NUM_STATES)
 print("Sampleset:\n",sampleset)
\ No newline at end of file
@@ -29,18 +29,28 @@
 #   the Binary Quadratic Model (BQM) data structure and the standard SampleSet
 #   returned by Ocean samplers.
 #
-#   dimod.ExactSolver is also part of Ocean. It is not a quantum sampler and it
-#   does not use a D-Wave QPU. It enumerates all binary assignments, so it is a
-#   transparent reference sampler for small examples and for checking the QUBO
-#   construction before using heuristic samplers or hardware samplers.
+#   GrayCodeExactSolver, from QUBO_TOOLS/gray_exact.py, takes the role of
+#   dimod.ExactSolver. It is not a quantum sampler and it does not use a D-Wave
+#   QPU. It enumerates all binary assignments, so it is a transparent reference
+#   sampler for small examples and for checking the QUBO construction before
+#   using heuristic samplers or hardware samplers. Unlike dimod.ExactSolver it
+#   walks the assignments in Gray-code order and keeps only the ones requested:
+#   all of them with NUM_STATES = None, the k lowest-energy ones with
+#   NUM_STATES = k, which keeps longer sequences within reach.
 ################################################################################
 
-from dimod import ExactSolver
 from pyqubo import Binary
 
+from gray_exact import GrayCodeExactSolver
+from population_annealing import PopulationAnnealingSampler
+
+
+# Number of lowest-energy states returned by the sampler; None returns all 2^n.
+NUM_STATES = None
+
 
 print('## "Number Partitioning" / "Subsets with Identical Sum"')
-print('## Exact exhaustive sampling through dimod.ExactSolver\n')
+print('## Exact exhaustive sampling through GrayCodeExactSolver\n')
 
 
 ################################################################################
@@ -116,10 +126,10 @@ def print_sampleset(sampleset):
 
     A SampleSet is the standard Ocean container for sampler output. It stores the
     sampled binary assignments, their energies, and how many times each sample
-    was observed. ExactSolver returns every possible assignment once.
+    was observed. GrayCodeExactSolver returns every requested assignment once.
     """
 
-    print('Sampleset returned by dimod.ExactSolver:')
+    print('Sampleset returned by GrayCodeExactSolver:')
     print(sampleset)
 
 
@@ -167,6 +177,24 @@ def print_ground_states(sampleset):
         print('Interpretation: no binary assignment makes H equal to 0.')
 
 
+def print_degeneracy_estimate(bqm, sampleset):
+    """Compare the exact number of ground states with population annealing.
+
+    The exhaustive table gives the degeneracy by counting its lowest rows.
+    PopulationAnnealingSampler estimates it without any table: at the last,
+    coldest temperature, the fraction rho_0 of its population in the lowest
+    energy E_0 estimates g e^(-beta E_0) / Z, and the sampler tracks ln Z
+    along the schedule, so g = rho_0 Z e^(beta E_0).
+    """
+
+    exact_count = len(sampleset.lowest())
+    annealed = PopulationAnnealingSampler().sample(bqm, seed=0)
+    print(f'Ground states counted in the exhaustive table: {exact_count}')
+    print(f'Population annealing: E_0 = {annealed.info["ground_energy"]}, '
+          f'estimated degeneracy = {annealed.info["ground_degeneracy"]:.2f}, '
+          f'distinct ground states in the population = {annealed.info["distinct_ground_states"]}')
+
+
 def run_instance(title, values):
     """Build, compile, sample, and decode one Number Partitioning instance."""
 
@@ -205,21 +233,21 @@ def run_instance(title, values):
     print_bqm_components(bqm)
 
     ###########################################################################
-    # Step 4. Sample the BQM with dimod.ExactSolver.
+    # Step 4. Sample the BQM with GrayCodeExactSolver.
     #
-    # ExactSolver performs a brute-force enumeration of all 2^5 assignments. It
+    # The sampler performs a brute-force enumeration of all 2^5 assignments. It
     # is used here because the examples are intentionally small and because it
     # makes the relationship between the QUBO and its solutions completely
     # explicit. This sampler is deterministic and local: it does not require a
     # D-Wave API token, Leap access, or QPU time.
     ###########################################################################
-    sampler = ExactSolver()
+    sampler = GrayCodeExactSolver()
     print('\n--- Ocean sampler information ---')
-    print('Sampler class: dimod.ExactSolver')
+    print('Sampler class: GrayCodeExactSolver (QUBO_TOOLS/gray_exact.py)')
     print('Sampler parameters:')
     print(sampler.parameters)
 
-    sampleset = sampler.sample(bqm)
+    sampleset = sampler.sample(bqm, num_states=NUM_STATES)
     print('\n--- Raw Ocean SampleSet ---')
     print_sampleset(sampleset)
 
@@ -236,6 +264,16 @@ def run_instance(title, values):
     print('\n--- Ground-state interpretation ---')
     print_ground_states(sampleset)
 
+    ###########################################################################
+    # Step 6. Estimate the number of ground states without enumeration.
+    #
+    # For longer sequences the exhaustive table is out of reach, but the
+    # number of exact partitions can still be estimated by population
+    # annealing, from the free energy it accumulates while cooling.
+    ###########################################################################
+    print('\n--- Ground-state degeneracy ---')
+    print_degeneracy_estimate(bqm, sampleset)
+
 
 ################################################################################
 # First instance from SiSi2Qubo.tex.
@@ -17,6 +17,12 @@
 #   python SiSi_SiAnn.py 1 3 4 2 6
 #   python SiSi_SiAnn.py 1 1 1 1 1 --profile classroom
 #   python SiSi_SiAnn.py 12 -3 7 4 2 --profile aggressive --seed 123
+#   python SiSi_SiAnn.py 12 -3 7 4 2 --backend rank_one
+#   python SiSi_SiAnn.py 12 -3 7 4 2 --workers 4 --seed 123
+#
+# Batch use, many instances per process start (see sisi_batch.py):
+#   python SiSi_SiAnn.py --batch instances.jsonl --jobs 4
+#   cat instances.csv | python SiSi_SiAnn.py --batch - --profile classroom
 #
 # This double entry point is useful in two settings:
 #   - from an IDE, Spyder, PyCharm, VS Code, or another editor that already uses
@@ -37,7 +43,8 @@ import sys
 from typing import Optional, Sequence
 
 
-PROFILES = ('classroom', 'balanced', 'aggressive')
+PROFILES = ('classroom', 'balanced', 'aggressive', 'adaptive')
+BACKENDS = ('neal', 'rank_one')
 
 
 ################################################################################
@@ -52,8 +59,11 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
     explicitly.
 
     The positional arguments are the integer values of S.  The optional
-    arguments choose the n-based cost profile, the seed, the parity-filter
-    behavior, and the amount of diagnostic output.
+    arguments choose the n-based cost profile, the sampling backend, the exact
+    dynamic-program policy, the seed, the number of worker processes, the
+    parity-filter behavior, and the amount of diagnostic output.  With --batch
+    the instances come from a file instead, and no positional value may be
+    given.
     """
 
     parser = argparse.ArgumentParser(
@@ -71,7 +81,14 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         '--profile',
         choices=PROFILES,
         default='balanced',
-        help='n-based annealing cost profile; default: balanced',
+        help='annealing cost profile (adaptive: batch feedback); default: balanced',
+    )
+    parser.add_argument(
+        '--backend',
+        choices=BACKENDS,
+        default='neal',
+        help='neal on the dense BQM, or the implicit rank-one sampler for very '
+        'long sequences; default: neal',
     )
     parser.add_argument(
         '--seed',
@@ -79,6 +96,52 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         default=None,
         help='optional random seed for reproducible heuristic runs',
     )
+    parser.add_argument(
+        '--exact',
+        choices=('auto', 'always', 'never'),
+        default='auto',
+        help='when to solve exactly by dynamic programming instead of annealing; '
+        'default: auto, by cost estimate',
+    )
+    parser.add_argument(
+        '--random-starts',
+        action='store_true',
+        help='start every read from a random state instead of the '
+        'Karmarkar-Karp partition and its perturbations',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='number of processes running the batches in parallel; default: 1',
+    )
+    parser.add_argument(
+        '--cache',
+        metavar='FILE',
+        default=None,
+        help='persistent result cache (SQLite file); final answers are reused, '
+        'others become warm starts',
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=None,
+        help='maximum number of cache entries, least recently used evicted; '
+        'default: 10000',
+    )
+    parser.add_argument(
+        '--batch',
+        metavar='FILE',
+        default=None,
+        help='solve every instance of a JSONL/CSV file, or of stdin if FILE is -, '
+        'and print one JSON result line per instance',
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='number of processes solving instances in batch mode; default: 1',
+    )
     parser.add_argument(
         '--no-parity-filter',
         action='store_true',
@@ -89,7 +152,10 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         action='store_true',
         help='print the BQM components before the final interpretation',
     )
-    return parser.parse_args(argv)
+    args = parser.parse_args(argv)
+    if args.batch is not None and args.values:
+        parser.error('positional values cannot be combined with --batch')
+    return args
 
 
 ################################################################################
@@ -159,17 +225,20 @@ def prompt_profile(default: str = 'balanced') -> str:
     print('  1. classroom   low cost, compact output')
     print('  2. balanced    default compromise')
     print('  3. aggressive  higher-cost heuristic run')
+    print('  4. adaptive    balanced budget, reallocated from batch feedback')
 
     choices = {
         '1': 'classroom',
         '2': 'balanced',
         '3': 'aggressive',
+        '4': 'adaptive',
         'c': 'classroom',
         'classroom': 'classroom',
         'b': 'balanced',
         'balanced': 'balanced',
         'a': 'aggressive',
         'aggressive': 'aggressive',
+        'adaptive': 'adaptive',
     }
 
     while True:
@@ -178,7 +247,7 @@ def prompt_profile(default: str = 'balanced') -> str:
             return default
         if text in choices:
             return choices[text]
-        print('  Invalid profile. Use 1, 2, 3, or classroom/balanced/aggressive.')
+        print('  Invalid profile. Use 1-4, or classroom/balanced/aggressive/adaptive.')
 
 
 def prompt_optional_seed() -> Optional[int]:
@@ -241,7 +310,13 @@ def interactive_args() -> argparse.Namespace:
     return argparse.Namespace(
         values=values,
         profile=profile,
+        backend='neal',
         seed=seed,
+        workers=1,
+        exact='auto',
+        random_starts=False,
+        cache=None,
+        cache_size=None,
         no_parity_filter=False,
         show_bqm=show_bqm,
     )
@@ -261,6 +336,9 @@ def print_bqm_components(result) -> None:
 
     bqm = result.model.bqm
     print('\n--- Binary Quadratic Model exported to Ocean/dimod ---')
+    if bqm is None:
+        print('Not built: the selected engine works on the values directly.')
+        return
     print('bqm:')
     print(bqm)
     print('\n -- bqm.linear, diagonal QUBO coefficients Q_ii:')
@@ -271,6 +349,20 @@ def print_bqm_components(result) -> None:
     print(bqm.offset)
 
 
+def print_adaptive_history(history) -> None:
+    """Print how the adaptive profile moved the budget, one line per batch."""
+
+    print('Adaptive batches:')
+    for index, observation in enumerate(history):
+        marker = 'improved' if observation.improved else ''
+        print(
+            f'  {index:>3}: reads={observation.num_reads:<5} '
+            f'sweeps={observation.num_sweeps:<7} '
+            f'hit rate={observation.hit_rate:.2f} '
+            f'best H={observation.best_energy:g} {marker}'.rstrip()
+        )
+
+
 def print_result(result, show_bqm: bool = False) -> None:
     """Print the mathematical interpretation of one solver run.
 
@@ -284,7 +376,14 @@ def print_result(result, show_bqm: bool = False) -> None:
     parameters = result.parameters
 
     print('\n## "Number Partitioning" / "Subsets with Identical Sum"')
-    print('## Size-tuned heuristic sampling through neal.SimulatedAnnealingSampler')
+    if result.engine == 'dp':
+        print('## Exact solution by the subset-sum dynamic program')
+    elif result.engine == 'cache':
+        print('## Answer found in the result cache')
+    elif result.model.bqm is None:
+        print('## Size-tuned heuristic sampling through the implicit rank-one sampler')
+    else:
+        print('## Size-tuned heuristic sampling through neal.SimulatedAnnealingSampler')
     print()
     print(f'Indexed collection S = {model.values}')
     print(f'n = {model.n}')
@@ -313,10 +412,22 @@ def print_result(result, show_bqm: bool = False) -> None:
         print('No sample was produced.')
         return
 
-    print(f'Reads used       = {result.reads_used}')
-    print(f'Batches used     = {result.batches_used}')
-    print(f'Work used        = {result.annealing_work_used} read-sweeps')
-    print(f'Variable updates = {result.variable_updates_used}')
+    if result.engine == 'dp':
+        print('No simulated-annealing run was needed.')
+        print('Reason: the dynamic program was cheaper than one annealing batch.')
+    elif result.engine == 'kk':
+        print('No simulated-annealing run was needed.')
+        print('Reason: the Karmarkar-Karp partition is already exact.')
+    elif result.engine == 'cache':
+        print('No simulated-annealing run was needed.')
+        print('Reason: the cache holds a final answer for this multiset.')
+    else:
+        print(f'Reads used       = {result.reads_used}')
+        print(f'Batches used     = {result.batches_used}')
+        print(f'Work used        = {result.annealing_work_used} read-sweeps')
+        print(f'Variable updates = {result.variable_updates_used}')
+        if result.adaptive_history:
+            print_adaptive_history(result.adaptive_history)
     print()
     print(f'Best sample x    = {answer.sample}')
     print(f'Best energy H    = {answer.energy}')
@@ -329,6 +440,9 @@ def print_result(result, show_bqm: bool = False) -> None:
 
     if answer.exact_partition_found:
         print('Interpretation: this run found an exact partition.')
+    elif result.proven_impossible_by_dp:
+        print('Interpretation: no exact partition exists.')
+        print('The dynamic program is exact, so this gap is the minimum possible.')
     else:
         print('Interpretation: this run did not find a zero-energy state.')
         print('Because simulated annealing is heuristic, this is not a proof of absence.')
@@ -337,6 +451,41 @@ def print_result(result, show_bqm: bool = False) -> None:
 ################################################################################
 # Main control.
 ################################################################################
+def run_batch_mode(args: argparse.Namespace) -> int:
+    """Solve all the instances named by --batch and stream JSON results.
+
+    Results go to standard output, one line per instance; the final summary
+    goes to standard error, so that the output stays valid JSONL.
+    """
+
+    options = {
+        'profile': args.profile,
+        'seed': args.seed,
+        'use_parity_filter': not args.no_parity_filter,
+        'backend': args.backend,
+        'exact': args.exact,
+        'warm_start': not args.random_starts,
+        'cache_path': args.cache,
+        'cache_size': args.cache_size,
+        'jobs': args.jobs,
+    }
+
+    try:
+        from sisi_batch import run_batch
+
+        if args.batch == '-':
+            solved, errors = run_batch(sys.stdin, sys.stdout, **options)
+        else:
+            with open(args.batch, encoding='utf-8') as stream:
+                solved, errors = run_batch(stream, sys.stdout, **options)
+    except (OSError, ValueError) as error:
+        print(f'Error: {error}', file=sys.stderr)
+        return 2
+
+    print(f'## {solved} instances solved, {errors} errors', file=sys.stderr)
+    return 0 if errors == 0 else 1
+
+
 def main(argv: Sequence[str]) -> int:
     """Run the application and return a shell-style exit code.
 
@@ -352,18 +501,28 @@ def main(argv: Sequence[str]) -> int:
     else:
         args = interactive_args()
 
+    if getattr(args, 'batch', None) is not None:
+        return run_batch_mode(args)
+
     try:
         # Import the Ocean-dependent solver only after the prompts have been
         # completed.  This keeps the entry point readable and gives a clearer
         # message when the file is accidentally run with the wrong interpreter.
+        from sisi_cache import open_cache
         from sisi_solver import solve_sisi_instance
 
-        result = solve_sisi_instance(
-            args.values,
-            profile=args.profile,
-            seed=args.seed,
-            use_parity_filter=not args.no_parity_filter,
-        )
+        with open_cache(args.cache, args.cache_size) as cache:
+            result = solve_sisi_instance(
+                args.values,
+                profile=args.profile,
+                seed=args.seed,
+                use_parity_filter=not args.no_parity_filter,
+                backend=args.backend,
+                workers=args.workers,
+                exact=args.exact,
+                warm_start=not args.random_starts,
+                cache=cache,
+            )
     except ModuleNotFoundError as error:
         print(f'Error: missing Python package {error.name!r}.', file=sys.stderr)
         print(
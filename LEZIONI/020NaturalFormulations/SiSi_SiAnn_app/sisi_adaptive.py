@@ -0,0 +1,150 @@
+################################################################################
+# sisi_adaptive.py
+#
+# Feedback-driven annealing budget for the 'adaptive' profile.
+#
+# The profiles of sisi_tuning.py fix num_reads and num_sweeps from n before
+# the first read, and the module itself notes that no such rule can be good for
+# every instance.  The adaptive profile starts from the 'balanced' rule and then
+# looks at what each batch actually returned.
+#
+# Every batch gets the same read-sweep work as a 'balanced' batch; only the
+# split between reads and sweeps moves, by a factor STEP at a time.  With equal
+# work, the best gap of a batch directly measures how good its split was:
+#
+#   - the first move is towards more, shorter reads: on random instances the
+#     energy distribution of one read hardly improves beyond a few hundred
+#     sweeps, while every extra read is one more chance at the tail;
+#   - if a move made the best gap of the batch worse by more than a factor
+#     two, the direction is reversed;
+#   - if at least HIGH_HIT_RATE of the reads reached the best energy seen so
+#     far, the reads relax well but fall in the same valley, and the next move
+#     is towards more reads whatever the previous outcome.
+#
+# The controller stops when the total work of the 'balanced' rule is spent, or
+# when PATIENCE consecutive batches have not improved the best energy, since
+# further improvement is then unlikely.  The solver still stops at once on
+# energy 0.
+################################################################################
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from math import inf, isclose, log2, sqrt
+from typing import Optional, Sequence
+
+from sisi_tuning import AnnealingParameters
+
+
+# Batches without improvement after which the controller gives up.
+PATIENCE = 3
+
+# Fraction of reads at the best energy above which the reads count as converged.
+HIGH_HIT_RATE = 0.5
+
+# Factor by which reads and sweeps are exchanged at each move.
+STEP = 2
+
+# Increase of log2(1 + gap) of the batch best that reverses the direction.
+WORSE_MARGIN = 1.0
+
+
+@dataclass(frozen=True)
+class BatchObservation:
+    """What the controller saw after one batch.
+
+    The history of observations is kept in the controller and can be printed
+    to explain why the budget moved.
+    """
+
+    num_reads: int
+    num_sweeps: int
+    batch_best_energy: float
+    best_energy: float
+    hit_rate: float
+    improved: bool
+
+
+@dataclass
+class AdaptiveController:
+    """Choose the reads and sweeps of each batch from the previous ones.
+
+    base is the parameter set of the 'balanced' rule: its annealing_work is the
+    total budget, reads_per_batch * num_sweeps the work of every batch.  Sweeps
+    stay between max(10, base.num_sweeps // 16) and base.num_sweeps * 16.
+
+    direction is -1 while the controller moves towards more reads and +1
+    while it moves towards more sweeps.
+    """
+
+    base: AnnealingParameters
+    num_reads: int = 0
+    num_sweeps: int = 0
+    direction: int = -1
+    spent: int = 0
+    best_energy: float = inf
+    batches_without_improvement: int = 0
+    history: list = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.num_reads = self.base.reads_per_batch
+        self.num_sweeps = self.base.num_sweeps
+        self.batch_work = self.base.reads_per_batch * self.base.num_sweeps
+        self.min_sweeps = min(self.base.num_sweeps, max(10, self.base.num_sweeps // 16))
+        self.max_sweeps = self.base.num_sweeps * 16
+        self._previous_score: Optional[float] = None
+
+    @property
+    def budget(self) -> int:
+        """Return the total read-sweep work allowed, the one of 'balanced'."""
+
+        return self.base.annealing_work
+
+    def next_batch(self) -> Optional[tuple[int, int]]:
+        """Return (num_reads, num_sweeps) of the next batch, or None to stop."""
+
+        if self.best_energy == 0 or self.batches_without_improvement >= PATIENCE:
+            return None
+
+        remaining = self.budget - self.spent
+        if remaining < self.num_sweeps:
+            return None
+
+        return min(self.num_reads, remaining // self.num_sweeps), self.num_sweeps
+
+    def observe(self, energies: Sequence[float], num_sweeps: int) -> BatchObservation:
+        """Record one batch and choose the split of the next one."""
+
+        batch_best = float(min(energies))
+        improved = batch_best < self.best_energy and not isclose(batch_best, self.best_energy)
+        self.best_energy = min(self.best_energy, batch_best)
+        self.batches_without_improvement = 0 if improved else self.batches_without_improvement + 1
+        self.spent += len(energies) * num_sweeps
+
+        hits = sum(1 for energy in energies if isclose(energy, self.best_energy))
+        hit_rate = hits / len(energies)
+
+        # The energy is gap ** 2: compare gaps on a logarithmic scale.
+        score = log2(1 + sqrt(max(batch_best, 0.0)))
+        if hit_rate >= HIGH_HIT_RATE:
+            self.direction = -1
+        elif self._previous_score is not None and score > self._previous_score + WORSE_MARGIN:
+            self.direction = -self.direction
+        self._previous_score = score
+
+        if self.direction < 0:
+            self.num_sweeps = max(self.min_sweeps, self.num_sweeps // STEP)
+        else:
+            self.num_sweeps = min(self.max_sweeps, self.num_sweeps * STEP)
+        self.num_reads = max(1, self.batch_work // self.num_sweeps)
+
+        observation = BatchObservation(
+            num_reads=len(energies),
+            num_sweeps=num_sweeps,
+            batch_best_energy=batch_best,
+            best_energy=float(self.best_energy),
+            hit_rate=hit_rate,
+            improved=improved,
+        )
+        self.history.append(observation)
+        return observation
@@ -0,0 +1,255 @@
+################################################################################
+# sisi_batch.py
+#
+# Bulk, streaming execution of many SiSi instances.
+#
+# SiSi_SiAnn.py normally solves one sequence per process start, so every
+# instance pays again for the interpreter start-up and for importing dimod and
+# neal.  In batch mode the instances are read from a file, or from standard
+# input, and solved by a pool of worker processes that import the solver once.
+#
+# Input, one instance per line:
+#   JSONL  [1, 3, 4, 2, 6]
+#          {"id": "a", "values": [1, 3, 4, 2, 6], "profile": "classroom", "seed": 7}
+#   CSV    1, 3, 4, 2, 6
+# The format is recognized line by line: a line starting with '[' or '{' is
+# JSON, any other non-empty line is a comma/blank separated list of integers.
+# Empty lines and lines starting with '#' are skipped.  Instances without an
+# explicit id are identified by their 1-based line number.
+#
+# Output, one JSON object per instance, written and flushed as soon as that
+# instance is solved.  The lines therefore follow completion order, not input
+# order; the "id" field links each line to its instance.
+#
+# Memory stays bounded: the input is read lazily, and at most a fixed number
+# of instances per worker is in flight at any time.
+################################################################################
+
+from __future__ import annotations
+
+import json
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, TextIO
+
+
+# Instances submitted to the pool but not yet written out, per worker.  Two
+# keep every worker busy while the main process is writing a result.
+IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass(frozen=True)
+class BatchInstance:
+    """One input line, parsed but not yet solved.
+
+    Options left to None fall back to the command-line defaults.
+    """
+
+    instance_id: object
+    values: tuple[int, ...]
+    profile: Optional[str] = None
+    seed: Optional[int] = None
+
+
+def parse_instance_line(line: str, line_number: int) -> Optional[BatchInstance]:
+    """Parse one input line, or return None for blank and comment lines.
+
+    Errors are raised as ValueError and reported by the caller on the output
+    stream, so one malformed line does not stop the whole batch.
+    """
+
+    text = line.strip()
+    if not text or text.startswith('#'):
+        return None
+
+    if text[0] in '[{':
+        data = json.loads(text)
+        if isinstance(data, list):
+            data = {'values': data}
+        if not isinstance(data, dict) or 'values' not in data:
+            raise ValueError('a JSON instance must be a list or an object with "values"')
+        values = data['values']
+        if not isinstance(values, list) or not all(
+            isinstance(value, int) and not isinstance(value, bool) for value in values
+        ):
+            raise ValueError('"values" must be a list of integers')
+        return BatchInstance(
+            instance_id=data.get('id', line_number),
+            values=tuple(values),
+            profile=data.get('profile'),
+            seed=data.get('seed'),
+        )
+
+    tokens = [token for token in re.split(r'[\s,;]+', text) if token]
+    for token in tokens:
+        if not re.fullmatch(r'[+-]?\d+', token):
+            raise ValueError(f'{token!r} is not an integer')
+    return BatchInstance(instance_id=line_number, values=tuple(int(token) for token in tokens))
+
+
+def iter_instances(stream: TextIO) -> Iterator[tuple[object, object]]:
+    """Yield (id, BatchInstance or error message) pairs, lazily.
+
+    Only the current line is held in memory, whatever the size of the input.
+    """
+
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            instance = parse_instance_line(line, line_number)
+        except ValueError as error:
+            yield line_number, f'line {line_number}: {error}'
+            continue
+        if instance is not None:
+            yield instance.instance_id, instance
+
+
+def solve_batch_instance(
+    instance: BatchInstance,
+    profile: str,
+    seed: Optional[int],
+    use_parity_filter: bool,
+    backend: str,
+    exact: str,
+    warm_start: bool,
+    cache_path: Optional[str] = None,
+    cache_size: Optional[int] = None,
+) -> dict:
+    """Solve one instance and return its JSON-ready result record.
+
+    This function runs in the worker processes.  The solver is imported here,
+    once per worker, for the same reason as in SiSi_SiAnn.main(): a missing
+    dependency is then reported as a normal error record.
+
+    With cache_path every call opens the shared cache file on its own: SQLite
+    serializes the writes of concurrent workers.
+    """
+
+    try:
+        from sisi_cache import open_cache
+        from sisi_qubo import selected_positions
+        from sisi_solver import solve_sisi_instance
+
+        with open_cache(cache_path, cache_size) as cache:
+            result = solve_sisi_instance(
+                instance.values,
+                profile=instance.profile or profile,
+                seed=instance.seed if instance.seed is not None else seed,
+                use_parity_filter=use_parity_filter,
+                backend=backend,
+                exact=exact,
+                warm_start=warm_start,
+                cache=cache,
+            )
+    except Exception as error:  # one bad instance must not stop the batch
+        return {'id': instance.instance_id, 'error': str(error)}
+
+    record = {
+        'id': instance.instance_id,
+        'n': result.model.n,
+        'total': result.model.total,
+        'profile': result.parameters.profile,
+        'engine': result.engine,
+        'proven_impossible': result.proven_impossible,
+        'reads_used': result.reads_used,
+        'batches_used': result.batches_used,
+        'timings': {
+            'build': result.timings.build,
+            'sample': result.timings.sample,
+            'decode': result.timings.decode,
+            'total': result.timings.total,
+        },
+    }
+
+    answer = result.best_answer
+    if answer is None:
+        record.update({'gap': None, 'exact': False, 'partition': None})
+    else:
+        record.update({
+            'gap': answer.gap,
+            'exact': answer.exact_partition_found,
+            'partition': {
+                'selected_positions': list(
+                    selected_positions(answer.sample, result.model.variable_names)
+                ),
+                'selected_values': list(answer.selected_values),
+                'complement_values': list(answer.complement_values),
+            },
+        })
+    return record
+
+
+def _write_record(record: dict, output: TextIO) -> None:
+    """Write one result line and flush it, so that readers see it at once."""
+
+    output.write(json.dumps(record) + '\n')
+    output.flush()
+
+
+def run_batch(
+    stream: Iterable[str],
+    output: TextIO,
+    profile: str = 'balanced',
+    seed: Optional[int] = None,
+    use_parity_filter: bool = True,
+    backend: str = 'neal',
+    exact: str = 'auto',
+    warm_start: bool = True,
+    cache_path: Optional[str] = None,
+    cache_size: Optional[int] = None,
+    jobs: int = 1,
+) -> tuple[int, int]:
+    """Solve every instance of stream and stream the results to output.
+
+    Returns (number of instances solved, number of error records).  With
+    jobs = 1 the instances are solved in the current process, in input order;
+    otherwise a pool of jobs processes is used, with at most
+    IN_FLIGHT_PER_WORKER * jobs instances submitted and not yet written.
+    """
+
+    if jobs < 1:
+        raise ValueError('jobs must be positive')
+
+    solved = 0
+    errors = 0
+
+    def emit(record: dict) -> None:
+        nonlocal solved, errors
+        _write_record(record, output)
+        if 'error' in record:
+            errors += 1
+        else:
+            solved += 1
+
+    options = (
+        profile, seed, use_parity_filter, backend, exact, warm_start, cache_path, cache_size,
+    )
+
+    if jobs == 1:
+        for instance_id, item in iter_instances(stream):
+            if isinstance(item, str):
+                emit({'id': instance_id, 'error': item})
+            else:
+                emit(solve_batch_instance(item, *options))
+        return solved, errors
+
+    limit = IN_FLIGHT_PER_WORKER * jobs
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        for instance_id, item in iter_instances(stream):
+            if isinstance(item, str):
+                emit({'id': instance_id, 'error': item})
+                continue
+
+            pending.add(executor.submit(solve_batch_instance, item, *options))
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    emit(future.result())
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                emit(future.result())
+
+    return solved, errors
@@ -0,0 +1,32 @@
+################################################################################
+# sisi_bench
+#
+# Time-to-solution benchmark of the SiSi_SiAnn profiles and backends.
+#
+# Usage, from the SiSi_SiAnn_app folder:
+#   python -m sisi_bench
+#   python -m sisi_bench --sizes 16 24 32 --kappas 0.5 1 1.5 --output run.json
+#   python -m sisi_bench --baseline before.json --output after.json
+#
+# Modules:
+#   families.py  seeded instance families across the easy/hard transition;
+#   metrics.py   success probability, TTS99, and comparison of two runs;
+#   runner.py    the benchmark loop, which calls solve_sisi_instance().
+#
+# The package imports the application modules by their plain names, as the
+# application itself does, so it must be run from the application folder.
+################################################################################
+
+from .families import Family, critical_kappa, family_grid, make_instance
+from .metrics import compare_results, time_to_solution
+from .runner import run_benchmark
+
+__all__ = [
+    'Family',
+    'compare_results',
+    'critical_kappa',
+    'family_grid',
+    'make_instance',
+    'run_benchmark',
+    'time_to_solution',
+]
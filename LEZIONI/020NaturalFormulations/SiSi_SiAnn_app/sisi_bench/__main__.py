@@ -0,0 +1,117 @@
+################################################################################
+# sisi_bench/__main__.py
+#
+# Command line of the benchmark: python -m sisi_bench [options].
+#
+# The summary table goes to standard output, progress lines to standard error,
+# and the full result to the JSON file named by --output.  With --baseline the
+# TTS99 of each row is also compared with the same row of an earlier result.
+# --starts kk random solves every instance with and without the Karmarkar-Karp
+# warm starts and prints the two rows of each profile and backend together.
+################################################################################
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Sequence
+
+from sisi_solver import BACKENDS, EXACT_POLICIES
+from sisi_tuning import PROFILES
+
+from .families import family_grid
+from .metrics import compare_results
+from .runner import STARTS, run_benchmark
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    """Translate shell arguments into the benchmark options."""
+
+    parser = argparse.ArgumentParser(
+        prog='python -m sisi_bench',
+        description='Time-to-solution benchmark of the SiSi profiles and backends.',
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=[16, 24],
+                        help='values of n; default: 16 24')
+    parser.add_argument('--kappas', type=float, nargs='+', default=[0.5, 1.0, 1.5],
+                        help='bits / n ratios; default: 0.5 1.0 1.5')
+    parser.add_argument('--instances', type=int, default=3,
+                        help='instances per family; default: 3')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='runs per instance, profile and backend; default: 5')
+    parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES),
+                        help='profiles to run; default: all')
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS),
+                        help='backends to run; default: all')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='base seed of instances and runs; default: 0')
+    parser.add_argument('--exact', choices=EXACT_POLICIES, default='never',
+                        help='exact dynamic-program policy; default: never')
+    parser.add_argument('--starts', nargs='+', choices=list(STARTS), default=['kk'],
+                        help='kk: Karmarkar-Karp baseline and warm starts; random: '
+                             'random initial states only; default: kk')
+    parser.add_argument('--output', default='sisi_bench.json',
+                        help='JSON result file; default: sisi_bench.json')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='earlier JSON result to compare with')
+    return parser.parse_args(argv)
+
+
+def _seconds(value) -> str:
+    return 'inf' if value is None else f'{value:.4f}'
+
+
+def main(argv: Sequence[str]) -> int:
+    """Run the benchmark, print the summary, and write the JSON result."""
+
+    args = parse_args(argv)
+    result = run_benchmark(
+        family_grid(args.sizes, args.kappas),
+        instances=args.instances,
+        repeats=args.repeats,
+        profiles=args.profiles,
+        backends=args.backends,
+        seed=args.seed,
+        exact=args.exact,
+        starts=args.starts,
+        progress=lambda line: print(line, file=sys.stderr),
+    )
+
+    with open(args.output, 'w', encoding='utf-8') as stream:
+        json.dump(result, stream, indent=1)
+
+    print(
+        f'{"n":>4} {"bits":>4} {"regime":<6} {"profile":<10} {"backend":<8} '
+        f'{"starts":<6} {"P(succ)":>7} {"TTS99 [s]":>10} {"by KK":>5} '
+        f'{"reads":>8} {"read-sweeps":>12} {"build":>7} {"sample":>7} {"decode":>7}'
+    )
+    for row in result['rows']:
+        seconds = row['mean_seconds']
+        print(
+            f'{row["n"]:>4} {row["bits"]:>4} {row["regime"]:<6} {row["profile"]:<10} '
+            f'{row["backend"]:<8} {row["starts"]:<6} {row["success_probability"]:>7.2f} '
+            f'{_seconds(row["tts99"]):>10} {row["kk_share"]:>5.2f} '
+            f'{row["mean_reads"]:>8.1f} {row["mean_read_sweeps"]:>12.0f} '
+            f'{seconds["build"]:>7.4f} {seconds["sample"]:>7.4f} {seconds["decode"]:>7.4f}'
+        )
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        print('\nTTS99 against the baseline (ratio < 1: faster now):')
+        for row in compare_results(baseline, result):
+            ratio = 'n/a' if row['ratio'] is None else f'{row["ratio"]:.2f}'
+            print(
+                f'{row["n"]:>4} {row["bits"]:>4} {row["profile"]:<10} {row["backend"]:<8} '
+                f'{row["starts"]:<6} '
+                f'{_seconds(row["baseline_tts99"]):>10} -> {_seconds(row["tts99"]):>10}  '
+                f'x{ratio}'
+            )
+
+    print(f'\nResult written to {args.output}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
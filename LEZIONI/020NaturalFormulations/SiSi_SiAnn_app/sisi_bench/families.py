@@ -0,0 +1,75 @@
+################################################################################
+# sisi_bench/families.py
+#
+# Seeded Number Partitioning families.
+#
+# For n values drawn uniformly from 1, ..., 2^bits the ratio kappa = bits / n
+# controls the difficulty.  Below the critical ratio the instance has
+# exponentially many exact partitions, and a heuristic finds one quickly
+# (easy phase); above it, exact partitions are rare or absent, and the optimum
+# is the unique partition with minimum gap (hard phase).  The critical ratio is
+# 1 with a finite-size correction, see critical_kappa().
+#
+# A family is a pair (n, bits); its instances are generated from a string seed
+# that contains the base seed, n, bits and the instance index, so every
+# instance can be regenerated on its own.  The sum is made even, otherwise the
+# parity filter of the solver would answer without sampling.
+################################################################################
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from math import log2
+from typing import Sequence
+
+
+@dataclass(frozen=True)
+class Family:
+    """Instances of n values, each uniform in 1, ..., 2^bits."""
+
+    n: int
+    bits: int
+
+    @property
+    def kappa(self) -> float:
+        """Return bits / n, the control parameter of the phase transition."""
+
+        return self.bits / self.n
+
+    @property
+    def regime(self) -> str:
+        """Return 'easy' below the critical ratio, 'hard' from it onwards."""
+
+        return 'easy' if self.kappa < critical_kappa(self.n) else 'hard'
+
+
+def critical_kappa(n: int) -> float:
+    """Return the critical bits / n ratio for instances of size n.
+
+    This is the leading finite-size form 1 - log2(n) / (2n) of the transition
+    located by Borgs, Chayes and Pittel; it is meant to place the families on
+    both sides of the transition, not to be precise.
+    """
+
+    return 1 - log2(n) / (2 * n)
+
+
+def family_grid(sizes: Sequence[int], kappas: Sequence[float]) -> list[Family]:
+    """Return one family per (n, kappa) pair, with bits = round(kappa * n)."""
+
+    return [
+        Family(n=n, bits=max(1, round(kappa * n)))
+        for n in sizes
+        for kappa in kappas
+    ]
+
+
+def make_instance(family: Family, index: int, seed: int = 0) -> list[int]:
+    """Return instance number index of family, with even sum."""
+
+    generator = random.Random(f'{seed}:{family.n}:{family.bits}:{index}')
+    values = [generator.randint(1, 2 ** family.bits) for _ in range(family.n)]
+    if sum(values) % 2 != 0:
+        values[0] += 1
+    return values
@@ -0,0 +1,79 @@
+################################################################################
+# sisi_bench/metrics.py
+#
+# Time-to-solution metrics.
+#
+# A run succeeds when its gap equals the reference optimum of the instance.  If
+# one run takes t seconds on average and succeeds with probability p, then
+#
+#   TTS99 = t * ln(1 - 0.99) / ln(1 - p)
+#
+# is the expected time of enough independent runs to succeed at least once
+# with probability 0.99.  It is t when p >= 0.99 and infinite when p = 0; JSON
+# has no infinity, so the results store None instead.
+################################################################################
+
+from __future__ import annotations
+
+from math import inf, isinf, log
+from typing import Optional
+
+TARGET_PROBABILITY = 0.99
+
+
+def time_to_solution(
+    mean_seconds: float,
+    success_probability: float,
+    target: float = TARGET_PROBABILITY,
+) -> float:
+    """Return the time to reach the optimum with probability target."""
+
+    if success_probability >= target:
+        return mean_seconds
+    if success_probability <= 0:
+        return inf
+    return mean_seconds * log(1 - target) / log(1 - success_probability)
+
+
+def json_seconds(value: float) -> Optional[float]:
+    """Return value, or None if it is infinite."""
+
+    return None if isinf(value) else value
+
+
+def _row_key(row: dict, result: dict) -> tuple:
+    # Results written before the starts option ran one mode, given by warm_start.
+    options = result['meta']['options']
+    default = 'kk' if options.get('warm_start', True) else 'random'
+    return row['n'], row['bits'], row['profile'], row['backend'], row.get('starts', default)
+
+
+def compare_results(baseline: dict, current: dict) -> list[dict]:
+    """Pair the rows of two benchmark results and return the TTS99 ratios.
+
+    Rows are matched by (n, bits, profile, backend, starts); rows present in
+    only one result are skipped.  ratio is current / baseline, so values below
+    1 mean that the current tree is faster; it is None when either TTS99 is
+    infinite.
+    """
+
+    previous = {_row_key(row, baseline): row for row in baseline['rows']}
+    comparison = []
+    for row in current['rows']:
+        old = previous.get(_row_key(row, current))
+        if old is None:
+            continue
+        old_tts, new_tts = old['tts99'], row['tts99']
+        comparison.append({
+            'n': row['n'],
+            'bits': row['bits'],
+            'profile': row['profile'],
+            'backend': row['backend'],
+            'starts': row['starts'],
+            'baseline_tts99': old_tts,
+            'tts99': new_tts,
+            'ratio': new_tts / old_tts if old_tts and new_tts is not None else None,
+            'baseline_success': old['success_probability'],
+            'success': row['success_probability'],
+        })
+    return comparison
@@ -0,0 +1,256 @@
+################################################################################
+# sisi_bench/runner.py
+#
+# The benchmark loop.
+#
+# Every instance of every family is solved repeats times per (profile, backend,
+# starts) triple, with solver seeds seed, seed + 1, ..., so that two runs of the
+# benchmark on the same tree perform the same computation.  starts is one of
+# STARTS: 'kk' runs the solver with its Karmarkar-Karp baseline and warm starts,
+# 'random' with random initial states only, so both can be compared on the
+# same instances.  Each run records its gap, the engine that answered, the reads
+# and read-sweeps it used, and the build/sample/decode times of SiSiTimings.
+#
+# The reference optimum of an instance is its minimum gap, computed by the
+# single-bitset dynamic program of sisi_exact.py when the bitset stays below
+# REFERENCE_DP_BITS.  Otherwise the best gap known is used instead: the best of
+# a long CKK search and of all the benchmark runs on that instance.  Each row of
+# the result says which of the two it used.
+################################################################################
+
+from __future__ import annotations
+
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from statistics import mean, median
+from typing import Callable, Optional, Sequence
+
+from sisi_exact import minimum_gap
+from sisi_kk import complete_karmarkar_karp
+from sisi_solver import BACKENDS, solve_sisi_instance
+from sisi_tuning import PROFILES
+
+from .families import Family, make_instance
+from .metrics import json_seconds, time_to_solution
+
+
+# Largest sum of |v_i|, in bits of the bitset, for which the exact reference
+# is computed.
+REFERENCE_DP_BITS = 1 << 28
+
+# Nodes of the CKK search used when the exact reference is too large.
+REFERENCE_CKK_NODES = 100_000
+
+PHASES = ('build', 'sample', 'decode')
+
+# Initial states of the annealing reads, and the warm_start flag of each.
+STARTS = {'kk': True, 'random': False}
+
+
+def _git_commit() -> Optional[str]:
+    """Return the current commit of the repository, if git can tell."""
+
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def _exact_reference(values: Sequence[int]) -> Optional[int]:
+    """Return the minimum gap, or None if the bitset would be too large."""
+
+    if sum(abs(value) for value in values) > REFERENCE_DP_BITS:
+        return None
+    return minimum_gap(values)
+
+
+def _solve_once(
+    values: Sequence[int],
+    profile: str,
+    backend: str,
+    seed: int,
+    exact: str,
+    warm_start: bool,
+) -> dict:
+    """Run the solver once and return the measured quantities."""
+
+    start = time.perf_counter()
+    result = solve_sisi_instance(
+        values,
+        profile=profile,
+        seed=seed,
+        backend=backend,
+        exact=exact,
+        warm_start=warm_start,
+    )
+    wall = time.perf_counter() - start
+
+    return {
+        'seed': seed,
+        'engine': result.engine,
+        'gap': result.best_answer.gap,
+        'reads': result.reads_used,
+        'read_sweeps': result.annealing_work_used,
+        'batches': result.batches_used,
+        'seconds': {
+            'build': result.timings.build,
+            'sample': result.timings.sample,
+            'decode': result.timings.decode,
+            'wall': wall,
+        },
+    }
+
+
+def _summarize(family: Family, profile: str, backend: str, start: str, instances: list[dict]) -> dict:
+    """Aggregate the runs of one family with one profile, backend and starts.
+
+    The success probability is pooled over all runs.  TTS99 is computed per
+    instance, from its own success rate and mean wall time, and the row reports
+    the median over the instances, which is not dominated by one hard instance.
+    """
+
+    key = profile, backend, start
+    runs = [run for instance in instances for run in instance['runs'][key]]
+
+    per_instance_tts = []
+    for instance in instances:
+        own_runs = instance['runs'][key]
+        successes = sum(run['gap'] == instance['reference'] for run in own_runs)
+        per_instance_tts.append(time_to_solution(
+            mean(run['seconds']['wall'] for run in own_runs),
+            successes / len(own_runs),
+        ))
+
+    successes = sum(
+        run['gap'] == instance['reference']
+        for instance in instances
+        for run in instance['runs'][key]
+    )
+
+    return {
+        'n': family.n,
+        'bits': family.bits,
+        'kappa': family.kappa,
+        'regime': family.regime,
+        'profile': profile,
+        'backend': backend,
+        'starts': start,
+        'instances': len(instances),
+        'runs': len(runs),
+        'reference': sorted({instance['reference_source'] for instance in instances}),
+        'success_probability': successes / len(runs),
+        'tts99': json_seconds(median(per_instance_tts)),
+        'kk_share': mean(run['engine'] == 'kk' for run in runs),
+        'median_gap': median(run['gap'] for run in runs),
+        'mean_reads': mean(run['reads'] for run in runs),
+        'mean_read_sweeps': mean(run['read_sweeps'] for run in runs),
+        'mean_batches': mean(run['batches'] for run in runs),
+        'mean_seconds': {
+            phase: mean(run['seconds'][phase] for run in runs)
+            for phase in PHASES + ('wall',)
+        },
+    }
+
+
+def run_benchmark(
+    families: Sequence[Family],
+    instances: int = 3,
+    repeats: int = 5,
+    profiles: Sequence[str] = PROFILES,
+    backends: Sequence[str] = BACKENDS,
+    seed: int = 0,
+    exact: str = 'never',
+    starts: Sequence[str] = ('kk',),
+    progress: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """Run the benchmark and return a JSON-ready dictionary.
+
+    The dictionary has three entries: 'meta' (commit, platform, options),
+    'rows' (one summary per family, profile and backend) and 'instances' (the
+    values, reference and individual runs of every instance), so that two
+    results can be compared row by row or run by run.
+
+    exact defaults to 'never' so that the annealing engines are measured; pass
+    'auto' to time the whole solver pipeline instead.  starts lists the keys
+    of STARTS to run; with both, the two rows of each profile and backend are
+    adjacent.
+    """
+
+    if instances < 1 or repeats < 1:
+        raise ValueError('instances and repeats must be positive')
+    if not starts or any(start not in STARTS for start in starts):
+        raise ValueError(f'starts must be a nonempty subset of {sorted(STARTS)}')
+
+    meta = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'options': {
+            'instances': instances,
+            'repeats': repeats,
+            'profiles': list(profiles),
+            'backends': list(backends),
+            'seed': seed,
+            'exact': exact,
+            'starts': list(starts),
+        },
+    }
+
+    rows = []
+    records = []
+    for family in families:
+        family_instances = []
+        for index in range(instances):
+            values = make_instance(family, index, seed)
+            instance = {'index': index, 'values': values, 'runs': {}}
+
+            for backend in backends:
+                for profile in profiles:
+                    for start in starts:
+                        instance['runs'][profile, backend, start] = [
+                            _solve_once(values, profile, backend, seed + repeat, exact, STARTS[start])
+                            for repeat in range(repeats)
+                        ]
+
+            reference = _exact_reference(values)
+            if reference is not None:
+                instance['reference'], instance['reference_source'] = reference, 'exact'
+            else:
+                gaps = [run['gap'] for runs in instance['runs'].values() for run in runs]
+                gaps.append(complete_karmarkar_karp(values, REFERENCE_CKK_NODES).gap)
+                instance['reference'], instance['reference_source'] = min(gaps), 'best_known'
+            family_instances.append(instance)
+
+        for backend in backends:
+            for profile in profiles:
+                for start in starts:
+                    rows.append(_summarize(family, profile, backend, start, family_instances))
+
+        for instance in family_instances:
+            records.append({
+                'n': family.n,
+                'bits': family.bits,
+                'index': instance['index'],
+                'values': instance['values'],
+                'reference': instance['reference'],
+                'reference_source': instance['reference_source'],
+                'runs': [
+                    {'profile': profile, 'backend': backend, 'starts': start, **run}
+                    for (profile, backend, start), runs in instance['runs'].items()
+                    for run in runs
+                ],
+            })
+
+        if progress is not None:
+            progress(f'n={family.n} bits={family.bits} ({family.regime}) done')
+
+    return {'meta': meta, 'rows': rows, 'instances': records}
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+################################################################################
+# sisi_bench_build.py
+#
+# Benchmark of the two BQM builders of sisi_qubo.py.
+#
+# Usage:
+#   python sisi_bench_build.py
+#   python sisi_bench_build.py --sizes 100 1000 10000 --loop-limit 3000
+#
+# For every n the script generates a seeded random integer sequence of length n
+# and measures, for build_bqm() and build_bqm_vectorized():
+#   - the wall-clock build time;
+#   - the peak resident memory of the process while building.
+#
+# Each measurement runs in a fresh child process.  dimod stores the BQM in C++
+# containers that tracemalloc cannot see, so the peak resident set size
+# reported by the operating system is the only honest memory figure, and it
+# is only meaningful if no previous measurement has already raised it.  The
+# peak of build_bqm_vectorized() includes the temporary n x n float64 outer
+# product, which is released as soon as dimod has copied it.
+#
+# The reference builder performs n^2/2 Python-level insertions; above
+# --loop-limit it is skipped because a single run would take minutes.
+################################################################################
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import random
+import resource
+import sys
+import time
+from typing import Sequence
+
+
+DEFAULT_SIZES = (100, 300, 1000, 3000, 10000)
+BUILDERS = ('build_bqm', 'build_bqm_vectorized')
+
+
+def _peak_rss_mib() -> float:
+    """Return the peak resident set size of this process in MiB.
+
+    ru_maxrss is expressed in KiB on Linux and in bytes on macOS.
+    """
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _measure(builder_name: str, n: int, seed: int, queue) -> None:
+    """Child-process body: build one model and report time and memory.
+
+    The imports and the input sequence are prepared before the baseline memory
+    is read, so the reported increase is due to the builder alone.
+    """
+
+    import sisi_qubo
+
+    builder = getattr(sisi_qubo, builder_name)
+    generator = random.Random(seed)
+    values = [generator.randint(1, 1000) for _ in range(n)]
+
+    baseline = _peak_rss_mib()
+    start = time.perf_counter()
+    model = builder(values)
+    elapsed = time.perf_counter() - start
+    peak = _peak_rss_mib()
+
+    queue.put((elapsed, peak - baseline, model.bqm.num_interactions))
+
+
+def measure(builder_name: str, n: int, seed: int) -> tuple[float, float, int]:
+    """Run one measurement in a fresh process and return its figures."""
+
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(builder_name, n, seed, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    """Translate shell arguments into the benchmark options."""
+
+    parser = argparse.ArgumentParser(
+        prog='sisi_bench_build.py',
+        description='Build time and peak memory of the SiSi BQM builders.',
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=list(DEFAULT_SIZES),
+        help='values of n to measure; default: 100 300 1000 3000 10000',
+    )
+    parser.add_argument(
+        '--loop-limit',
+        type=int,
+        default=3000,
+        help='largest n for which the loop-based build_bqm() is run; default: 3000',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='seed of the random input sequences; default: 0',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str]) -> int:
+    """Print one table row per (n, builder) pair."""
+
+    args = parse_args(argv)
+
+    print(f'{"n":>7}  {"builder":<22} {"couplings":>11} {"time [s]":>10} {"peak [MiB]":>11}')
+    for n in args.sizes:
+        for builder_name in BUILDERS:
+            if builder_name == 'build_bqm' and n > args.loop_limit:
+                print(f'{n:>7}  {builder_name:<22} {"skipped":>11}')
+                continue
+            elapsed, peak, couplings = measure(builder_name, n, args.seed + n)
+            print(f'{n:>7}  {builder_name:<22} {couplings:>11} {elapsed:>10.3f} {peak:>11.1f}')
+
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,196 @@
+################################################################################
+# sisi_cache.py
+#
+# Persistent result cache for SiSi instances.
+#
+# A SiSi instance is a multiset: reordering S permutes the variables but does
+# not change which partitions exist.  The cache therefore stores every result
+# under a canonical form of the instance, the values sorted in increasing
+# order, together with the profile and the seed of the run:
+#
+#   key = sha256(json([sorted values, profile, seed]))
+#
+# and the assignment is stored in sorted order as well.  On a hit it is mapped
+# back to the caller's positions through the sorting permutation; equal values
+# are interchangeable, so the way ties are broken does not matter.
+#
+# An entry is final when its answer cannot be improved: gap 0, or the minimum
+# gap proven by the dynamic program of sisi_exact.py.  The solver answers a
+# final hit without building any model and without sampling.  A non-final
+# entry is only a good partition: the solver uses it as a warm start and as the
+# baseline answer, and stores the new best answer if it is better.
+#
+# The entries live in a SQLite file, so that several processes of the batch
+# mode can share it.  Every lookup refreshes the last-use time of its entry,
+# and when the file holds more than max_entries entries the least recently
+# used ones are removed.
+################################################################################
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Seconds a process waits for another one holding the write lock.
+LOCK_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    sample TEXT NOT NULL,
+    gap TEXT NOT NULL,
+    final INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+@dataclass(frozen=True)
+class CachedPartition:
+    """One cache entry, already mapped to the caller's order.
+
+    sample:
+        The assignment x_1, ..., x_n of the values as the caller gave them.
+
+    gap:
+        |sum(T) - sum(S \\ T)| for this assignment.
+
+    final:
+        True when no better answer exists: gap 0, or a gap proven minimal.
+    """
+
+    sample: tuple[int, ...]
+    gap: int
+    final: bool
+
+
+def canonical_form(values: Sequence[int]) -> tuple[tuple[int, ...], list[int]]:
+    """Return the sorted values and the permutation that sorts them.
+
+    order[k] is the caller's position of the k-th smallest value.
+    """
+
+    order = sorted(range(len(values)), key=values.__getitem__)
+    return tuple(values[i] for i in order), order
+
+
+def cache_key(sorted_values: Sequence[int], profile: str, seed: Optional[int]) -> str:
+    """Return the key of a canonical instance solved with profile and seed."""
+
+    text = json.dumps([list(sorted_values), profile, seed], separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class SiSiCache:
+    """On-disk LRU cache of SiSi answers, invariant under permutations of S.
+
+    The cache is a context manager; it can also be closed explicitly.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError('max_entries must be positive')
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+
+    def __enter__(self) -> SiSiCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying SQLite connection."""
+
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def lookup(
+        self,
+        values: Sequence[int],
+        profile: str,
+        seed: Optional[int],
+    ) -> Optional[CachedPartition]:
+        """Return the entry for S, profile and seed, or None on a miss."""
+
+        sorted_values, order = canonical_form(values)
+        key = cache_key(sorted_values, profile, seed)
+        with self._connection:
+            row = self._connection.execute(
+                'SELECT sample, gap, final FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                'UPDATE entries SET last_used = ? WHERE key = ?', (time.time(), key)
+            )
+
+        canonical_sample, gap, final = row
+        sample = [0] * len(values)
+        for position, bit in zip(order, canonical_sample):
+            sample[position] = int(bit)
+        # Gaps are stored as text: they may exceed the 64-bit SQLite integers.
+        return CachedPartition(sample=tuple(sample), gap=int(gap), final=bool(final))
+
+    def store(
+        self,
+        values: Sequence[int],
+        profile: str,
+        seed: Optional[int],
+        sample: Sequence[int],
+        gap: int,
+        final: bool,
+    ) -> None:
+        """Record an answer unless the cache already holds one as good.
+
+        sample is in the caller's order.  An existing entry is replaced only by
+        a smaller gap, or by the same gap now known to be final.
+        """
+
+        sorted_values, order = canonical_form(values)
+        key = cache_key(sorted_values, profile, seed)
+        canonical_sample = ''.join(str(int(sample[position])) for position in order)
+
+        with self._connection:
+            row = self._connection.execute(
+                'SELECT gap, final FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is not None:
+                old_gap, old_final = int(row[0]), bool(row[1])
+                if old_gap < gap or (old_gap == gap and (old_final or not final)):
+                    return
+
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries (key, sample, gap, final, last_used) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, canonical_sample, str(gap), int(final), time.time()),
+            )
+            self._connection.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+
+def open_cache(path: Optional[str], max_entries: Optional[int] = None):
+    """Return a context manager yielding a SiSiCache, or None without path.
+
+    This is the form used by the entry points, where --cache is optional.
+    """
+
+    if path is None:
+        return nullcontext(None)
+    return SiSiCache(path, DEFAULT_MAX_ENTRIES if max_entries is None else max_entries)
@@ -0,0 +1,208 @@
+################################################################################
+# sisi_exact.py
+#
+# Exact pseudo-polynomial solution of SiSi instances.
+#
+# Number Partitioning is NP-hard, but only in the weak sense: its difficulty
+# grows with the size of the numbers, not only with n.  When the absolute sum
+# A = sum_i |v_i| is moderate, the classical subset-sum dynamic program decides
+# the instance exactly in O(n * A) bit operations.
+#
+# The set of reachable subset sums is stored as one Python integer used as a
+# bitset: bit k is set when some subset reaches the sum k.  Adding an item of
+# weight w is then a single shift-and-or,
+#
+#   reachable = reachable | (reachable << w),
+#
+# which Python performs on machine words.  Negative values are handled by
+# starting from the subset that contains all of them: leaving out a negative v
+# adds |v| to that sum, so every item has a non-negative weight.
+#
+# The program returns an optimal partition, i.e. one with minimum gap.  When
+# that gap is positive the instance is proven to have no exact partition; the
+# annealer would instead spend its whole read budget without being able to say
+# so.
+#
+# The cost model below compares the estimated running time of the program with
+# the one of a single annealing batch and is used by sisi_solver.py to decide,
+# instance by instance, which engine to run.  Its constants were measured on a
+# desktop machine; they are meant to get the order of magnitude right, not to
+# be precise.
+################################################################################
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+from sisi_tuning import RANK_ONE_SECONDS_PER_FLIP, AnnealingParameters
+
+
+# Seconds per (item, bit) of the shift-and-or update on Python integers.
+DP_SECONDS_PER_ITEM_BIT = 1e-10
+
+# Seconds per variable update of neal on the dense BQM: a fixed part plus a
+# part proportional to the n - 1 couplings of the updated variable.
+NEAL_SECONDS_PER_UPDATE = 5e-8
+NEAL_SECONDS_PER_COUPLING = 1e-9
+
+# The reconstruction keeps one bitset per item: about n * A / 16 bytes.  Above
+# this limit the dynamic program is never chosen automatically.
+DP_MEMORY_LIMIT = 256 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ExactPartition:
+    """Optimal partition returned by the dynamic program.
+
+    sample:
+        The assignment x_1, ..., x_n, as a tuple of 0/1 values.
+
+    selected_sum:
+        sum_i x_i v_i, the sum of T.
+
+    gap:
+        |V - 2 * selected_sum|, minimal over all assignments.
+    """
+
+    sample: tuple[int, ...]
+    selected_sum: int
+    gap: int
+
+    @property
+    def exact_partition_found(self) -> bool:
+        """Return True when S admits two parts with identical sums."""
+
+        return self.gap == 0
+
+
+def dp_width(values: Sequence[int]) -> int:
+    """Return the number of bits of the reachable-sums bitset, A + 1."""
+
+    return sum(abs(value) for value in values) + 1
+
+
+def estimate_dp_seconds(values: Sequence[int]) -> float:
+    """Return the estimated running time of exact_partition(values)."""
+
+    return DP_SECONDS_PER_ITEM_BIT * len(values) * dp_width(values)
+
+
+def estimate_dp_bytes(values: Sequence[int]) -> int:
+    """Return the estimated memory kept by exact_partition(values).
+
+    Layer i has at most as many bits as the sum of the first i weights, so on
+    average the n layers are half as wide as the final one.
+    """
+
+    return len(values) * dp_width(values) // 16
+
+
+def estimate_batch_seconds(n: int, parameters: AnnealingParameters, backend: str) -> float:
+    """Return the estimated running time of one annealing batch.
+
+    A batch performs reads_per_batch * num_sweeps * n single-variable updates.
+    """
+
+    updates = parameters.reads_per_batch * parameters.num_sweeps * n
+    if backend == 'rank_one':
+        return RANK_ONE_SECONDS_PER_FLIP * updates
+    return (NEAL_SECONDS_PER_UPDATE + NEAL_SECONDS_PER_COUPLING * max(0, n - 1)) * updates
+
+
+def prefer_exact(values: Sequence[int], parameters: AnnealingParameters, backend: str) -> bool:
+    """Return True when the dynamic program should replace annealing.
+
+    The program is preferred when it fits in DP_MEMORY_LIMIT and is expected
+    to finish before the first annealing batch.  Comparing with one batch, and
+    not with the whole budget, is conservative: the solver may stop after one
+    batch on easy instances, but never earlier.
+    """
+
+    if estimate_dp_bytes(values) > DP_MEMORY_LIMIT:
+        return False
+    return estimate_dp_seconds(values) <= estimate_batch_seconds(len(values), parameters, backend)
+
+
+def _nearest_set_bits(bitset: int, target: int) -> tuple[int, int]:
+    """Return the set bits of bitset nearest to target, below and above.
+
+    Either entry is -1 if there is no set bit on that side.  Both searches use
+    whole-integer operations instead of a Python loop over bits.
+    """
+
+    below = -1
+    if target >= 0:
+        below = (bitset & ((1 << (target + 1)) - 1)).bit_length() - 1
+
+    above = -1
+    upper = bitset >> max(target, 0)
+    if upper:
+        above = (upper & -upper).bit_length() - 1 + max(target, 0)
+
+    return below, above
+
+
+def minimum_gap(values: Sequence[int]) -> int:
+    """Return the minimum gap of S without reconstructing a partition.
+
+    It keeps a single bitset, so its memory is O(A) bits instead of the
+    O(n * A) of exact_partition().  It is meant as the reference optimum of
+    benchmark instances.
+    """
+
+    total = sum(values)
+    base = sum(value for value in values if value < 0)
+
+    reachable = 1
+    for value in values:
+        reachable |= reachable << abs(value)
+
+    target = total // 2 - base
+    return min(
+        abs(total - 2 * (base + k))
+        for k in _nearest_set_bits(reachable, target)
+        if k >= 0
+    )
+
+
+def exact_partition(values: Sequence[int]) -> ExactPartition:
+    """Return a partition of S with minimum gap.
+
+    The reachable-sum bitsets after each item are kept, so that the choice of
+    every item can be read backwards from the final sum: if the sum was already
+    reachable without item i, the item is left out, otherwise it is taken.
+    """
+
+    total = sum(values)
+    # Start from the subset of all negative values; weights are |v_i|.
+    base = sum(value for value in values if value < 0)
+    weights = [abs(value) for value in values]
+
+    layers = [1]
+    for weight in weights:
+        layers.append(layers[-1] | (layers[-1] << weight))
+
+    # Best selected sum s minimizes |V - 2 s|; in bitset coordinates s = base + k.
+    target = total // 2 - base
+    candidates = [k for k in _nearest_set_bits(layers[-1], target) if k >= 0]
+    k = min(candidates, key=lambda index: abs(total - 2 * (base + index)))
+    selected_sum = base + k
+
+    taken = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        if (layers[i] >> k) & 1:
+            continue
+        taken[i] = 1
+        k -= weights[i]
+
+    # A negative value is in T unless its removal was "taken".
+    sample = tuple(
+        1 - bit if value < 0 else bit for bit, value in zip(taken, values)
+    )
+
+    return ExactPartition(
+        sample=sample,
+        selected_sum=selected_sum,
+        gap=abs(total - 2 * selected_sum),
+    )
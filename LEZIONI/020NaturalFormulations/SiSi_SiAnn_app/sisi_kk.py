@@ -0,0 +1,236 @@
+################################################################################
+# sisi_kk.py
+#
+# Karmarkar-Karp differencing for SiSi instances.
+#
+# The largest differencing method replaces the two largest numbers a >= b by
+# their difference a - b: this commits a and b to opposite parts without yet
+# deciding which part is which.  After n - 1 steps one number is left, and it
+# is the gap of a partition.  With a heap the method runs in O(n log n) and on
+# random instances it finds gaps many orders of magnitude smaller than random
+# assignments do.
+#
+# The complete variant (CKK) explores the alternative as well: replacing a and
+# b by a + b puts them in the same part.  The search is depth-first, with the
+# differencing branch first, so its first leaf is the plain KK partition; it
+# prunes a node as soon as the largest number is at least the sum of the others,
+# because the best gap below that node is then known.  Here it runs with a node
+# budget and returns the best partition seen.
+#
+# The partitions are used by sisi_solver.py as annealing warm starts and as the
+# baseline answer that annealing has to beat.
+#
+# Negative values are handled through their absolute value: putting |v| on
+# one side is the same as putting v on the other side.
+################################################################################
+
+from __future__ import annotations
+
+import heapq
+from bisect import insort
+from dataclasses import dataclass
+from math import log
+from statistics import median
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+# Default number of CKK nodes explored after the KK leaf.
+CKK_NODE_LIMIT = 2000
+
+# Every CKK node copies its list of numbers, so above this size only the
+# O(n log n) KK partition is computed.
+CKK_MAX_N = 1000
+
+
+@dataclass(frozen=True)
+class DifferencingPartition:
+    """Partition produced by KK or CKK.
+
+    sample:
+        The assignment x_1, ..., x_n, as a tuple of 0/1 values.
+
+    gap:
+        |sum(T) - sum(S \\ T)| for this assignment.
+    """
+
+    sample: tuple[int, ...]
+    gap: int
+
+
+def _sample_from_relations(
+    values: Sequence[int],
+    relations: Sequence[tuple[int, int, bool]],
+) -> tuple[int, ...]:
+    """Turn the differencing decisions into a 0/1 assignment.
+
+    Each relation (i, j, opposite) ties two positions; together they form a
+    spanning tree on 1, ..., n, which is 2-colored by a depth-first visit.
+    Position i with v_i < 0 has its color inverted, see the module comment.
+    """
+
+    n = len(values)
+    neighbors = [[] for _ in range(n)]
+    for i, j, opposite in relations:
+        neighbors[i].append((j, opposite))
+        neighbors[j].append((i, opposite))
+
+    side = [-1] * n
+    for root in range(n):
+        if side[root] != -1:
+            continue
+        side[root] = 0
+        stack = [root]
+        while stack:
+            i = stack.pop()
+            for j, opposite in neighbors[i]:
+                if side[j] == -1:
+                    side[j] = side[i] ^ opposite
+                    stack.append(j)
+
+    return tuple(s ^ 1 if value < 0 else s for s, value in zip(side, values))
+
+
+def karmarkar_karp(values: Sequence[int]) -> DifferencingPartition:
+    """Return the largest differencing partition of S in O(n log n)."""
+
+    if not values:
+        return DifferencingPartition(sample=(), gap=0)
+
+    # heapq is a min-heap: store negated magnitudes.
+    heap = [(-abs(value), index) for index, value in enumerate(values)]
+    heapq.heapify(heap)
+    relations = []
+
+    while len(heap) > 1:
+        largest, i = heapq.heappop(heap)
+        second, j = heapq.heappop(heap)
+        relations.append((i, j, True))
+        # The difference inherits the side of the larger number.
+        heapq.heappush(heap, (largest - second, i))
+
+    return DifferencingPartition(
+        sample=_sample_from_relations(values, relations),
+        gap=-heap[0][0],
+    )
+
+
+def complete_karmarkar_karp(
+    values: Sequence[int],
+    node_limit: int = CKK_NODE_LIMIT,
+) -> DifferencingPartition:
+    """Return the best partition found by CKK within node_limit nodes.
+
+    The first leaf reached is the KK partition, so the result is never worse
+    than karmarkar_karp(values).  If the search finishes within the budget,
+    or reaches gap 0 or 1, the result is optimal.
+    """
+
+    if not values:
+        return DifferencingPartition(sample=(), gap=0)
+
+    best_gap = None
+    best_relations: list = []
+    nodes = 0
+    total_parity = sum(abs(value) for value in values) % 2
+
+    # Each frame: ascending list of (magnitude, index), the remaining total,
+    # and the relations decided so far.
+    stack = [(sorted((abs(value), index) for index, value in enumerate(values)), None, [])]
+
+    while stack and nodes < node_limit:
+        items, remaining, relations = stack.pop()
+        nodes += 1
+        if remaining is None:
+            remaining = sum(magnitude for magnitude, _ in items)
+
+        largest, i = items[-1]
+        rest = remaining - largest
+
+        if len(items) == 1 or largest >= rest:
+            # All the other numbers go against the largest one.
+            gap = largest - rest
+            leaf_relations = relations + [(i, j, True) for _, j in items[:-1]]
+            if best_gap is None or gap < best_gap:
+                best_gap = gap
+                best_relations = leaf_relations
+                if best_gap <= total_parity:
+                    break
+            continue
+
+        second, j = items[-2]
+        others = items[:-2]
+
+        # Summing branch, pushed first so that differencing is explored first.
+        summed = list(others)
+        insort(summed, (largest + second, i))
+        stack.append((summed, remaining, relations + [(i, j, False)]))
+
+        differenced = list(others)
+        insort(differenced, (largest - second, i))
+        stack.append((differenced, remaining - 2 * second, relations + [(i, j, True)]))
+
+    return DifferencingPartition(
+        sample=_sample_from_relations(values, best_relations),
+        gap=best_gap,
+    )
+
+
+def differencing_partition(values: Sequence[int]) -> DifferencingPartition:
+    """Return the CKK partition for n <= CKK_MAX_N, the KK one otherwise."""
+
+    if len(values) <= CKK_MAX_N:
+        return complete_karmarkar_karp(values)
+    return karmarkar_karp(values)
+
+
+def warm_start_states(
+    sample: Sequence[int],
+    num_reads: int,
+    seed: Optional[int] = None,
+    keep_first: bool = True,
+) -> np.ndarray:
+    """Return num_reads initial states built around one partition.
+
+    Each row flips a random set of k positions of the partition, with k uniform
+    in 1, ..., max(1, n // 4).  Small k stay in the basin of the partition,
+    larger k give the anneal some diversity.  With keep_first the first row is
+    the partition itself; the solver asks for it in the first batch only.
+    """
+
+    generator = np.random.default_rng(seed)
+    n = len(sample)
+    states = np.tile(np.asarray(sample, dtype=np.int8), (num_reads, 1))
+
+    if n == 0:
+        return states
+
+    max_flips = max(1, n // 4)
+    for row in range(1 if keep_first else 0, num_reads):
+        flips = generator.choice(n, size=int(generator.integers(1, max_flips + 1)), replace=False)
+        states[row, flips] ^= 1
+
+    return states
+
+
+def warm_beta_range(values: Sequence[int]) -> Optional[tuple[float, float]]:
+    """Return a beta range suited to anneals that start from a good partition.
+
+    The default hot end of neal accepts almost every flip, which erases any
+    initial state within a few sweeps.  Next to a partition with a small gap,
+    flipping v_i costs about 4 v_i^2.  The hot end used here accepts that
+    change with probability one half for the median |v_i|, so the anneal
+    explores around the warm start instead of forgetting it.  The cold end is
+    the usual one: the cheapest such change is accepted with probability
+    1 / 100.  Returns None if all values are zero.
+    """
+
+    magnitudes = [abs(value) for value in values if value != 0]
+    if not magnitudes:
+        return None
+
+    return (
+        log(2) / (4 * median(magnitudes) ** 2),
+        log(100) / (4 * min(magnitudes) ** 2),
+    )
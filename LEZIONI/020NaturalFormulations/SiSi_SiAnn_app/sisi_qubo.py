@@ -25,14 +25,25 @@
 # symbolic Hamiltonian.  In this application the formula has already been
 # derived in the notes, so the BQM is built directly with dimod.  This removes
 # pyqubo as a runtime dependency while preserving exactly the same QUBO model.
+#
+# Two builders are provided:
+#   build_bqm()            adds the coefficients one by one, exactly as they are
+#                          written in the notes;
+#   build_bqm_vectorized() obtains the same coefficients from one NumPy outer
+#                          product, handed to dimod as a dense matrix; it
+#                          needs O(n^2) memory, like the BQM itself.
+# The first one is the readable reference; the second one is the one used by
+# the solver, because the double loop of build_bqm() performs n^2/2 Python-level
+# insertions and dominates the running time once n reaches a few thousand.
 ################################################################################
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, Sequence
+from typing import Iterable, Optional, Sequence
 
 import dimod
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -48,12 +59,14 @@ class SiSiModel:
 
     bqm:
         The dimod BinaryQuadraticModel encoding the Hamiltonian
-        (V - 2 * selected_sum) ** 2.
+        (V - 2 * selected_sum) ** 2, or None when the model is kept implicit
+        because the selected sampler works on the values directly (see
+        sisi_rank_one.py).
     """
 
     values: tuple[int, ...]
     variable_names: tuple[str, ...]
-    bqm: dimod.BinaryQuadraticModel
+    bqm: Optional[dimod.BinaryQuadraticModel]
 
     @property
     def n(self) -> int:
@@ -146,6 +159,84 @@ def build_bqm(values: Sequence[int]) -> SiSiModel:
     return SiSiModel(values=frozen_values, variable_names=variable_names, bqm=bqm)
 
 
+def build_bqm_vectorized(values: Sequence[int]) -> SiSiModel:
+    """Build the same BQM as build_bqm(), with no Python-level work per term.
+
+    The whole QUBO matrix follows from one outer product.  Let v be the vector
+    of values.  dimod adds a dense square matrix M to the quadratic part by
+    summing the entries M_ij and M_ji into the interaction of x_i and x_j.
+    Choosing
+
+        M = 4 v v^T with a zero diagonal,    linear = 4 v^2 - 4 V v,
+
+    therefore gives exactly
+
+        Q_ij = 4 v_i v_j + 4 v_j v_i = 8 v_i v_j        for i < j,
+        Q_ii = 4 v_i^2 - 4 V v_i,
+
+    which are the coefficients of the expanded Hamiltonian.  dimod skips the
+    zero entries of M, whereas build_bqm() also stores the couplings
+    8 * 0 * v_j = 0 of a zero value: those pairs are found with a mask and
+    passed as explicit vectors.  The variables are then relabelled
+    x1, ..., xn, so the returned SiSiModel cannot be distinguished from the
+    one produced by build_bqm().
+
+    Memory is O(n^2): M is a dense n x n float64 matrix, about 800 MB at
+    n = 10^4, released once dimod has copied it into its own adjacency, which
+    is larger still.  Beyond a few thousand values the implicit model of
+    build_implicit_model() is the one to use.
+
+    The coefficients are computed in float64, the bias type used by dimod.  For
+    values whose products exceed 2^53 the rounding may happen before, rather
+    than after, the multiplication; for classroom-size integers the two builders
+    agree exactly.
+    """
+
+    frozen_values = normalize_values(values)
+    total = sum(frozen_values)
+    variable_names = make_variable_names(len(frozen_values))
+
+    n = len(frozen_values)
+    vector = np.asarray(frozen_values, dtype=np.float64)
+    linear = 4.0 * vector * vector - (4.0 * total) * vector
+
+    # Every pair (i, j) with v_i = 0, each pair of two zeros once.
+    zero = vector == 0
+    rows = np.repeat(np.flatnonzero(zero), n)
+    cols = np.tile(np.arange(n), int(zero.sum()))
+    keep = (cols != rows) & ~(zero[cols] & (cols < rows))
+    rows, cols = rows[keep], cols[keep]
+    bqm = dimod.BinaryQuadraticModel.from_numpy_vectors(
+        linear, (rows, cols, np.zeros(len(rows))), total * total, dimod.BINARY
+    )
+
+    # One n x n outer product holds every non-zero quadratic coefficient.
+    quadratic = np.outer(vector, vector)
+    quadratic *= 4.0
+    np.fill_diagonal(quadratic, 0.0)
+    bqm.add_quadratic_from_dense(quadratic)
+    del quadratic
+
+    # dimod labels array-built variables 0, ..., n - 1.
+    bqm.relabel_variables(dict(enumerate(variable_names)), inplace=True)
+
+    return SiSiModel(values=frozen_values, variable_names=variable_names, bqm=bqm)
+
+
+def build_implicit_model(values: Sequence[int]) -> SiSiModel:
+    """Return the SiSiModel of S without building its BQM.
+
+    The rank-one sampler of sisi_rank_one.py computes every energy change from
+    the values and the running gap, so the n(n-1)/2 couplings are never needed.
+    This is what makes sequences with 10^5 or more elements tractable: their
+    dense BQM could not even be allocated.
+    """
+
+    frozen_values = normalize_values(values)
+    variable_names = make_variable_names(len(frozen_values))
+    return SiSiModel(values=frozen_values, variable_names=variable_names, bqm=None)
+
+
 def selected_positions(sample: dict[str, int], variable_names: Sequence[str]) -> tuple[int, ...]:
     """Return the 1-based positions i such that x_i = 1.
 
@@ -0,0 +1,303 @@
+################################################################################
+# sisi_rank_one.py
+#
+# Implicit simulated annealing for SiSi instances.
+#
+# The Hamiltonian of sisi_qubo.py,
+#
+#   H(x_1, ..., x_n) = (V - 2 * selected_sum)^2,
+#
+# is the square of one linear form: as a matrix it has rank one.  Its dense BQM
+# has n(n-1)/2 couplings, but the energy of a state depends only on the gap
+#
+#   g = V - 2 * selected_sum,
+#
+# and flipping x_i changes g by -2 v_i (if x_i goes from 0 to 1) or by +2 v_i
+# (if x_i goes from 1 to 0).  A Metropolis step therefore needs only v_i and the
+# running gap:
+#
+#   delta_i = (g -+ 2 v_i)^2 - g^2,
+#
+# which is O(1) work per proposed flip and O(n) memory for the whole anneal.
+# RankOneSampler exploits this and never materializes the n^2 couplings.  It
+# returns an Ocean SampleSet with the labels x1, ..., xn of sisi_qubo.py, so the
+# solver decodes its output exactly as it decodes the output of neal.
+#
+# Each flip still depends on the gap left by the previous one, so a sweep is
+# sequential.  Where almost every flip, or almost none, is accepted (the hot
+# and cold ends of the schedule), a sweep is run by NumPy blocks that guess the
+# decisions and check them, see _block_sweep; elsewhere it is an interpreted
+# loop.  Both give the same states.
+#
+# Gaps are kept as Python integers, so the energies are exact also for values
+# that would overflow the float64 biases of a dimod BQM; the block sweeps are
+# used only when every gap fits in int64.
+################################################################################
+
+from __future__ import annotations
+
+from itertools import compress
+from math import log
+from typing import Optional, Sequence
+
+import dimod
+import numpy as np
+
+from sisi_qubo import make_variable_names, normalize_values
+
+
+# Smallest and largest block of positions of a speculative sweep.
+BLOCK_MIN = 16
+BLOCK_MAX = 4096
+
+# A sweep runs position by position when the previous one accepted a fraction
+# of the proposed flips strictly between these bounds; see _anneal_one_read.
+SCALAR_ACCEPTANCE = (0.01, 0.99)
+
+
+def default_beta_range(values: Sequence[int]) -> tuple[float, float]:
+    """Return the hot and cold inverse temperatures used by default.
+
+    The rule follows the one used by neal for a generic BQM, specialized to the
+    rank-one Hamiltonian:
+
+      - hot end: a flip of v_i changes the energy by at most
+        4 |v_i| (|v_i| + sum_j |v_j|), because |g| never exceeds sum_j |v_j|.
+        At beta = ln(2) / max_delta even the worst flip is accepted with
+        probability one half, so the first sweeps mix freely;
+
+      - cold end: next to an exact partition (g = 0) the cheapest excitation
+        costs 4 v_i^2 for the smallest non-zero |v_i|.  At
+        beta = ln(100) / min_delta it is accepted with probability 1 / 100.
+    """
+
+    magnitudes = [abs(value) for value in values if value != 0]
+    if not magnitudes:
+        return 1.0, 1.0
+
+    absolute_total = sum(magnitudes)
+    max_delta = max(4 * m * (m + absolute_total) for m in magnitudes)
+    min_delta = 4 * min(magnitudes) ** 2
+
+    return log(2) / max_delta, log(100) / min_delta
+
+
+def _scalar_sweep(doubled: list[int], lower: list[float], state: bytearray, gap: int) -> tuple[int, int]:
+    """One sweep, one interpreted step per position; return the gap and the flips.
+
+    Exact for gaps of any size, since gap stays a Python integer.
+    """
+
+    accepted = 0
+    for i, bound in enumerate(lower):
+        if state[i]:
+            if gap < -bound:
+                state[i] = 0
+                gap += doubled[i]
+                accepted += 1
+                if gap == 0:
+                    break
+        elif gap > bound:
+            state[i] = 1
+            gap -= doubled[i]
+            accepted += 1
+            if gap == 0:
+                break
+    return gap, accepted
+
+
+def _block_sweep(doubled: np.ndarray, lower: np.ndarray, state: np.ndarray, gap: int) -> tuple[int, int]:
+    """The same sweep as _scalar_sweep, done speculatively by NumPy blocks.
+
+    For a block of positions the flips are first decided with the gap at the
+    start of the block; the gaps those decisions lead to are one int64 cumsum,
+    and the decisions are checked again against them.  Up to the first
+    position where the two disagree the speculation was the sequential
+    sweep; that position takes its checked decision and the next block starts
+    after it.  The result is the one of _scalar_sweep, at the cost of a few
+    NumPy calls per disagreement instead of one interpreted step per position.
+    """
+
+    n = len(doubled)
+    accepted = 0
+    start = 0
+    size = BLOCK_MIN
+    while start < n:
+        stop = min(n, start + size)
+        ones = state[start:stop] == 1
+        bound = lower[start:stop]
+        change = np.where(ones, doubled[start:stop], -doubled[start:stop])
+
+        guess = np.where(ones, gap < -bound, gap > bound)
+        after = gap + np.cumsum(np.where(guess, change, 0))
+        before = after - np.where(guess, change, 0)
+        checked = np.where(ones, before < -bound, before > bound)
+
+        wrong = np.flatnonzero(checked != guess)
+        if len(wrong):
+            length = int(wrong[0]) + 1
+            flips = guess[:length].copy()
+            flips[-1] = checked[length - 1]
+            after = before[:length] + np.where(flips, change[:length], 0)
+            size = max(BLOCK_MIN, size // 2)
+        else:
+            length = stop - start
+            flips = guess
+            size = min(BLOCK_MAX, 2 * size)
+
+        zero = np.flatnonzero(flips & (after == 0))
+        if len(zero):
+            length = int(zero[0]) + 1
+            flips = flips[:length]
+        state[start:start + length][flips] ^= 1
+        accepted += int(flips.sum())
+        gap = int(after[length - 1])
+        if gap == 0:
+            break
+        start += length
+    return gap, accepted
+
+
+def _anneal_one_read(
+    magnitudes: list[int],
+    total: int,
+    betas: Sequence[float],
+    generator: np.random.Generator,
+    initial_state: Optional[np.ndarray] = None,
+) -> tuple[bytearray, int]:
+    """Run one annealing read and return its final state and gap.
+
+    magnitudes are the nonnegative values |v_i| and total their sum; the
+    caller maps negative values to this form (see RankOneSampler).  The state
+    is a bytearray, one byte per variable.  For every sweep the uniform random
+    numbers u are drawn at once by NumPy and converted into acceptance
+    thresholds t = -ln(u) / beta.  The Metropolis test delta < t, with
+    delta = 4 v_i (v_i - g) for a flip 0 -> 1 and 4 v_i (v_i + g) for 1 -> 0,
+    is then the single comparison g > b_i or g < -b_i, b_i = v_i - t / (4 v_i).
+    The read stops as soon as the gap is zero, because no state has lower
+    energy.  Without initial_state the read starts from a uniformly random
+    state.
+
+    A sweep runs as _block_sweep when the previous one flipped almost every
+    or almost no position, which makes the speculation right over long
+    stretches, and as _scalar_sweep otherwise.
+    """
+
+    n = len(magnitudes)
+    if initial_state is None:
+        state = bytearray(generator.integers(0, 2, size=n, dtype=np.uint8).tobytes())
+    else:
+        state = bytearray(np.asarray(initial_state, dtype=np.uint8).tobytes())
+    gap = total - 2 * sum(compress(magnitudes, state))
+    doubled = [2 * value for value in magnitudes]
+
+    # Block sweeps keep the gaps in int64: |g| never exceeds total.
+    blocks = 2 * total < 2**62
+    if blocks:
+        array_state = np.frombuffer(state, dtype=np.uint8)
+        array_doubled = np.array(doubled, dtype=np.int64)
+    floats = np.array(magnitudes, dtype=float)
+    quadruple = 4 * floats
+    nonzero = quadruple > 0
+    acceptance = 1.0
+
+    for beta in betas:
+        if gap == 0:
+            break
+
+        # 1 - random() lies in (0, 1], so the logarithm is always finite.
+        thresholds = -np.log1p(-generator.random(n)) / beta
+        # A zero value flips whenever t > 0: b = -inf, or +inf when t = 0.
+        lower = np.where(thresholds > 0, -np.inf, np.inf)
+        quotient = np.divide(thresholds, quadruple, out=np.zeros(n), where=nonzero)
+        np.subtract(floats, quotient, out=lower, where=nonzero)
+
+        low, high = SCALAR_ACCEPTANCE
+        if blocks and not low < acceptance < high:
+            gap, accepted = _block_sweep(array_doubled, lower, array_state, gap)
+        else:
+            gap, accepted = _scalar_sweep(doubled, lower.tolist(), state, gap)
+        acceptance = accepted / n
+
+    return state, gap
+
+
+class RankOneSampler:
+    """Simulated annealing on the implicit rank-one SiSi Hamiltonian.
+
+    The sampler has the same role as neal.SimulatedAnnealingSampler in the
+    solver, but it is given the integer sequence S instead of a BQM.  It keeps
+    only the values, the per-read state, and the running gap.
+
+    The schedule is geometric in beta, one value per sweep, as in neal's
+    default; each sweep proposes one flip for every position, in order.
+    """
+
+    parameters = {
+        'num_reads': [],
+        'num_sweeps': [],
+        'beta_range': [],
+        'seed': [],
+        'initial_states': [],
+    }
+
+    properties: dict = {}
+
+    def sample_values(
+        self,
+        values: Sequence[int],
+        num_reads: int = 1,
+        num_sweeps: int = 1000,
+        beta_range: Optional[tuple[float, float]] = None,
+        seed: Optional[int] = None,
+        initial_states: Optional[np.ndarray] = None,
+    ) -> dimod.SampleSet:
+        """Anneal the SiSi instance S and return a dimod SampleSet.
+
+        The SampleSet uses the variable labels x1, ..., xn of sisi_qubo.py and
+        the energies (V - 2 * selected_sum) ** 2, that is, the energies that the
+        dense BQM would assign to the same states.
+
+        initial_states, if given, is a (num_reads, n) array of 0/1 values: read
+        r starts from row r instead of a random state.
+        """
+
+        frozen_values = normalize_values(values)
+        if num_reads < 1:
+            raise ValueError('num_reads must be positive')
+        if num_sweeps < 1:
+            raise ValueError('num_sweeps must be positive')
+        expected_shape = (num_reads, len(frozen_values))
+        if initial_states is not None and np.shape(initial_states) != expected_shape:
+            raise ValueError('initial_states must have shape (num_reads, n)')
+
+        if beta_range is None:
+            beta_range = default_beta_range(frozen_values)
+        hot_beta, cold_beta = beta_range
+        betas = np.geomspace(hot_beta, cold_beta, num=num_sweeps).tolist()
+
+        # g = sum_i v_i (1 - 2 x_i): a negative v_i with state x_i is |v_i|
+        # with state 1 - x_i, so the reads anneal the magnitudes.
+        magnitudes = [abs(value) for value in frozen_values]
+        negative = np.array([value < 0 for value in frozen_values], dtype=np.int8)
+        total = sum(magnitudes)
+        generator = np.random.default_rng(seed)
+
+        n = len(magnitudes)
+        samples = np.empty((num_reads, n), dtype=np.int8)
+        energies = []
+
+        for read in range(num_reads):
+            initial_state = None
+            if initial_states is not None:
+                initial_state = np.asarray(initial_states[read], dtype=np.int8) ^ negative
+            state, gap = _anneal_one_read(magnitudes, total, betas, generator, initial_state)
+            samples[read] = np.frombuffer(bytes(state), dtype=np.int8) ^ negative
+            energies.append(float(gap * gap))
+
+        return dimod.SampleSet.from_samples(
+            (samples, make_variable_names(n)),
+            vartype=dimod.BINARY,
+            energy=energies,
+            info={'beta_range': (hot_beta, cold_beta)},
+        )
@@ -3,24 +3,76 @@
 #
 # Simulated-annealing search for SiSi instances.
 #
-# The solver uses neal.SimulatedAnnealingSampler on the BQM built in sisi_qubo.py.
+# Two backends are available:
+#   neal      neal.SimulatedAnnealingSampler on the dense BQM built by
+#             sisi_qubo.build_bqm_vectorized();
+#   rank_one  the implicit sampler of sisi_rank_one.py, which works on the
+#             values directly and never builds the n^2 couplings.
 # The annealing parameters are supplied by sisi_tuning.py and therefore depend
-# only on n = len(S).  The solver then runs the requested reads in batches and
-# stops early if a zero-energy partition has already been found.
+# only on n = len(S) and on the backend.  The solver then runs the requested
+# reads in batches and stops early if a zero-energy partition has already been
+# found.
+#
+# With workers > 1 the batches are spread over a process pool.  Each worker
+# receives the BQM (or the values, for the rank-one backend) once, when it
+# starts, and then only batch indices.  Batch i still uses the seed seed + i,
+# and the answer is folded over the batches 0, ..., k in order, where k is the
+# first batch that found gap 0: the result is the one of the sequential run.
+#
+# Before annealing, the cost model of sisi_exact.py may decide that the exact
+# subset-sum dynamic program is cheaper than even one annealing batch.  In that
+# case the instance is solved exactly, without building the BQM, and an even
+# sum with no exact partition is reported as proven impossible.
+#
+# Otherwise, by default, the Karmarkar-Karp differencing partition of
+# sisi_kk.py is computed first.  It is returned at once if its gap is zero;
+# if not, it is the baseline answer that annealing has to beat, and the reads
+# start from it and from random perturbations of it instead of from random
+# states.
+#
+# With profile='adaptive' the batches are not planned in advance: after each
+# batch sisi_adaptive.AdaptiveController looks at its energies and chooses the
+# reads and sweeps of the next one, or stops.  These batches depend on each
+# other, so they always run in sequence.
+#
+# With a sisi_cache.SiSiCache the solver first looks the instance up, in any
+# order of its values.  A final entry (gap 0, or a gap proven minimal) is
+# returned without building a model; any other entry competes with the
+# Karmarkar-Karp partition as warm start.  Every answer is then stored back.
 ################################################################################
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from math import isclose
 from typing import Optional, Sequence
 
+import numpy as np
 from neal import SimulatedAnnealingSampler
 
-from sisi_qubo import SiSiModel, build_bqm, partition_from_sample
+from sisi_adaptive import AdaptiveController, BatchObservation
+from sisi_cache import SiSiCache
+
+from sisi_exact import exact_partition, prefer_exact
+from sisi_kk import differencing_partition, warm_beta_range, warm_start_states
+from sisi_qubo import (
+    SiSiModel,
+    build_bqm_vectorized,
+    build_implicit_model,
+    normalize_values,
+    partition_from_sample,
+)
+from sisi_rank_one import RankOneSampler
 from sisi_tuning import AnnealingParameters, tune_annealing_parameters
 
 
+BACKENDS = ('neal', 'rank_one')
+EXACT_POLICIES = ('auto', 'always', 'never')
+
+
 @dataclass(frozen=True)
 class SiSiAnswer:
     """Decoded form of the best state found by the annealer.
@@ -63,6 +115,34 @@ class SiSiAnswer:
         return self.gap == 0
 
 
+@dataclass(frozen=True)
+class SiSiTimings:
+    """Wall-clock seconds spent in the phases of one solver run.
+
+    build:
+        Construction of the model (the dense BQM, or the implicit model).
+
+    sample:
+        Annealing, or the exact dynamic program.  With workers > 1 this is the
+        wall time of the process pool, which also includes the decoding done
+        inside the workers.
+
+    decode:
+        Translation of the SampleSets into SiSiAnswer objects in the calling
+        process.
+    """
+
+    build: float = 0.0
+    sample: float = 0.0
+    decode: float = 0.0
+
+    @property
+    def total(self) -> float:
+        """Return the sum of the three phases."""
+
+        return self.build + self.sample + self.decode
+
+
 @dataclass(frozen=True)
 class SiSiRunResult:
     """Complete result returned by the application core.
@@ -70,6 +150,17 @@ class SiSiRunResult:
     The entry point prints this object, but does not solve the problem itself.
     Keeping the result in a dataclass separates computation from presentation
     and makes the solver reusable in notebooks or tests.
+
+    engine is 'anneal', 'dp' (the exact program of sisi_exact.py), 'kk' when
+    the differencing partition of sisi_kk.py was already exact, 'cache' when
+    a final answer was found in the result cache, or 'parity' when the parity
+    filter settled the instance.  When the program finds no
+    exact partition of an even-sum instance, proven_impossible_by_dp is True
+    and best_answer has the minimum gap.
+
+    With the adaptive profile the batches have different numbers of sweeps:
+    read_sweeps_used then holds the work actually spent, and adaptive_history
+    what the controller observed after each batch.
     """
 
     model: SiSiModel
@@ -78,6 +169,17 @@ class SiSiRunResult:
     reads_used: int
     batches_used: int
     proven_impossible_by_parity: bool
+    timings: SiSiTimings = field(default_factory=SiSiTimings)
+    engine: str = 'anneal'
+    proven_impossible_by_dp: bool = False
+    read_sweeps_used: Optional[int] = None
+    adaptive_history: tuple[BatchObservation, ...] = ()
+
+    @property
+    def proven_impossible(self) -> bool:
+        """Return True when no exact partition exists, by parity or by the DP."""
+
+        return self.proven_impossible_by_parity or self.proven_impossible_by_dp
 
     @property
     def annealing_work_used(self) -> int:
@@ -87,6 +189,8 @@ class SiSiRunResult:
         solver stops early once a zero-energy partition has been found.
         """
 
+        if self.read_sweeps_used is not None:
+            return self.read_sweeps_used
         return self.reads_used * self.parameters.num_sweeps
 
     @property
@@ -132,6 +236,30 @@ def _decode_best_answer(model: SiSiModel, sampleset) -> SiSiAnswer:
     )
 
 
+def _answer_from_assignment(model: SiSiModel, bits: Sequence[int]) -> SiSiAnswer:
+    """Decode an assignment computed without sampling, e.g. by the DP or KK.
+
+    The energy is the one the BQM would assign, gap ** 2.
+    """
+
+    sample = dict(zip(model.variable_names, bits))
+    selected, complement, selected_sum, complement_sum, gap = partition_from_sample(
+        model.values,
+        model.variable_names,
+        sample,
+    )
+    return SiSiAnswer(
+        sample=sample,
+        energy=float(gap * gap),
+        num_occurrences=1,
+        selected_values=selected,
+        complement_values=complement,
+        selected_sum=selected_sum,
+        complement_sum=complement_sum,
+        gap=gap,
+    )
+
+
 def _better_answer(candidate: SiSiAnswer, current: Optional[SiSiAnswer]) -> SiSiAnswer:
     """Return the better of two decoded answers.
 
@@ -152,30 +280,384 @@ def _better_answer(candidate: SiSiAnswer, current: Optional[SiSiAnswer]) -> SiSi
     return current
 
 
+def _batch_plan(parameters: AnnealingParameters) -> list[int]:
+    """Return the number of reads of each batch, in batch order.
+
+    Every batch has reads_per_batch reads except possibly the last one, which
+    takes the remainder.  Batch i is always sampled with seed + i, whichever
+    process runs it.
+    """
+
+    plan = []
+    remaining_reads = parameters.num_reads
+    while remaining_reads > 0:
+        batch_reads = min(parameters.reads_per_batch, remaining_reads)
+        plan.append(batch_reads)
+        remaining_reads -= batch_reads
+    return plan
+
+
+def _batch_energies(sampleset) -> np.ndarray:
+    """Return the energy of every read of a SampleSet, one entry per read."""
+
+    record = sampleset.record
+    return np.repeat(record.energy, record.num_occurrences)
+
+
+def _sample_batch(
+    sampler,
+    model: SiSiModel,
+    backend: str,
+    batch_index: int,
+    batch_reads: int,
+    num_sweeps: int,
+    seed: Optional[int],
+    warm_sample: Optional[Sequence[int]] = None,
+    interrupt_function=None,
+):
+    """Run one batch of reads and return the raw SampleSet.
+
+    This is the only place where the two backends differ: neal samples the
+    BQM, the rank-one sampler samples the values.
+
+    With warm_sample the reads start from perturbations of that assignment,
+    generated from seed + batch_index like the anneal itself, and use the
+    colder beta range of sisi_kk.warm_beta_range().
+    """
+
+    sample_kwargs = {
+        'num_reads': batch_reads,
+        'num_sweeps': num_sweeps,
+    }
+    if seed is not None:
+        # Use a deterministic but different seed per batch.  This avoids
+        # repeating the same pseudo-random batch while keeping the whole run
+        # reproducible from one user-provided seed.
+        sample_kwargs['seed'] = seed + batch_index
+
+    if warm_sample is not None:
+        states = warm_start_states(
+            warm_sample,
+            batch_reads,
+            seed=None if seed is None else seed + batch_index,
+            keep_first=batch_index == 0,
+        )
+        beta_range = warm_beta_range(model.values)
+        if beta_range is not None:
+            sample_kwargs['beta_range'] = beta_range
+        if backend == 'rank_one':
+            sample_kwargs['initial_states'] = states
+        else:
+            sample_kwargs['initial_states'] = (states, model.variable_names)
+
+    if backend == 'rank_one':
+        return sampler.sample_values(model.values, **sample_kwargs)
+
+    if interrupt_function is not None:
+        sample_kwargs['interrupt_function'] = interrupt_function
+    return sampler.sample(model.bqm, **sample_kwargs)
+
+
+################################################################################
+# Process-pool workers.
+#
+# The worker state is filled once per process by _init_batch_worker(), so the
+# model travels to each worker exactly once.  The shared integer stop_batch
+# holds the smallest index of a batch known to have found gap 0; batches with a
+# larger index are not needed any more and are skipped or interrupted.
+################################################################################
+_WORKER_STATE: dict = {}
+
+
+def _init_batch_worker(
+    model: SiSiModel,
+    backend: str,
+    warm_sample: Optional[Sequence[int]],
+    stop_batch,
+) -> None:
+    """Store the model, a sampler, and the shared stop index in the worker."""
+
+    _WORKER_STATE['model'] = model
+    _WORKER_STATE['backend'] = backend
+    _WORKER_STATE['warm_sample'] = warm_sample
+    _WORKER_STATE['stop_batch'] = stop_batch
+    _WORKER_STATE['sampler'] = (
+        RankOneSampler() if backend == 'rank_one' else SimulatedAnnealingSampler()
+    )
+
+
+def _run_batch_in_worker(
+    batch_index: int,
+    batch_reads: int,
+    num_sweeps: int,
+    seed: Optional[int],
+) -> Optional[SiSiAnswer]:
+    """Sample and decode one batch in a worker process.
+
+    Returns None if the batch was skipped or interrupted because an earlier
+    batch had already found an exact partition.
+    """
+
+    stop_batch = _WORKER_STATE['stop_batch']
+    if stop_batch.value < batch_index:
+        return None
+
+    def interrupted() -> bool:
+        return stop_batch.value < batch_index
+
+    model = _WORKER_STATE['model']
+    sampleset = _sample_batch(
+        _WORKER_STATE['sampler'],
+        model,
+        _WORKER_STATE['backend'],
+        batch_index,
+        batch_reads,
+        num_sweeps,
+        seed,
+        warm_sample=_WORKER_STATE['warm_sample'],
+        interrupt_function=interrupted,
+    )
+    if interrupted():
+        return None
+
+    answer = _decode_best_answer(model, sampleset)
+    if answer.exact_partition_found:
+        with stop_batch.get_lock():
+            stop_batch.value = min(stop_batch.value, batch_index)
+    return answer
+
+
+def _run_batches_in_parallel(
+    model: SiSiModel,
+    backend: str,
+    parameters: AnnealingParameters,
+    plan: list[int],
+    seed: Optional[int],
+    workers: int,
+    warm_sample: Optional[Sequence[int]],
+) -> dict[int, SiSiAnswer]:
+    """Run the batch plan over a process pool and return the useful answers.
+
+    All batches are submitted at once.  As soon as a worker reports gap 0 in
+    batch k, the shared stop index becomes k: queued batches after k are
+    skipped, and running ones are interrupted between two reads.  Batches
+    before k keep running, because the sequential solver would have run them
+    too.  The returned dictionary maps batch indices 0, ..., k to their
+    decoded answers.
+    """
+
+    context = multiprocessing.get_context()
+    stop_batch = context.Value('q', len(plan))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_batch_worker,
+        initargs=(model, backend, warm_sample, stop_batch),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_batch_in_worker,
+                batch_index,
+                batch_reads,
+                parameters.num_sweeps,
+                seed,
+            )
+            for batch_index, batch_reads in enumerate(plan)
+        ]
+        answers = {}
+        for batch_index, future in enumerate(futures):
+            if batch_index > stop_batch.value:
+                future.cancel()
+                continue
+            answer = future.result()
+            if answer is not None:
+                answers[batch_index] = answer
+
+    last_batch = min(stop_batch.value, len(plan) - 1)
+    return {index: answers[index] for index in range(last_batch + 1)}
+
+
+def _remember(
+    cache: Optional[SiSiCache],
+    seed: Optional[int],
+    result: SiSiRunResult,
+) -> SiSiRunResult:
+    """Store the answer of result in cache, if any, and return result."""
+
+    answer = result.best_answer
+    if cache is not None and answer is not None:
+        cache.store(
+            result.model.values,
+            result.parameters.profile,
+            seed,
+            [answer.sample[name] for name in result.model.variable_names],
+            answer.gap,
+            final=answer.exact_partition_found or result.proven_impossible_by_dp,
+        )
+    return result
+
+
+def _solve_adaptively(
+    model: SiSiModel,
+    backend: str,
+    parameters: AnnealingParameters,
+    seed: Optional[int],
+    warm_sample: Optional[Sequence[int]],
+    best_answer: Optional[SiSiAnswer],
+    timings: SiSiTimings,
+) -> SiSiRunResult:
+    """Run batches chosen one at a time by an AdaptiveController.
+
+    best_answer is the Karmarkar-Karp baseline, or None: the controller starts
+    from its energy, so a batch counts as an improvement only if it beats it.
+    timings holds the time already spent on the build and on the baseline.
+    """
+
+    sampler = RankOneSampler() if backend == 'rank_one' else SimulatedAnnealingSampler()
+    controller = AdaptiveController(parameters)
+    if best_answer is not None:
+        controller.best_energy = best_answer.energy
+
+    reads_used = 0
+    batches_used = 0
+    sample_seconds = timings.sample
+    decode_seconds = 0.0
+
+    while (batch := controller.next_batch()) is not None:
+        batch_reads, num_sweeps = batch
+
+        start = time.perf_counter()
+        sampleset = _sample_batch(
+            sampler,
+            model,
+            backend,
+            batches_used,
+            batch_reads,
+            num_sweeps,
+            seed,
+            warm_sample=warm_sample,
+        )
+        sample_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        candidate = _decode_best_answer(model, sampleset)
+        best_answer = _better_answer(candidate, best_answer)
+        controller.observe(_batch_energies(sampleset), num_sweeps)
+        decode_seconds += time.perf_counter() - start
+
+        reads_used += batch_reads
+        batches_used += 1
+        if best_answer.exact_partition_found:
+            break
+
+    return SiSiRunResult(
+        model=model,
+        parameters=parameters,
+        best_answer=best_answer,
+        reads_used=reads_used,
+        batches_used=batches_used,
+        proven_impossible_by_parity=False,
+        timings=SiSiTimings(
+            build=timings.build,
+            sample=sample_seconds,
+            decode=decode_seconds,
+        ),
+        read_sweeps_used=controller.spent,
+        adaptive_history=tuple(controller.history),
+    )
+
+
 def solve_sisi_instance(
     values: Sequence[int],
     profile: str = 'balanced',
     seed: Optional[int] = None,
     use_parity_filter: bool = True,
+    backend: str = 'neal',
+    workers: int = 1,
+    exact: str = 'auto',
+    warm_start: bool = True,
+    cache: Optional[SiSiCache] = None,
 ) -> SiSiRunResult:
     """Solve one SiSi instance by size-tuned simulated annealing.
 
     The function is the application core:
 
-      1. build the BQM for S;
-      2. choose num_reads and num_sweeps from n only;
+      1. choose num_reads and num_sweeps from n only;
+      2. build the BQM for S, unless the engine or backend keeps it implicit;
       3. optionally stop immediately if sum(S) is odd;
-      4. run neal in batches;
+      4. run the exact program if it is cheaper, or the sampler in batches;
       5. stop early if a zero-energy partition is found;
       6. return a decoded result.
 
     The optional parity filter is not a tuning rule.  It is a mathematical
     shortcut: if sum(S) is odd, no integer partition can split S into two equal
     sums, so the application can stop before sampling.
+
+    backend is 'neal' for the dense BQM or 'rank_one' for the implicit sampler
+    of sisi_rank_one.py, the only choice for sequences whose dense BQM would not
+    fit in memory.
+
+    workers > 1 runs the batches on a process pool with a cooperative early
+    stop.  With a fixed seed the result, including reads_used and
+    batches_used, is the same as with workers = 1; reads spent speculatively on
+    batches after the first exact one are discarded and not counted.
+
+    exact chooses when the dynamic program of sisi_exact.py replaces
+    annealing: 'auto' follows its cost model, 'always' and 'never' force the
+    choice.  The annealing parameters are still selected and reported, so that
+    the printed output stays comparable.
+
+    warm_start enables the Karmarkar-Karp baseline and warm starts; with
+    warm_start = False every read starts from a random state, as neal does by
+    default.
+
+    profile = 'adaptive' replaces the fixed batch plan with the feedback loop
+    of sisi_adaptive.py.  Its batches run in sequence whatever workers is.
+
+    cache, a sisi_cache.SiSiCache, makes answers persistent across calls and
+    processes: a final entry for the same multiset, profile and seed is
+    returned with engine 'cache'; a non-final one is used as warm start.
     """
 
-    model = build_bqm(values)
-    parameters = tune_annealing_parameters(model.n, profile=profile)
+    if backend not in BACKENDS:
+        raise ValueError("unknown backend: expected 'neal' or 'rank_one'")
+    if workers < 1:
+        raise ValueError('workers must be positive')
+    if exact not in EXACT_POLICIES:
+        raise ValueError("unknown exact policy: expected 'auto', 'always', or 'never'")
+
+    frozen_values = normalize_values(values)
+    parameters = tune_annealing_parameters(len(frozen_values), profile=profile, backend=backend)
+    cached = None if cache is None else cache.lookup(frozen_values, parameters.profile, seed)
+
+    if cached is not None and cached.final:
+        start = time.perf_counter()
+        model = build_implicit_model(frozen_values)
+        build_seconds = time.perf_counter() - start
+        answer = _answer_from_assignment(model, cached.sample)
+        return SiSiRunResult(
+            model=model,
+            parameters=parameters,
+            best_answer=answer,
+            reads_used=0,
+            batches_used=0,
+            proven_impossible_by_parity=False,
+            timings=SiSiTimings(build=build_seconds),
+            engine='cache',
+            proven_impossible_by_dp=not answer.exact_partition_found,
+        )
+
+    use_exact = exact == 'always' or (
+        exact == 'auto' and prefer_exact(frozen_values, parameters, backend)
+    )
+
+    start = time.perf_counter()
+    if use_exact or backend == 'rank_one':
+        model = build_implicit_model(frozen_values)
+    else:
+        model = build_bqm_vectorized(frozen_values)
+    build_seconds = time.perf_counter() - start
 
     if use_parity_filter and model.total % 2 != 0:
         return SiSiRunResult(
@@ -185,44 +667,123 @@ def solve_sisi_instance(
             reads_used=0,
             batches_used=0,
             proven_impossible_by_parity=True,
+            timings=SiSiTimings(build=build_seconds),
+            engine='parity',
         )
 
-    sampler = SimulatedAnnealingSampler()
+    if use_exact:
+        start = time.perf_counter()
+        answer = _answer_from_assignment(model, exact_partition(model.values).sample)
+        return _remember(cache, seed, SiSiRunResult(
+            model=model,
+            parameters=parameters,
+            best_answer=answer,
+            reads_used=0,
+            batches_used=0,
+            proven_impossible_by_parity=False,
+            timings=SiSiTimings(build=build_seconds, sample=time.perf_counter() - start),
+            engine='dp',
+            proven_impossible_by_dp=not answer.exact_partition_found,
+        ))
+
+    plan = _batch_plan(parameters)
     best_answer: Optional[SiSiAnswer] = None
+    warm_sample: Optional[tuple[int, ...]] = None
     reads_used = 0
     batches_used = 0
+    sample_seconds = 0.0
+    decode_seconds = 0.0
+
+    if warm_start:
+        start = time.perf_counter()
+        partition = differencing_partition(model.values)
+        warm_sample = partition.sample
+        if cached is not None and cached.gap < partition.gap:
+            warm_sample = cached.sample
+        best_answer = _answer_from_assignment(model, warm_sample)
+        sample_seconds = time.perf_counter() - start
 
-    while reads_used < parameters.num_reads:
-        remaining_reads = parameters.num_reads - reads_used
-        batch_reads = min(parameters.reads_per_batch, remaining_reads)
-
-        sample_kwargs = {
-            'num_reads': batch_reads,
-            'num_sweeps': parameters.num_sweeps,
-        }
-        if seed is not None:
-            # Use a deterministic but different seed per batch.  This avoids
-            # repeating the same pseudo-random batch while keeping the whole run
-            # reproducible from one user-provided seed.
-            sample_kwargs['seed'] = seed + batches_used
-
-        sampleset = sampler.sample(model.bqm, **sample_kwargs)
-        candidate = _decode_best_answer(model, sampleset)
-        best_answer = _better_answer(candidate, best_answer)
-
-        reads_used += batch_reads
-        batches_used += 1
-
-        # Energy 0 is an actual solution of the decision problem, so spending
-        # the remaining reads would only look for additional equivalent answers.
         if best_answer.exact_partition_found:
-            break
-
-    return SiSiRunResult(
+            return _remember(cache, seed, SiSiRunResult(
+                model=model,
+                parameters=parameters,
+                best_answer=best_answer,
+                reads_used=0,
+                batches_used=0,
+                proven_impossible_by_parity=False,
+                timings=SiSiTimings(build=build_seconds, sample=sample_seconds),
+                engine='kk',
+            ))
+
+    if parameters.profile == 'adaptive':
+        return _remember(cache, seed, _solve_adaptively(
+            model,
+            backend,
+            parameters,
+            seed,
+            warm_sample,
+            best_answer,
+            SiSiTimings(build=build_seconds, sample=sample_seconds),
+        ))
+
+    if workers > 1 and len(plan) > 1:
+        start = time.perf_counter()
+        answers = _run_batches_in_parallel(
+            model,
+            backend,
+            parameters,
+            plan,
+            seed,
+            workers,
+            warm_sample,
+        )
+        sample_seconds += time.perf_counter() - start
+        for batch_index, candidate in answers.items():
+            best_answer = _better_answer(candidate, best_answer)
+            reads_used += plan[batch_index]
+            batches_used += 1
+
+    else:
+        sampler = RankOneSampler() if backend == 'rank_one' else SimulatedAnnealingSampler()
+
+        for batch_index, batch_reads in enumerate(plan):
+            start = time.perf_counter()
+            sampleset = _sample_batch(
+                sampler,
+                model,
+                backend,
+                batch_index,
+                batch_reads,
+                parameters.num_sweeps,
+                seed,
+                warm_sample=warm_sample,
+            )
+            sample_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            candidate = _decode_best_answer(model, sampleset)
+            best_answer = _better_answer(candidate, best_answer)
+            decode_seconds += time.perf_counter() - start
+
+            reads_used += batch_reads
+            batches_used += 1
+
+            # Energy 0 is an actual solution of the decision problem, so
+            # spending the remaining reads would only look for additional
+            # equivalent answers.
+            if best_answer.exact_partition_found:
+                break
+
+    return _remember(cache, seed, SiSiRunResult(
         model=model,
         parameters=parameters,
         best_answer=best_answer,
         reads_used=reads_used,
         batches_used=batches_used,
         proven_impossible_by_parity=False,
-    )
+        timings=SiSiTimings(
+            build=build_seconds,
+            sample=sample_seconds,
+            decode=decode_seconds,
+        ),
+    ))
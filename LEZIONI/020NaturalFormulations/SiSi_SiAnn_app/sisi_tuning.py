@@ -17,6 +17,21 @@
 #   instance.  The actual difficulty also depends on the values in S.  Therefore
 #   the rules below are not a proof of optimality.  They are cost profiles:
 #   deterministic policies that allocate a bounded annealing budget as n grows.
+#
+# The rules depend on the backend as well.  The neal rules below were chosen for
+# the dense BQM, where n stays in the hundreds or low thousands.  The implicit
+# rank-one sampler of sisi_rank_one.py is meant for sequences with 10^5 or more
+# elements, where the same rules would ask for millions of reads, each of
+# millions of sweeps.  Its sweeps grow only logarithmically in n: a rank-one read
+# stops by itself as soon as it reaches gap 0, and long sequences of random
+# values are typically in the easy regime of Number Partitioning, with many
+# exact partitions.  Its reads are also capped by a time budget per profile,
+# RANK_ONE_BUDGET_SECONDS, converted with the measured cost of one position in
+# one sweep, RANK_ONE_SECONDS_PER_FLIP.
+#
+# The 'adaptive' profile starts from the 'balanced' rule, but the solver then
+# lets sisi_adaptive.AdaptiveController move the budget between reads and
+# sweeps after every batch, from the energies that the batch returned.
 ################################################################################
 
 from __future__ import annotations
@@ -86,18 +101,86 @@ def _round_up(value: float, step: int) -> int:
     return max(step, int(ceil(value / step) * step))
 
 
-def tune_annealing_parameters(n: int, profile: str = 'balanced') -> AnnealingParameters:
+PROFILES = ('classroom', 'balanced', 'aggressive', 'adaptive')
+
+# Seconds per proposed flip of sisi_rank_one.py, measured on random 30-bit
+# values with n = 10^5 and the default beta range (one read of 220 sweeps takes
+# about 5 s).  Warm-started reads, with their colder range, are cheaper.
+RANK_ONE_SECONDS_PER_FLIP = 2.5e-7
+
+# Annealing time of a cold-started rank-one run, per profile.
+RANK_ONE_BUDGET_SECONDS = {
+    'classroom': 10.0,
+    'balanced': 60.0,
+    'adaptive': 60.0,
+    'aggressive': 300.0,
+}
+
+
+def _tune_rank_one_parameters(n: int, log_factor: float, profile: str) -> AnnealingParameters:
+    """Return the logarithmic rules used by the rank-one backend.
+
+    A rank-one sweep costs O(n) instead of the O(n^2) of a dense sweep, so for
+    the 10^5-10^6 element sequences this backend is meant for the reads are
+    capped at what fits in RANK_ONE_BUDGET_SECONDS: at n = 10^5 the balanced
+    profile runs 10 reads instead of 50, at n = 10^6 a single one.  Batches
+    are small because on such sequences a single read costs seconds and often
+    already reaches gap 0.
+    """
+
+    if profile == 'classroom':
+        num_reads = _round_up(log_factor + 4, 5)
+        num_sweeps = _round_up(4 * log_factor + 20, 10)
+        reads_per_batch = min(num_reads, 2)
+
+    elif profile in ('balanced', 'adaptive'):
+        num_reads = _round_up(2 * log_factor + 10, 10)
+        num_sweeps = _round_up(10 * log_factor + 50, 10)
+        reads_per_batch = min(num_reads, 4)
+
+    elif profile == 'aggressive':
+        num_reads = _round_up(4 * log_factor + 20, 10)
+        num_sweeps = _round_up(25 * log_factor + 100, 10)
+        reads_per_batch = min(num_reads, 8)
+
+    else:
+        raise ValueError(
+            "unknown profile: expected 'classroom', 'balanced', 'aggressive', or 'adaptive'"
+        )
+
+    read_seconds = num_sweeps * n * RANK_ONE_SECONDS_PER_FLIP
+    num_reads = max(1, min(num_reads, int(RANK_ONE_BUDGET_SECONDS[profile] // read_seconds)))
+    reads_per_batch = min(reads_per_batch, num_reads)
+
+    return AnnealingParameters(
+        num_reads=num_reads,
+        num_sweeps=num_sweeps,
+        reads_per_batch=reads_per_batch,
+        profile=profile,
+    )
+
+
+def tune_annealing_parameters(
+    n: int,
+    profile: str = 'balanced',
+    backend: str = 'neal',
+) -> AnnealingParameters:
     """Return simulated-annealing parameters determined only by n.
 
     The profiles express three different teaching/application choices:
 
       - classroom: small output and low cost;
       - balanced: default compromise between exploration and relaxation;
-      - aggressive: higher cost, useful when one wants a stronger heuristic run.
+      - aggressive: higher cost, useful when one wants a stronger heuristic run;
+      - adaptive: the 'balanced' parameters, used by the solver only as the
+        first batch and as the total budget of sisi_adaptive.py.
 
     The same n always gives the same parameters.  No value from S is inspected in
     this function.  This is intentional: the module demonstrates what a pure
     size-based tuning rule can and cannot do.
+
+    backend selects the family of rules: 'neal' for the dense BQM, 'rank_one'
+    for the implicit sampler of sisi_rank_one.py.
     """
 
     if n < 0:
@@ -109,6 +192,11 @@ def tune_annealing_parameters(n: int, profile: str = 'balanced') -> AnnealingPar
     effective_n = max(1, n)
     log_factor = max(1.0, log2(effective_n + 1))
 
+    if backend == 'rank_one':
+        return _tune_rank_one_parameters(effective_n, log_factor, profile)
+    if backend != 'neal':
+        raise ValueError("unknown backend: expected 'neal' or 'rank_one'")
+
     if profile == 'classroom':
         # Keep the transcript short.  This is enough for tiny examples, but it
         # is not meant as a serious search policy for larger instances.
@@ -116,7 +204,7 @@ def tune_annealing_parameters(n: int, profile: str = 'balanced') -> AnnealingPar
         num_sweeps = _round_up(8 * effective_n * log_factor + 20, 10)
         reads_per_batch = min(num_reads, 10)
 
-    elif profile == 'balanced':
+    elif profile in ('balanced', 'adaptive'):
         # Default policy.  Reads grow roughly linearly in n, while sweeps grow as
         # n log n.  The product gives a modest polynomial budget.
         num_reads = _round_up(6 * effective_n + 20, 10)
@@ -133,7 +221,7 @@ def tune_annealing_parameters(n: int, profile: str = 'balanced') -> AnnealingPar
 
     else:
         raise ValueError(
-            "unknown profile: expected 'classroom', 'balanced', or 'aggressive'"
+            "unknown profile: expected 'classroom', 'balanced', 'aggressive', or 'adaptive'"
         )
 
     return AnnealingParameters(
@@ -20,12 +20,17 @@ v1, v2, v3, v4, v5 = Binary('v1'), Binary('v2'), Binary('v3'), Binary('v4'), Bin
 ham_obiettivo  = v1 + v2 + v3 + v4 + v5
 
 # Elenco dei polinomi penalità con cui estenderemo l'Hamiltoniano.
-ham_penalita   = Constraint(1 - v1 - v2 + v1*v2, label="constr0")
-ham_penalita  += Constraint(1 - v2 - v3 + v2*v3, label="constr1") 
-ham_penalita  += Constraint(1 - v3 - v4 + v3*v4, label="constr2") 
-ham_penalita  += Constraint(1 - v4 - v1 + v4*v1, label="constr3") 
-ham_penalita  += Constraint(1 - v3 - v5 + v3*v5, label="constr4") 
-ham_penalita  += Constraint(1 - v4 - v5 + v4*v5, label="constr5") 
+# Il dizionario etichetta -> polinomio serve anche, più sotto, per
+# verificare i vincoli su tutto il sampleset in un colpo solo.
+vincoli = {
+    "constr0": 1 - v1 - v2 + v1*v2,
+    "constr1": 1 - v2 - v3 + v2*v3,
+    "constr2": 1 - v3 - v4 + v3*v4,
+    "constr3": 1 - v4 - v1 + v4*v1,
+    "constr4": 1 - v3 - v5 + v3*v5,
+    "constr5": 1 - v4 - v5 + v4*v5,
+}
+ham_penalita = sum(Constraint(polinomio, label=etichetta) for etichetta, polinomio in vincoli.items())
 
 # Una possibile istanza corretta del Lagrangiano.
 L = 2
@@ -53,16 +58,18 @@ print(" -- bqm (componenti quadratiche): ", bqm.quadratic)    # quadratiche
 print(" -- bqm (--->> OFFSET): ", bqm.offset)                 # scostamento costante da 0?
 
 ####################################################################
-# Campionamento con ExactSolver (visita BF)
+# Campionamento con GrayCodeExactSolver (visita BF)
 ####################################################################
-from dimod import ExactSolver
+from gray_exact import GrayCodeExactSolver
+
+NUM_STATES = None  # tutti gli stati: le verifiche sotto contano anche le non risposte
 
 # Istanza del campionatore scelto
-ES = ExactSolver()
+ES = GrayCodeExactSolver()
 
 print("\n-----------------------------")
 # Campionatura sul BQM.
-sampleset = ES.sample(bqm)
+sampleset = ES.sample(bqm, num_states=NUM_STATES)
 print("Sampleset:\n",sampleset)
 #       ==> [DecodedSample(decoded_subhs=[Constraint(a + b = 1,energy=1.000000)] ...
 print("Lunghezza Sampleset: ", len(sampleset))
@@ -79,49 +86,35 @@ print("\n -- decoded_sampleset[0]: singolo campione.\n", decoded_sampleset[0])
 #print("\n -- lista delle sole energie dei sample estratti dal decoded_sampleset: ",  [x.energy for x in decoded_sampleset])
 #   - lista dei vincoli di ogni campione;
 #print("\n -- lista dei soli constraint dei sample estratti dal decoded_sampleset: ", [x.constraints() for x in decoded_sampleset])
-#   - lista dei campioni che non soddisfano il vincolo:
-non_solutions = [s.sample for s in decoded_sampleset \
-    if not(s.constraints().get('constr0')[0]) or \
-       not(s.constraints().get('constr1')[0]) or \
-       not(s.constraints().get('constr2')[0]) or \
-       not(s.constraints().get('constr3')[0]) or \
-       not(s.constraints().get('constr4')[0]) or \
-       not(s.constraints().get('constr5')[0])]
-#print(" -- lista dei sample che non soddisfano il constraint:", non_solutions)
+
+print("\n-----------------------------")
+# Verifica vettoriale dei vincoli (QUBO_TOOLS/constraint_masks.py).
+# Invece di chiamare s.constraints().get('constrN')[0] per ogni campione
+# e per ogni vincolo, ConstraintMatrix traduce una volta sola i polinomi
+# dei vincoli in matrici e li valuta su tutto il sampleset:
+# feasibility() restituisce una matrice booleana campioni x vincoli.
+from constraint_masks import ConstraintMatrix
+
+vincoli_matrice = ConstraintMatrix.from_expressions(vincoli)
+ammissibili = vincoli_matrice.feasible(sampleset)
+#   - campioni che non soddisfano almeno un vincolo:
+non_solutions = sampleset.record.sample[~ammissibili]
 print("\n -- lunghezza della lista dei sample che non soddisfano almeno un vincolo:\n", len(non_solutions))
 
 print("\n-----------------------------")
-# Energia minima dei sample che soddisfano il constraint.
-best_energy = min([s.energy for s in decoded_sampleset \
-    if s.constraints().get('constr0')[0] and \
-       s.constraints().get('constr1')[0] and \
-       s.constraints().get('constr2')[0] and \
-       s.constraints().get('constr3')[0] and \
-       s.constraints().get('constr4')[0] and \
-       s.constraints().get('constr5')[0]])
-print("Energia minima dei sample che soddisfano almeno un vincolo:\n", best_energy)
+# Energia minima dei sample che soddisfano i vincoli.
+best_energy = vincoli_matrice.best_feasible_energy(sampleset)
+print("Energia minima dei sample che soddisfano tutti i vincoli:\n", best_energy)
 
 print("\n-----------------------------")
 # Lista con tutte risposte, cioè soluzioni con energia minima che soddisfano i vincoli
-answers = [s.sample for s in decoded_sampleset \
-    if (s.energy == best_energy) and \
-        s.constraints().get('constr0')[0] and \
-        s.constraints().get('constr1')[0] and \
-        s.constraints().get('constr2')[0] and \
-        s.constraints().get('constr3')[0] and \
-        s.constraints().get('constr4')[0] and \
-        s.constraints().get('constr5')[0]]
+answers = [{v: int(b) for v, b in s.items()} for s in vincoli_matrice.optimal_feasible(sampleset).samples()]
 print("Tutte e sole le risposte con energia minima {} che soddisfano i vincoli: {}.".format(best_energy,answers))
 
 print("\n-----------------------------")
 # Lista con tutte le non soluzioni (sample che non soddisfano almeno un vinvolo) 
 # ma che hanno energia minima.
-answers = [s.sample for s in decoded_sampleset \
-    if (s.energy == best_energy) and \
-        (not(s.constraints().get('constr0')[0]) or \
-        not(s.constraints().get('constr1')[0]) or \
-        not(s.constraints().get('constr2')[0]) or \
-        not(s.constraints().get('constr3')[0]) or \
-        not(s.constraints().get('constr4')[0]) or \
-        not(s.constraints().get('constr5')[0]))]
-print("Tutte e sole le *non* risposte con energia minima {}: {}.".format(best_energy,answers))
\ No newline at end of file
+energie = sampleset.record.energy
+non_answers = sampleset.record.sample[~ammissibili & (energie == best_energy)]
+answers = [{v: int(b) for v, b in zip(sampleset.variables, s)} for s in non_answers]
+print("Tutte e sole le *non* risposte con energia minima {}: {}.".format(best_energy,answers))
@@ -49,16 +49,18 @@ print(" -- bqm (componenti quadratiche):\n", bqm.quadratic)    # quadratiche
 print(" -- bqm (--->> OFFSET):\n", bqm.offset)                 # scostamento costante da 0?
 
 ####################################################################
-# Campionamento con ExactSolver (visita BF)
+# Campionamento con GrayCodeExactSolver (visita BF)
 ####################################################################
-from dimod import ExactSolver
+from gray_exact import GrayCodeExactSolver
+
+NUM_STATES = None  # tutti gli stati, per vedere quali non risposte hanno energia minima
 
 # Istanza del campionatore scelto
-ES = ExactSolver()
+ES = GrayCodeExactSolver()
 
 print("\n-----------------------------")
 # Campionatura sul BQM.
-sampleset = ES.sample(bqm)
+sampleset = ES.sample(bqm, num_states=NUM_STATES)
 print("Sampleset:\n",sampleset)
 #       ==> [DecodedSample(decoded_subhs=[Constraint(a + b = 1,energy=1.000000)] ...
 print("Lunghezza Sampleset: ", len(sampleset))
@@ -125,4 +127,24 @@ answers = [s.sample for s in decoded_sampleset \
         not(s.constraints().get('constr3')[0]) or \
         not(s.constraints().get('constr4')[0]) or \
         not(s.constraints().get('constr5')[0]))]
-print("Tutte e sole le *non* risposte con energia minima {}: {}.".format(best_energy,answers))
\ No newline at end of file
+print("Tutte e sole le *non* risposte con energia minima {}: {}.".format(best_energy,answers))
+####################################################################
+# Ricerca automatica del più piccolo L corretto
+#
+# Lo stesso Hamiltoniano, con L come Placeholder, è separato una sola
+# volta in BQM obiettivo e BQM penalità (QUBO_TOOLS/lagrange_sweep.py).
+# PenaltySearch cerca il più piccolo L intero per cui tutti i campioni
+# di energia minima soddisfano i vincoli: parte dal limite analitico
+# (ampiezza dell'obiettivo / violazione minima della penalità) e
+# procede per bisezione, campionando ogni valore di L una sola volta.
+####################################################################
+from pyqubo import Placeholder
+from lagrange_sweep import LagrangeSweep, PenaltySearch, format_results
+
+ham_parametrico = ham_obiettivo + Placeholder('L') * ham_penalita
+ricerca = PenaltySearch(LagrangeSweep.from_model(ham_parametrico.compile()), ES)
+esito = ricerca.minimum_feasible(upper='analytic', integral=True)
+
+print("\n-----------------------------")
+print(format_results([ricerca.results[l] for l in sorted(ricerca.results)]))
+print("Più piccolo L corretto: {} (L = {} non lo è).".format(esito.multiplier, esito.infeasible))
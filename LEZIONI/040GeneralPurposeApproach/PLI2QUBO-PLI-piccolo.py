@@ -71,4 +71,82 @@ print(" SA.parameters:\n", SA.parameters)
 
 # Campionatura sul BQM.
 sampleset = SA.sample(bqm, num_reads=5, num_sweeps=30)
-print("Sampleset:\n",sampleset)
\ No newline at end of file
+print("Sampleset:\n",sampleset)
+
+####################################################################
+# Scelta di L al variare del suo valore
+#
+# Il BQM sopra usa L = 3: la tabella di LagrangeSweep mostra, per L
+# da 1 a 10, se SA con gli stessi 30 sweep trova campioni che
+# rispettano tutti e tre i vincoli e quanto vale il loro obiettivo.
+####################################################################
+from lagrange_sweep import LagrangeSweep, format_results
+
+print("-----------------------------")
+sweep = LagrangeSweep.from_model(ham_internal)
+print(format_results(sweep.run([1, 2, 3, 5, 10], num_reads=100, num_sweeps=30)))
+
+####################################################################
+# Compilazione matriciale dello stesso PLI
+#
+# compile_ilp (QUBO_TOOLS/ilp_qubo.py) riceve direttamente costi,
+# matrice dei vincoli, versi e termini noti. Le variabili slack sono
+# aggiunte in automatico, con il numero di bit sufficiente a coprire
+# l'intervallo di valori necessario a ciascun vincolo, e la penalità
+# è calcolata come prodotto matriciale sparso A^T A, senza espandere
+# alcun polinomio. decode restituisce x ed i valori delle slack.
+####################################################################
+from ilp_qubo import compile_ilp
+from gray_exact import GrayCodeExactSolver
+
+pli = compile_ilp(
+    cost=[-10, -7, -9],                       # massimizzare 10x1 + 7x2 + 9x3
+    matrix=[[2, 3, 2],
+            [3, 2, 3],
+            [2, 3, 1]],
+    senses=['=', '<=', '>='],
+    rhs=[5, 5, 3],
+)
+print("-----------------------------")
+print("Variabili del QUBO compilato:", pli.labels)
+sampleset = GrayCodeExactSolver().sample(pli.bqm(3), num_states=3)
+x, slack = pli.decode(sampleset)
+for sample_x, sample_slack, energy, ok in zip(x, slack, sampleset.record.energy, pli.is_feasible(x)):
+    print("x = {}, slack = {}, energia = {}, ammissibile = {}".format(sample_x, sample_slack, energy, ok))
+
+####################################################################
+# Presolve del PLI prima della compilazione
+#
+# presolve_ilp (QUBO_TOOLS/ilp_presolve.py) riduce il PLI prima di
+# trasformare i vincoli in penalità: fissa le variabili imposte da un
+# singolo vincolo, elimina vincoli ridondanti o duplicati e riduce i
+# coefficienti troppo grandi. Meno variabili e coefficienti più piccoli
+# significano un BQM più piccolo e con un intervallo di valori più
+# stretto. postsolve riporta i campioni sulle variabili originali.
+####################################################################
+from ilp_presolve import presolve_ilp
+
+ridotto = presolve_ilp(
+    cost=[-10, -7, -9],
+    matrix=[[2, 3, 2],
+            [3, 2, 3],
+            [2, 3, 1]],
+    senses=['=', '<=', '>='],
+    rhs=[5, 5, 3],
+)
+print("-----------------------------")
+print("Riduzioni del presolve:\n{}".format(ridotto.log))
+pli_ridotto = ridotto.compile()
+print("Variabili del QUBO ridotto:", pli_ridotto.labels)
+
+# La divisione dei vincoli per il loro MCD cambia la scala delle penalità:
+# L = 3, scelto per il modello originale, non è più garantito. Lo si
+# ricerca di nuovo sul modello ridotto con PenaltySearch.
+from lagrange_sweep import LagrangeSweep, PenaltySearch
+ricerca = PenaltySearch(LagrangeSweep(pli_ridotto.objective, pli_ridotto.penalty), GrayCodeExactSolver())
+L_ridotto = ricerca.minimum_feasible(upper='analytic', integral=True).multiplier
+print("Più piccolo L corretto per il modello ridotto:", L_ridotto)
+sampleset = GrayCodeExactSolver().sample(pli_ridotto.bqm(L_ridotto), num_states=1)
+x_ridotto, _ = pli_ridotto.decode(sampleset)
+print("x = {}, obiettivo = {}".format(ridotto.postsolve(x_ridotto)[0],
+                                       sampleset.first.energy + ridotto.offset))
@@ -94,6 +94,19 @@ print("sampleset.first.energy: ", sampleset.first.energy) # per avere l'energia
 # Una valutazione più "sofisticata" su come determinare il valore del Lagrangiano è sulle dispense. 
 ###################################################################
 
+####################################################################
+# Scelta di L al variare del suo valore
+#
+# Le osservazioni precedenti, ripetute con SA per più valori di L:
+# 1, 2 e 3 attorno alla soglia in cui lo zaino di peso 17 smette di
+# avere energia minima, 5 e 10 oltre, e il 40 usato nel BQM.
+####################################################################
+from lagrange_sweep import LagrangeSweep, format_results
+
+print("-----------------------------")
+sweep = LagrangeSweep.from_model(ham_internal)
+print(format_results(sweep.run([1, 2, 3, 5, 10, 40], num_reads=100, num_sweeps=100)))
+
 ####################################################################
 # Campionamento con Simulated Annealing
 ####################################################################
@@ -107,6 +120,61 @@ SA = SimulatedAnnealingSampler()
 sampleset = SA.sample(bqm, num_reads=10, num_sweeps=100)
 print("Sampleset:\n",sampleset)
 
+####################################################################
+# Campionamento con Parallel Tempering
+#
+# ParallelTemperingSampler (QUBO_TOOLS/parallel_tempering.py) accetta gli
+# stessi num_reads, num_sweeps e seed di SimulatedAnnealingSampler. Ogni
+# lettura tiene num_replicas copie dello stato a temperature fisse e ne
+# scambia periodicamente le vicine: con un L grande le penalità creano
+# barriere alte, che le copie calde attraversano e quelle fredde no.
+# La scala delle temperature viene regolata durante il primo quarto
+# degli sweep in modo che ogni coppia vicina si scambi con la stessa
+# probabilità; info['swap_acceptance'] riporta queste probabilità.
+####################################################################
+print("-----------------------------")
+from parallel_tempering import ParallelTemperingSampler
+
+PT = ParallelTemperingSampler()
+sampleset_PT = PT.sample(bqm, num_reads=10, num_sweeps=100, num_replicas=8)
+print("Sampleset:\n",sampleset_PT)
+print("Accettazione degli scambi:", sampleset_PT.info['swap_acceptance'].round(2))
+
+####################################################################
+# Presolve del PLI prima della compilazione
+#
+# Lo stesso KP passato a presolve_ilp (QUBO_TOOLS/ilp_presolve.py),
+# come in PLI2QUBO-PLI-piccolo.py. Tutti e quattro gli oggetti pesano
+# 21: senza l'oggetto 2 (peso 6) gli altri pesano 15 e stanno comunque
+# nello zaino, quindi peso 5 e capacità 15 ammettono gli stessi zaini.
+# Allo stesso modo, senza l'oggetto 3 gli altri pesano 11 e il vincolo
+# diventa 2*x0 + 4*x1 + 5*x2 + 5*x3 <= 11: penalità con coefficienti più
+# piccoli. Le slack sono calcolate da compile(), non più scelte a mano
+# con il Greedy-split, e postsolve riporta la risposta su x0, ..., x3.
+####################################################################
+from ilp_presolve import presolve_ilp
+from lagrange_sweep import LagrangeSweep, PenaltySearch
+from gray_exact import GrayCodeExactSolver
+
+ridotto = presolve_ilp(
+    cost=[-10, -10, -12, -18],                # massimizzare il profitto
+    matrix=[[2, 4, 6, 9]],
+    senses=['<='],
+    rhs=[16],
+)
+print("-----------------------------")
+print("Riduzioni del presolve:\n{}".format(ridotto.log))
+pli_ridotto = ridotto.compile()
+print("Variabili del QUBO ridotto:", pli_ridotto.labels)
+
+ricerca = PenaltySearch(LagrangeSweep(pli_ridotto.objective, pli_ridotto.penalty), GrayCodeExactSolver())
+L_ridotto = ricerca.minimum_feasible(upper='analytic', integral=True).multiplier
+print("Più piccolo L corretto per il modello ridotto:", L_ridotto)
+sampleset = GrayCodeExactSolver().sample(pli_ridotto.bqm(L_ridotto), num_states=1)
+x_ridotto, _ = pli_ridotto.decode(sampleset)
+print("x = {}, profitto = {}".format(ridotto.postsolve(x_ridotto)[0],
+                                     -(sampleset.first.energy + ridotto.offset)))
+
 ####################################################################
 # Campionatore con DWaveSampler
 ####################################################################
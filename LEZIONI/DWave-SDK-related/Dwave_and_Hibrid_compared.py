@@ -1,17 +1,29 @@
-from dwave.system import DWaveSampler, EmbeddingComposite, LeapHybridSampler
 from dimod import BinaryQuadraticModel
 import time
 
+# Con LOCALE = True il confronto gira senza connessione al cloud D-Wave:
+# al posto della QPU si usa il Simulated Annealing di neal e al posto di
+# LeapHybridSampler LocalHybridSampler (QUBO_TOOLS/local_hybrid.py), che ha
+# la stessa interfaccia e gli stessi campi di timing in sampleset.info.
+LOCALE = True
+if LOCALE:
+    from neal import SimulatedAnnealingSampler
+    from local_hybrid import LocalHybridSampler as LeapHybridSampler
+else:
+    from dwave.system import DWaveSampler, EmbeddingComposite, LeapHybridSampler
+
 # Define a simple QUBO problem
 Q = {(0, 0): -1, (1, 1): -1, (0, 1): 2}
 bqm = BinaryQuadraticModel.from_qubo(Q)
 
 # Using DWaveSampler (non-hybrid)
-sampler = DWaveSampler()
-embedding_sampler = EmbeddingComposite(sampler)
-
 start_time = time.time()
-sampleset_dw = embedding_sampler.sample(bqm, annealing_time=20)
+if LOCALE:
+    sampleset_dw = SimulatedAnnealingSampler().sample(bqm, num_reads=10)
+else:
+    sampler = DWaveSampler()
+    embedding_sampler = EmbeddingComposite(sampler)
+    sampleset_dw = embedding_sampler.sample(bqm, annealing_time=20)
 dwave_runtime = time.time() - start_time
 
 # Check if chain break fraction is available
@@ -37,3 +49,4 @@ for sample in sampleset_hybrid:
     print(sample)
 print(f"LeapHybridSampler runtime: {hybrid_runtime:.4f} seconds")
 print(f"LeapHybridSampler minimum energy: {sampleset_hybrid.first.energy}")
+print(f"LeapHybridSampler run_time reported in info: {sampleset_hybrid.info['run_time']} microseconds")
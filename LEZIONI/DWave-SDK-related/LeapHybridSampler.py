@@ -8,7 +8,13 @@ cqm = ConstrainedQuadraticModel()
 cqm.set_objective(-i*j)
 cqm.add_constraint(2*i+2*j <= 8, "Max perimeter")
 
-from dwave.system import LeapHybridCQMSampler
+# Con LOCALE = True si usa LocalHybridCQMSampler (QUBO_TOOLS/local_hybrid.py):
+# stessa interfaccia di LeapHybridCQMSampler, ma senza connessione al cloud.
+LOCALE = True
+if LOCALE:
+    from local_hybrid import LocalHybridCQMSampler as LeapHybridCQMSampler
+else:
+    from dwave.system import LeapHybridCQMSampler
 sampler = LeapHybridCQMSampler()
 sampleset = sampler.sample_cqm(cqm)
 print(sampleset.first)                          
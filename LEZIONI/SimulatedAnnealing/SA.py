@@ -4,16 +4,17 @@
 import random
 import math
 
-class SimulatedAnnealing:
-    def __init__(self, initialSolution, solutionEvaluator, initialTemp, finalTemp, tempReduction, neighborOperator, iterationPerTemp=100, alpha=10, beta=5):
-        self.solution = initialSolution
-        self.evaluate = solutionEvaluator
+import numpy as np
+
+
+class CoolingSchedule:
+    # Temperature bookkeeping shared by the scalar and the multi-replica annealers.
+    def __init__(self, initialTemp, finalTemp, tempReduction, iterationPerTemp=100, alpha=10, beta=5):
         self.currTemp = initialTemp
         self.finalTemp = finalTemp
         self.iterationPerTemp = iterationPerTemp
         self.alpha = alpha
         self.beta = beta
-        self.neighborOperator = neighborOperator
 
         if tempReduction == "linear":
             self.decrementRule = self.linearTempReduction
@@ -35,24 +36,148 @@ class SimulatedAnnealing:
 
     def isTerminationCriteriaMet(self):
         # can add more termination criteria
-        return self.currTemp <= self.finalTemp or self.neighborOperator(self.solution) == 0
+        return self.currTemp <= self.finalTemp
+
+
+class SimulatedAnnealing(CoolingSchedule):
+    # Two ways of describing the moves:
+    #  - neighborOperator(solution) returns the list of all neighbors, and
+    #    solutionEvaluator(solution) the energy of any solution (to be minimized);
+    #  - moveOperator, see QUBOFlipMoves, proposes one random move together with
+    #    its energy change and applies it only if accepted: no neighbor list and
+    #    no full evaluation per move.
+    def __init__(self, initialSolution, solutionEvaluator, initialTemp, finalTemp, tempReduction, neighborOperator=None, iterationPerTemp=100, alpha=10, beta=5, moveOperator=None):
+        super().__init__(initialTemp, finalTemp, tempReduction, iterationPerTemp, alpha, beta)
+        if neighborOperator is None and moveOperator is None:
+            raise ValueError("either neighborOperator or moveOperator is required")
+        self.solution = initialSolution
+        self.evaluate = solutionEvaluator
+        self.neighborOperator = neighborOperator
+        self.moveOperator = moveOperator
+        if solutionEvaluator is not None:
+            self.energy = solutionEvaluator(initialSolution)
+        else:
+            self.energy = moveOperator.energy(initialSolution)
+
+    def accept(self, delta):
+        # Metropolis rule: always downhill, uphill with probability e^(-delta/temp)
+        return delta <= 0 or random.uniform(0, 1) < math.exp(-delta / self.currTemp)
 
     def run(self):
         while not self.isTerminationCriteriaMet():
             # iterate that number of times
             for i in range(self.iterationPerTemp):
-                # get all of the neighbors
+                if self.moveOperator is not None:
+                    move, delta = self.moveOperator.propose(self.solution)
+                    if self.accept(delta):
+                        self.solution = self.moveOperator.apply(self.solution, move)
+                        self.energy += delta
+                    continue
+
+                # get all of the neighbors, once per iteration
                 neighbors = self.neighborOperator(self.solution)
+                if len(neighbors) == 0:
+                    return self.solution
                 # pick a random neighbor
                 newSolution = random.choice(neighbors)
-                # get the cost between the two solutions
-                cost = self.evaluate(self.solution) - self.evaluate(newSolution)
-                # if the new solution is better, accept it
-                if cost >= 0:
+                # the energy of the current solution is known already
+                newEnergy = self.evaluate(newSolution)
+                if self.accept(newEnergy - self.energy):
                     self.solution = newSolution
-                # if the new solution is not better, accept it with a probability of e^(-cost/temp)
-                else:
-                    if random.uniform(0, 1) < math.exp(-cost / self.currTemp):
-                        self.solution = newSolution
+                    self.energy = newEnergy
+            # decrement the temperature
+            self.decrementRule()
+        return self.solution
+
+
+def quboMatrix(Q):
+    # Q is a square array, or a dict {(u, v): bias} as returned by
+    # pyqubo's to_qubo(); returns the upper-triangular array and the labels.
+    if not isinstance(Q, dict):
+        Q = np.asarray(Q, dtype=float)
+        return np.triu(Q) + np.triu(Q.T, 1), list(range(Q.shape[0]))
+    labels = sorted({u for edge in Q for u in edge}, key=str)
+    index = {label: i for i, label in enumerate(labels)}
+    matrix = np.zeros((len(labels), len(labels)))
+    for (u, v), bias in Q.items():
+        i, j = sorted((index[u], index[v]))
+        matrix[i, j] += bias
+    return matrix, labels
+
+
+class QUBOFlipMoves:
+    # Single-bit flips of E(x) = sum_{i<=j} Q_ij x_i x_j, with x a list of 0/1.
+    # field[i] = sum_j (Q_ij + Q_ji) x_j is kept up to date, so proposing a
+    # flip costs O(1) and applying it O(deg(i)).  The operator follows the one
+    # solution it was created for: pass that same list to SimulatedAnnealing.
+    def __init__(self, Q, initialSolution):
+        matrix, self.labels = quboMatrix(Q)
+        self.diagonal = np.diag(matrix).tolist()
+        symmetric = matrix + matrix.T
+        np.fill_diagonal(symmetric, 0)
+        self.neighbors = [
+            [(j, symmetric[i, j]) for j in np.flatnonzero(symmetric[i])]
+            for i in range(len(self.labels))
+        ]
+        self.field = (symmetric @ np.asarray(initialSolution, dtype=float)).tolist()
+        self.matrix = matrix
+
+    def energy(self, solution):
+        x = np.asarray(solution, dtype=float)
+        return float(x @ self.matrix @ x)
+
+    def propose(self, solution):
+        i = random.randrange(len(solution))
+        delta = (1 - 2 * solution[i]) * (self.diagonal[i] + self.field[i])
+        return i, delta
+
+    def apply(self, solution, i):
+        sign = 1 - 2 * solution[i]
+        solution[i] ^= 1
+        for j, coupling in self.neighbors[i]:
+            self.field[j] += sign * coupling
+        return solution
+
+
+class ReplicaSimulatedAnnealing(CoolingSchedule):
+    # numReplicas independent annealing runs on the same QUBO, advanced together
+    # as NumPy arrays: at every iteration each replica proposes one random flip.
+    # The schedules are the ones of SimulatedAnnealing.  run() returns the best
+    # state of each replica (rows, in the order of self.labels) and its energy.
+    def __init__(self, Q, initialTemp, finalTemp, tempReduction, numReplicas=64, iterationPerTemp=100, alpha=10, beta=5, seed=None):
+        super().__init__(initialTemp, finalTemp, tempReduction, iterationPerTemp, alpha, beta)
+        self.matrix, self.labels = quboMatrix(Q)
+        self.rng = np.random.default_rng(seed)
+        n = len(self.labels)
+        self.diagonal = np.diag(self.matrix)
+        self.symmetric = self.matrix + self.matrix.T
+        np.fill_diagonal(self.symmetric, 0)
+
+        self.states = self.rng.integers(0, 2, size=(numReplicas, n)).astype(np.int8)
+        self.fields = self.states @ self.symmetric
+        self.energies = np.einsum('ri,ij,rj->r', self.states, self.matrix, self.states)
+        self.bestStates = self.states.copy()
+        self.bestEnergies = self.energies.copy()
+
+    def run(self):
+        replicas = np.arange(len(self.states))
+        n = self.states.shape[1]
+        while not self.isTerminationCriteriaMet():
+            for i in range(self.iterationPerTemp):
+                flips = self.rng.integers(0, n, size=len(replicas))
+                signs = 1 - 2 * self.states[replicas, flips]
+                deltas = signs * (self.diagonal[flips] + self.fields[replicas, flips])
+                with np.errstate(over='ignore'):
+                    accepted = (deltas <= 0) | (self.rng.random(len(replicas)) < np.exp(-deltas / self.currTemp))
+
+                rows, flips, signs = replicas[accepted], flips[accepted], signs[accepted]
+                self.states[rows, flips] ^= 1
+                self.fields[rows] += signs[:, None] * self.symmetric[flips]
+                self.energies[rows] += deltas[accepted]
+
+                improved = self.energies < self.bestEnergies
+                self.bestStates[improved] = self.states[improved]
+                self.bestEnergies[improved] = self.energies[improved]
             # decrement the temperature
-            self.decrementRule()
\ No newline at end of file
+            self.decrementRule()
+        return self.bestStates, self.bestEnergies
@@ -0,0 +1,375 @@
+################################################################################
+# branch_bound.py
+#
+# Exact minimization of a BQM by best-first branch and bound.
+#
+# Exhaustive enumeration (gray_exact.py) certifies the optimum of models with
+# up to 35-40 variables.  Branch and bound certifies it without visiting every
+# state: a node fixes some variables, and it is discarded as soon as a lower
+# bound on the energies of its states reaches the best energy found so far.
+# Two bounds are used, cheapest first:
+#
+#   - the per-variable bound: a negative coupling J_ij x_i x_j is at least
+#     J_ij (x_i + x_j) / 2, so the energy is at least
+#         offset + sum_i min(0, h_i + sum_j min(0, J_ij) / 2);
+#   - the roof-dual bound, i.e. the LP relaxation of the standard
+#     linearization (Hammer, Hansen, Simeone, 1984): y_ij replaces x_i x_j,
+#     with y_ij <= x_i, x_j when J_ij < 0 and y_ij >= x_i + x_j - 1 when
+#     J_ij > 0.  It is solved with scipy's HiGHS.
+#
+# Both come with persistencies, which fix variables without losing every
+# optimum of the node:
+#
+#   - if h_i + sum_j min(0, J_ij) >= 0, setting x_i = 0 never raises the
+#     energy, and if h_i + sum_j max(0, J_ij) <= 0 neither does x_i = 1;
+#   - the components of an optimal LP solution that are integral hold in
+#     some optimal binary solution (weak persistency of roof duality).
+#
+# A model whose energy does not change when every variable is complemented
+# (in SPIN form: no linear biases, e.g. MaxCut) has its optima in pairs x,
+# 1 - x.  The search then fixes one variable to 0 before it starts, which
+# halves the tree.  It does not strengthen the bounds: on MaxCut the roof-dual
+# LP is optimal at x = 1/2 everywhere, so no persistency fixes anything and
+# the root bound is minus the number of edges, far below the optimum; only
+# branching closes the gap.  Sparse MaxCut is proven
+# optimal up to about 60 variables (G(60, 0.1) in a few seconds); denser or
+# larger graphs, such as G(60, 0.3) or G(80, 0.1), usually stop at the time
+# limit with a gap.
+#
+# The search keeps the open nodes in a heap ordered by bound, so the smallest
+# open bound is always a valid lower bound on the optimum: when a time or node
+# limit stops the search, the answer still carries a gap certificate.
+################################################################################
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import dimod
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+
+# Distance from 0 or 1 under which an LP value counts as integral.
+INTEGRALITY_TOLERANCE = 1e-6
+
+# Random starts of the one-flip descent that provides the first incumbent.
+ROOT_DESCENTS = 20
+
+
+@dataclass(frozen=True)
+class GapCertificate:
+    """What the search proved about the minimum energy of the BQM.
+
+    Every state has energy at least lower_bound, and the returned state has
+    energy upper_bound.  proven is True when the two meet, i.e. the returned
+    state is optimal.
+    """
+
+    lower_bound: float
+    upper_bound: float
+    nodes: int
+    root_fixed: int
+    seconds: float
+
+    @property
+    def gap(self) -> float:
+        return self.upper_bound - self.lower_bound
+
+    @property
+    def proven(self) -> bool:
+        return self.gap <= 0
+
+
+################################################################################
+# Models with some variables fixed, with their bounds and persistencies; also
+# used by persistency.py.
+################################################################################
+@dataclass(frozen=True)
+class Restriction:
+    """The binary model left on the free variables of a node."""
+
+    free: np.ndarray
+    linear: np.ndarray
+    couplings: np.ndarray
+    offset: float
+
+
+def restrict(linear: np.ndarray, couplings: np.ndarray, offset: float, fixed: np.ndarray) -> Restriction:
+    """Fold the variables fixed to 0 or 1 (fixed[i] = -1 if free) into the model."""
+
+    free = np.flatnonzero(fixed < 0)
+    ones = np.flatnonzero(fixed == 1)
+    return Restriction(
+        free=free,
+        linear=linear[free] + couplings[np.ix_(free, ones)].sum(axis=1),
+        couplings=couplings[np.ix_(free, free)],
+        offset=offset + linear[ones].sum() + couplings[np.ix_(ones, ones)].sum() / 2,
+    )
+
+
+def dominance_fixings(model: Restriction) -> tuple[np.ndarray, np.ndarray]:
+    """Free variables whose best value does not depend on the others.
+
+    Returns (positions to fix to 0, positions to fix to 1), as indices into
+    model.free.
+    """
+
+    negative = np.minimum(model.couplings, 0).sum(axis=1)
+    positive = np.maximum(model.couplings, 0).sum(axis=1)
+    zeros = np.flatnonzero(model.linear + negative >= 0)
+    ones = np.flatnonzero((model.linear + positive <= 0) & (model.linear + negative < 0))
+    return zeros, ones
+
+
+def simple_bound(model: Restriction) -> float:
+    """The per-variable lower bound of the module comment."""
+
+    half_negative = np.minimum(model.couplings, 0).sum(axis=1) / 2
+    return model.offset + np.minimum(0, model.linear + half_negative).sum()
+
+
+def roof_dual(model: Restriction) -> tuple[float, np.ndarray]:
+    """Solve the roof-dual LP; return its value and the optimal x."""
+
+    k = len(model.free)
+    rows, cols = np.nonzero(np.triu(model.couplings, 1))
+    weights = model.couplings[rows, cols]
+    e = len(weights)
+
+    # Constraints on y_ij, the LP column k + index of the pair.
+    negative = np.flatnonzero(weights < 0)
+    positive = np.flatnonzero(weights > 0)
+    r = len(negative)
+    s = len(positive)
+    constraint = np.concatenate((
+        np.arange(r), r + np.arange(r),                    # y - x_i <= 0, y - x_j <= 0
+        np.arange(r), r + np.arange(r),
+        2 * r + np.arange(s), 2 * r + np.arange(s),        # x_i + x_j - y <= 1
+        2 * r + np.arange(s),
+    ))
+    column = np.concatenate((
+        k + negative, k + negative,
+        rows[negative], cols[negative],
+        rows[positive], cols[positive],
+        k + positive,
+    ))
+    value = np.concatenate((
+        np.ones(2 * r), -np.ones(2 * r),
+        np.ones(2 * s), -np.ones(s),
+    ))
+    a_ub = sparse.csr_array((value, (constraint, column)), shape=(2 * r + s, k + e))
+    b_ub = np.concatenate((np.zeros(2 * r), np.ones(s)))
+
+    result = linprog(
+        np.concatenate((model.linear, weights)),
+        A_ub=a_ub,
+        b_ub=b_ub,
+        bounds=(0, 1),
+        method='highs',
+    )
+    if result.status != 0:
+        raise RuntimeError(f'roof-dual LP failed: {result.message}')
+    return model.offset + result.fun, result.x[:k]
+
+
+################################################################################
+# Incumbents.
+################################################################################
+def _descend(linear: np.ndarray, couplings: np.ndarray, state: np.ndarray) -> np.ndarray:
+    """Steepest one-flip descent from state, to a local minimum."""
+
+    state = state.astype(float)
+    field = linear + couplings @ state
+    while len(state):
+        delta = (1 - 2 * state) * field
+        i = int(np.argmin(delta))
+        if delta[i] >= 0:
+            break
+        sign = 1 - 2 * state[i]
+        state[i] += sign
+        field += sign * couplings[i]
+    return state.astype(np.int8)
+
+
+def _energy(linear: np.ndarray, couplings: np.ndarray, offset: float, state: np.ndarray) -> float:
+    x = state.astype(float)
+    return float(offset + linear @ x + x @ couplings @ x / 2)
+
+
+################################################################################
+# Solver.
+################################################################################
+class BranchAndBoundSolver(dimod.Sampler):
+    """Exact solver for BQMs that returns its best state with a certificate.
+
+    The SampleSet contains one state; its info['certificate'] is a
+    GapCertificate.  time_limit (seconds) and node_limit stop the search
+    early, in which case the certificate shows the remaining gap.
+    """
+
+    parameters = {
+        'time_limit': [],
+        'node_limit': [],
+        'roof_duality': [],
+        'seed': [],
+    }
+
+    properties: dict = {}
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        time_limit: Optional[float] = None,
+        node_limit: Optional[int] = None,
+        roof_duality: bool = True,
+        seed: Optional[int] = None,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Minimize bqm; see the module comment for the bounds used.
+
+        roof_duality=False keeps only the per-variable bound and its
+        persistencies, which is much cheaper per node but prunes less.
+        """
+
+        self.remove_unknown_kwargs(**kwargs)
+        started = time.perf_counter()
+
+        variables = list(bqm.variables)
+        n = len(variables)
+        binary = bqm.change_vartype(dimod.BINARY, inplace=False)
+        linear, (rows, cols, biases), offset = binary.to_numpy_vectors(variables)
+        linear = linear.astype(float)
+        couplings = np.zeros((n, n))
+        np.add.at(couplings, (rows, cols), biases)
+        couplings = couplings + couplings.T
+
+        # With integer biases every energy is an integer, so bounds round up.
+        integral = all(
+            float(b).is_integer() for b in itertools.chain(linear, biases, [offset])
+        )
+        scale = 1.0 + np.abs(linear).sum() + np.abs(biases).sum() + abs(offset)
+        tolerance = 1e-9 * scale
+
+        def sharpen(bound: float) -> float:
+            return math.ceil(bound - tolerance) if integral else bound
+
+        rng = np.random.default_rng(seed)
+        best_state = np.zeros(n, dtype=np.int8)
+        best_energy = _energy(linear, couplings, offset, best_state)
+
+        def offer(state: np.ndarray) -> None:
+            nonlocal best_state, best_energy
+            state = _descend(linear, couplings, state)
+            energy = _energy(linear, couplings, offset, state)
+            if energy < best_energy:
+                best_state, best_energy = state, energy
+
+        for _ in range(ROOT_DESCENTS if n else 0):
+            offer(rng.integers(0, 2, n))
+
+        # Complement symmetry: some optimum has x_k = 0, for the variable the
+        # search would branch on first.
+        root = np.full(n, -1, dtype=np.int8)
+        spin_linear = bqm.change_vartype(dimod.SPIN, inplace=False).to_numpy_vectors(variables)[0]
+        if n and np.all(np.abs(spin_linear) <= tolerance):
+            root[int(np.argmax(np.abs(couplings).sum(axis=1)))] = 0
+
+        counter = itertools.count()
+        heap = [(-math.inf, next(counter), root)]
+        nodes = 0
+        root_fixed = 0
+        stopped = False
+
+        while heap:
+            if heap[0][0] >= best_energy - tolerance:
+                heap = []
+                break
+            if (
+                (node_limit is not None and nodes >= node_limit)
+                or (time_limit is not None and time.perf_counter() - started >= time_limit)
+            ):
+                stopped = True
+                break
+
+            parent_bound, _, fixed = heapq.heappop(heap)
+            nodes += 1
+
+            # Dominance persistencies, up to a fixed point.
+            while True:
+                model = restrict(linear, couplings, offset, fixed)
+                zeros, ones = dominance_fixings(model)
+                if not len(zeros) and not len(ones):
+                    break
+                fixed[model.free[zeros]] = 0
+                fixed[model.free[ones]] = 1
+            if nodes == 1:
+                root_fixed = int((fixed >= 0).sum())
+
+            if not len(model.free):
+                offer(np.maximum(fixed, 0))
+                continue
+
+            bound = max(parent_bound, sharpen(simple_bound(model)))
+            if bound >= best_energy - tolerance:
+                continue
+
+            if roof_duality:
+                lp_bound, x = roof_dual(model)
+                bound = max(bound, sharpen(lp_bound))
+                if bound >= best_energy - tolerance:
+                    continue
+
+                # Weak persistency: the integral part of the LP optimum.
+                at_zero = x <= INTEGRALITY_TOLERANCE
+                at_one = x >= 1 - INTEGRALITY_TOLERANCE
+                fixed[model.free[at_zero]] = 0
+                fixed[model.free[at_one]] = 1
+                if nodes == 1:
+                    root_fixed = int((fixed >= 0).sum())
+                fractional = ~(at_zero | at_one)
+
+                guess = np.maximum(fixed, 0)
+                guess[model.free[fractional]] = rng.integers(0, 2, fractional.sum())
+                offer(guess)
+                if not fractional.any():
+                    continue
+                candidates = model.free[fractional]
+            else:
+                guess = np.maximum(fixed, 0)
+                guess[model.free] = rng.integers(0, 2, len(model.free))
+                offer(guess)
+                candidates = model.free
+
+            # Branch on the free variable with the largest total bias.
+            weight = np.abs(linear[candidates]) + np.abs(couplings[np.ix_(candidates, candidates)]).sum(axis=1)
+            branch = candidates[int(np.argmax(weight))]
+            for value in (0, 1):
+                child = fixed.copy()
+                child[branch] = value
+                heapq.heappush(heap, (bound, next(counter), child))
+
+        lower_bound = best_energy
+        if stopped and heap:
+            lower_bound = min(best_energy, heap[0][0])
+
+        certificate = GapCertificate(
+            lower_bound=float(lower_bound),
+            upper_bound=float(best_energy),
+            nodes=nodes,
+            root_fixed=root_fixed,
+            seconds=time.perf_counter() - started,
+        )
+
+        sample = best_state if bqm.vartype is dimod.BINARY else 2 * best_state - 1
+        return dimod.SampleSet.from_samples_bqm(
+            (sample[np.newaxis, :], variables),
+            bqm,
+            info={'certificate': certificate},
+        )
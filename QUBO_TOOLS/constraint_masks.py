@@ -0,0 +1,183 @@
+################################################################################
+# constraint_masks.py
+#
+# Feasibility of a whole sampleset with respect to pyqubo Constraints.
+#
+# The lessons select answers by looping over decode_sampleset() and calling
+# s.constraints().get('constrN')[0] once per sample and per constraint.  That
+# decodes every sample through pyqubo and dominates the running time as soon
+# as the sampleset has thousands of rows.
+#
+# ConstraintMatrix compiles every constraint expression once into arrays,
+#
+#   g_c(x) = offset_c + sum_i a_ic x_i + sum_t w_tc x_i(t) x_j(t),
+#
+# and evaluates all of them on an R x n sample matrix X at once:
+#
+#   G = offsets + X A + (X[:, I] * X[:, J]) W,
+#
+# with A (n x C) and W (terms x C) sparse.  As for pyqubo's default
+# condition, constraint c holds when g_c(x) = 0.  feasibility() returns the
+# R x C boolean matrix, feasible() its conjunction over the constraints, and
+# best_feasible_energy() / optimal_feasible() replace the lesson loops that
+# look for the answers.
+################################################################################
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Mapping, Optional, Union
+
+import dimod
+import numpy as np
+from scipy import sparse
+
+
+# Entries of the term matrix X[:, I] * X[:, J] built for one chunk of samples.
+CHUNK_ENTRIES = 1 << 24
+
+SamplesOrSampleSet = Union[dimod.SampleSet, dimod.typing.SamplesLike]
+
+
+@dataclass(frozen=True)
+class ConstraintMatrix:
+    """Constraint polynomials in array form; see the module comment.
+
+    labels[c] is the label of constraint c and variables[i] the label of
+    column i of the sample matrices.
+    """
+
+    labels: tuple
+    variables: tuple
+    offsets: np.ndarray
+    linear: sparse.csr_array
+    term_rows: np.ndarray
+    term_cols: np.ndarray
+    terms: sparse.csr_array
+    tolerance: float = 1e-9
+
+    @classmethod
+    def from_expressions(
+        cls,
+        constraints: Mapping[str, object],
+        feed_dict: Optional[dict] = None,
+        tolerance: float = 1e-9,
+    ) -> 'ConstraintMatrix':
+        """Compile {label: pyqubo expression} into a ConstraintMatrix.
+
+        An expression may be the polynomial itself or the Constraint that
+        wraps it; placeholders take their values from feed_dict.  The
+        expressions must be quadratic: pyqubo evaluates a constraint on its
+        original polynomial, while a higher-order one would be compiled with
+        auxiliary variables into a different function.
+        """
+
+        index: dict = {}
+        offsets = []
+        linear_rows, linear_cols, linear_values = [], [], []
+        term_rows, term_cols, term_constraint, term_values = [], [], [], []
+
+        for c, (label, expression) in enumerate(constraints.items()):
+            bqm = expression.compile().to_bqm(feed_dict=feed_dict or {})
+            names = list(bqm.variables)
+            # pyqubo names the variable that replaces a product 'a * b'.
+            if any(isinstance(v, str) and ' * ' in v for v in names):
+                raise ValueError(f'constraint {label!r} is not quadratic')
+            position = np.array([index.setdefault(v, len(index)) for v in names], dtype=np.int64)
+            linear, (rows, cols, biases), offset = bqm.to_numpy_vectors(names)
+
+            offsets.append(offset)
+            linear_rows.append(position)
+            linear_cols.append(np.full(len(names), c))
+            linear_values.append(linear)
+            term_rows.append(position[rows])
+            term_cols.append(position[cols])
+            term_constraint.append(np.full(len(biases), c))
+            term_values.append(biases)
+
+        n = len(index)
+        m = len(offsets)
+        term_constraint = np.concatenate(term_constraint or [np.empty(0, dtype=np.int64)])
+        t = len(term_constraint)
+        return cls(
+            labels=tuple(constraints),
+            variables=tuple(index),
+            offsets=np.asarray(offsets, dtype=float),
+            linear=sparse.csr_array(
+                (
+                    np.concatenate(linear_values or [np.empty(0)]).astype(float),
+                    (
+                        np.concatenate(linear_rows or [np.empty(0, dtype=np.int64)]),
+                        np.concatenate(linear_cols or [np.empty(0, dtype=np.int64)]),
+                    ),
+                ),
+                shape=(n, m),
+            ),
+            term_rows=np.concatenate(term_rows or [np.empty(0, dtype=np.int64)]),
+            term_cols=np.concatenate(term_cols or [np.empty(0, dtype=np.int64)]),
+            terms=sparse.csr_array(
+                (np.concatenate(term_values or [np.empty(0)]).astype(float), (np.arange(t), term_constraint)),
+                shape=(t, m),
+            ),
+            tolerance=tolerance,
+        )
+
+    def sample_matrix(self, samples: SamplesOrSampleSet) -> np.ndarray:
+        """Binary R x n matrix of the samples, columns in self.variables order.
+
+        SPIN samples are mapped to binary, as pyqubo does (-1 -> 0, +1 -> 1).
+        """
+
+        array, variables = dimod.as_samples(samples)
+        if tuple(variables) != self.variables:
+            position = {v: i for i, v in enumerate(variables)}
+            missing = [v for v in self.variables if v not in position]
+            if missing:
+                raise ValueError(f'samples lack the constraint variables {missing}')
+            array = array[:, [position[v] for v in self.variables]]
+        if array.min(initial=0) < 0:
+            array = (array + 1) // 2
+        return array
+
+    def values(self, samples: SamplesOrSampleSet) -> np.ndarray:
+        """R x C matrix of the constraint polynomials g_c on every sample."""
+
+        x = self.sample_matrix(samples)
+        result = np.empty((len(x), len(self.labels)))
+        step = max(1, CHUNK_ENTRIES // max(1, len(self.term_rows), len(self.variables)))
+        for start in range(0, len(x), step):
+            chunk = x[start:start + step].astype(float)
+            products = chunk[:, self.term_rows] * chunk[:, self.term_cols]
+            result[start:start + step] = (
+                self.offsets
+                + np.asarray(chunk @ self.linear)
+                + np.asarray(products @ self.terms)
+            )
+        return result
+
+    def feasibility(self, samples: SamplesOrSampleSet) -> np.ndarray:
+        """R x C boolean matrix: True where the sample satisfies the constraint."""
+
+        return np.abs(self.values(samples)) <= self.tolerance
+
+    def feasible(self, samples: SamplesOrSampleSet) -> np.ndarray:
+        """One boolean per sample: True when it satisfies every constraint."""
+
+        return self.feasibility(samples).all(axis=1)
+
+    def best_feasible_energy(self, sampleset: dimod.SampleSet) -> Optional[float]:
+        """Lowest energy of a feasible sample, None if there is none."""
+
+        energies = sampleset.record.energy[self.feasible(sampleset)]
+        return float(energies.min()) if len(energies) else None
+
+    def optimal_feasible(self, sampleset: dimod.SampleSet) -> dimod.SampleSet:
+        """The feasible samples of sampleset with the best feasible energy."""
+
+        feasible = self.feasible(sampleset)
+        energies = sampleset.record.energy
+        keep = np.zeros(len(energies), dtype=bool)
+        if feasible.any():
+            best = energies[feasible].min()
+            keep = feasible & np.isclose(energies, best, rtol=0.0, atol=self.tolerance)
+        return dimod.SampleSet(sampleset.record[keep], sampleset.variables, sampleset.info, sampleset.vartype)
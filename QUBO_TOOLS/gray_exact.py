@@ -0,0 +1,418 @@
+################################################################################
+# gray_exact.py
+#
+# Exact enumeration of a BQM in Gray-code order, with bounded memory.
+#
+# dimod.ExactSolver builds the 2^n x n array of all states and the vector of
+# all their energies before returning: about 25 variables are the practical
+# limit.  GrayCodeExactSolver visits the same 2^n states but keeps only the
+# ones that the caller asked for:
+#
+#   num_states=k          the k states of lowest energy;
+#   ground_states=True    every state of minimum energy;
+#   neither               all states, as ExactSolver (small models only).
+#
+# The exhaustive lessons (MaxCut_ExSol.py, NumberPartitioning_ExSol.py, the
+# MVC_langrangiano_*_ExSol.py pair, HA_McGeoch_ES.py) use it in place of
+# ExactSolver through a NUM_STATES setting: None prints the whole table as
+# before, an integer k keeps the visit practical up to about 30 variables.
+#
+# The variables are split into b low variables (b = chunk_bits at most) and
+# m = n - b high variables.  The 2^b energies of the low variables, with all
+# high variables at 0, are computed once as a NumPy vector.  The high
+# variables are then walked in Gray-code order: consecutive high states differ
+# in exactly one variable j, and flipping j changes
+#
+#   - the energy of every low state by the column C_j = low_states @ J[low, j],
+#     which is precomputed, so the whole chunk costs one vector addition;
+#   - the energy of the high part by (1 - 2 x_j) (h_j + field_j), where
+#     field_j is kept up to date in O(m).
+#
+# Each chunk is compared with the current acceptance threshold (the k-th best
+# energy so far, or the minimum in ground-state mode) and only the few states
+# below it enter the bounded buffer of candidates.  The energies of the states
+# finally returned are recomputed from the BQM, so the result does not depend
+# on the rounding of the incremental updates.
+#
+# Larger models are split into 2^p shards by fixing the first p variables
+# (prefix_bits=p): each shard is the same sweep on a model with n - p
+# variables, and shards can run in num_workers processes.  Every shard keeps
+# its own bounded buffer; the buffers are merged as the shards complete.  With
+# checkpoint=path the merged buffer and the list of completed shards are saved
+# after every shard, and a later call with the same model and settings skips
+# the shards already done, so a long verification can be interrupted and
+# resumed.
+################################################################################
+
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Optional
+
+import dimod
+import numpy as np
+
+
+# Low variables enumerated together as one NumPy chunk.
+DEFAULT_CHUNK_BITS = 16
+
+# Largest number of states returned when all of them are requested.
+MAX_ALL_STATES = 1 << 24
+
+# Largest n whose states fit in the int64 codes used internally.
+MAX_VARIABLES = 62
+
+# Shards per worker when prefix_bits is chosen automatically, so that a slow
+# shard does not leave the other workers idle at the end.
+SHARDS_PER_WORKER = 4
+
+
+class _Candidates:
+    """Bounded buffer of the lowest-energy states seen so far.
+
+    States are stored as integer codes: bit i of the code is variable i.
+    With capacity k the buffer keeps at most k states; in ground-state mode
+    (capacity None) it keeps the states within tolerance of the minimum.
+    """
+
+    def __init__(self, capacity: Optional[int], tolerance: float) -> None:
+        self.capacity = capacity
+        self.tolerance = tolerance
+        self.energies = np.empty(0)
+        self.codes = np.empty(0, dtype=np.int64)
+        # Energy a new state must not exceed to be kept.
+        self.threshold = np.inf
+
+    def offer(self, energies: np.ndarray, codes: np.ndarray) -> None:
+        """Merge a batch of candidate states into the buffer."""
+
+        energies = np.concatenate((self.energies, energies))
+        codes = np.concatenate((self.codes, codes))
+
+        if self.capacity is None:
+            keep = energies <= energies.min() + self.tolerance
+        elif len(energies) > self.capacity:
+            keep = np.argpartition(energies, self.capacity - 1)[:self.capacity]
+        else:
+            keep = slice(None)
+
+        self.energies = energies[keep]
+        self.codes = codes[keep]
+
+        if self.capacity is None:
+            self.threshold = self.energies.min() + self.tolerance
+        elif len(self.energies) == self.capacity:
+            self.threshold = self.energies.max()
+
+
+################################################################################
+# One sweep over a model given as NumPy arrays.
+################################################################################
+def _sweep(
+    linear: np.ndarray,
+    couplings: np.ndarray,
+    offset: float,
+    candidates: _Candidates,
+    chunk_bits: int,
+) -> None:
+    """Offer every state of the model to candidates, in Gray-code order.
+
+    couplings is the symmetric n x n matrix of the quadratic biases, with a
+    zero diagonal; the model is binary.
+    """
+
+    n = len(linear)
+    b = min(n, chunk_bits)
+    m = n - b
+    low_codes = np.arange(2 ** b, dtype=np.int64)
+    low_states = ((low_codes[:, None] >> np.arange(b)) & 1).astype(float)
+
+    # Energies of the low states with all high variables at 0.
+    low_couplings = np.triu(couplings[:b, :b], 1)
+    chunk = (
+        offset
+        + low_states @ linear[:b]
+        + np.einsum('si,ij,sj->s', low_states, low_couplings, low_states)
+    )
+    # Row j: change of every low energy when high variable j goes to 1.
+    columns = np.ascontiguousarray((low_states @ couplings[:b, b:]).T)
+
+    high_linear = linear[b:]
+    high_couplings = couplings[b:, b:]
+    high_state = np.zeros(m, dtype=np.int64)
+    high_field = np.zeros(m)
+    high_energy = 0.0
+
+    for step in range(2 ** m):
+        if step:
+            # Gray code: step t flips the lowest set bit of t.
+            j = (step & -step).bit_length() - 1
+            sign = 1 - 2 * high_state[j]
+            high_energy += sign * (high_linear[j] + high_field[j])
+            high_field += sign * high_couplings[j]
+            high_state[j] ^= 1
+            chunk += sign * columns[j]
+
+        threshold = candidates.threshold - high_energy
+        hits = np.flatnonzero(chunk <= threshold)
+        if len(hits):
+            gray = step ^ (step >> 1)
+            candidates.offer(chunk[hits] + high_energy, hits | (gray << b))
+
+
+def _solve_shard(
+    linear: np.ndarray,
+    couplings: np.ndarray,
+    offset: float,
+    prefix_bits: int,
+    shard: int,
+    capacity: Optional[int],
+    tolerance: float,
+    chunk_bits: int,
+) -> tuple[int, np.ndarray, np.ndarray]:
+    """Sweep the states whose first prefix_bits variables spell shard.
+
+    Fixing the prefix leaves a model on the other variables, with the
+    couplings to the prefix folded into its linear biases and offset.
+    Returns (shard, energies, codes) of the states kept, with codes over all
+    the variables.
+    """
+
+    p = prefix_bits
+    prefix = ((shard >> np.arange(p)) & 1).astype(float)
+    shard_linear = linear[p:] + prefix @ couplings[:p, p:]
+    shard_offset = (
+        offset
+        + prefix @ linear[:p]
+        + prefix @ np.triu(couplings[:p, :p], 1) @ prefix
+    )
+
+    candidates = _Candidates(capacity, tolerance)
+    _sweep(shard_linear, couplings[p:, p:], shard_offset, candidates, chunk_bits)
+    return shard, candidates.energies, (candidates.codes << p) | shard
+
+
+# Model arrays of a worker process, set once by _init_shard_worker.
+_worker_model: Optional[tuple] = None
+
+
+def _init_shard_worker(*model) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _solve_shard_in_worker(shard: int) -> tuple[int, np.ndarray, np.ndarray]:
+    linear, couplings, offset, prefix_bits, capacity, tolerance, chunk_bits = _worker_model
+    return _solve_shard(
+        linear, couplings, offset, prefix_bits, shard, capacity, tolerance, chunk_bits,
+    )
+
+
+################################################################################
+# Checkpoints.
+################################################################################
+def _fingerprint(
+    variables: list,
+    linear: np.ndarray,
+    couplings: np.ndarray,
+    offset: float,
+    capacity: Optional[int],
+    prefix_bits: int,
+) -> str:
+    """Digest of everything a checkpoint's content depends on."""
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[repr(v) for v in variables], capacity, prefix_bits]).encode())
+    for array in (linear, couplings, np.array([offset])):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def _load_checkpoint(path: str, fingerprint: str, candidates: _Candidates) -> set[int]:
+    """Restore the merged buffer saved in path and return the shards done."""
+
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as handle:
+        data = json.load(handle)
+    if data.get('fingerprint') != fingerprint:
+        raise ValueError(f'{path} is the checkpoint of a different model or search')
+    if data['done']:
+        candidates.offer(
+            np.array(data['energies'], dtype=float),
+            np.array(data['codes'], dtype=np.int64),
+        )
+    return set(data['done'])
+
+
+def _save_checkpoint(path: str, fingerprint: str, done: set[int], candidates: _Candidates) -> None:
+    """Write the checkpoint atomically, so an interruption cannot corrupt it."""
+
+    data = {
+        'fingerprint': fingerprint,
+        'done': sorted(done),
+        'energies': candidates.energies.tolist(),
+        'codes': candidates.codes.tolist(),
+    }
+    temporary = path + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as handle:
+        json.dump(data, handle)
+    os.replace(temporary, path)
+
+
+################################################################################
+# Sampler.
+################################################################################
+class GrayCodeExactSolver(dimod.Sampler):
+    """Exact solver for BQMs, with memory bounded by the states returned.
+
+    It can replace dimod.ExactSolver: sample() takes a BQM and returns a
+    SampleSet with the same variables and vartype, so pyqubo's
+    decode_sampleset() works on its output as before.
+
+    With num_workers > 1 the shards run in a process pool: as for any
+    multiprocessing code, a script calling it must guard its main code with
+    if __name__ == '__main__' on platforms that spawn the workers.
+    """
+
+    parameters = {
+        'num_states': [],
+        'ground_states': [],
+        'chunk_bits': [],
+        'prefix_bits': [],
+        'num_workers': [],
+        'checkpoint': [],
+        'progress': [],
+    }
+
+    properties: dict = {}
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        num_states: Optional[int] = None,
+        ground_states: bool = False,
+        chunk_bits: int = DEFAULT_CHUNK_BITS,
+        prefix_bits: Optional[int] = None,
+        num_workers: int = 1,
+        checkpoint: Optional[str] = None,
+        progress: Optional[Callable[[str], None]] = None,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Enumerate every state of bqm and return the requested ones.
+
+        num_states=k returns the k states of lowest energy; ground_states=True
+        returns every state of minimum energy; with neither, all 2^n states are
+        returned, which is allowed up to MAX_ALL_STATES states.
+
+        prefix_bits=p splits the search into 2^p shards, run by num_workers
+        processes; by default p is 0 with one worker, and large enough for
+        SHARDS_PER_WORKER shards per worker otherwise.  checkpoint is the path
+        of a JSON file updated after every shard and read back on the next
+        call; progress, if given, receives one line per completed shard.
+        """
+
+        self.remove_unknown_kwargs(**kwargs)
+        if num_states is not None and ground_states:
+            raise ValueError('num_states and ground_states cannot be combined')
+        if num_states is not None and num_states < 1:
+            raise ValueError('num_states must be positive')
+        if num_workers < 1:
+            raise ValueError('num_workers must be positive')
+
+        variables = list(bqm.variables)
+        n = len(variables)
+        if n > MAX_VARIABLES:
+            raise ValueError(f'at most {MAX_VARIABLES} variables can be enumerated')
+        if num_states is None and not ground_states:
+            if 2 ** n > MAX_ALL_STATES:
+                raise ValueError(
+                    'too many states to return them all: use num_states or ground_states'
+                )
+            num_states = 2 ** n
+
+        if prefix_bits is None:
+            prefix_bits = 0
+            if num_workers > 1:
+                prefix_bits = (SHARDS_PER_WORKER * num_workers - 1).bit_length()
+            prefix_bits = min(prefix_bits, n)
+        if not 0 <= prefix_bits <= n:
+            raise ValueError('prefix_bits must be between 0 and the number of variables')
+
+        binary = bqm.change_vartype(dimod.BINARY, inplace=False)
+        linear, (rows, cols, biases), offset = binary.to_numpy_vectors(variables)
+        couplings = np.zeros((n, n))
+        np.add.at(couplings, (rows, cols), biases)
+        couplings = couplings + couplings.T
+
+        scale = 1.0 + np.abs(linear).sum() + np.abs(biases).sum() + abs(offset)
+        capacity = None if ground_states else min(num_states, 2 ** n)
+        tolerance = 1e-9 * scale
+        candidates = _Candidates(capacity, tolerance)
+
+        shards = 2 ** prefix_bits
+        done: set[int] = set()
+        fingerprint = ''
+        if checkpoint is not None:
+            fingerprint = _fingerprint(variables, linear, couplings, offset, capacity, prefix_bits)
+            done = _load_checkpoint(checkpoint, fingerprint, candidates)
+        todo = [shard for shard in range(shards) if shard not in done]
+        started = time.perf_counter()
+
+        def merge(result: tuple[int, np.ndarray, np.ndarray]) -> None:
+            shard, energies, codes = result
+            candidates.offer(energies, codes)
+            done.add(shard)
+            if checkpoint is not None:
+                _save_checkpoint(checkpoint, fingerprint, done, candidates)
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                finished = len(done) - (shards - len(todo))
+                left = elapsed / finished * (shards - len(done))
+                progress(
+                    f'shard {len(done)}/{shards} done, best energy '
+                    f'{candidates.energies.min():g}, {elapsed:.1f} s elapsed, '
+                    f'about {left:.1f} s left'
+                )
+
+        model = (linear, couplings, offset, prefix_bits, capacity, tolerance, chunk_bits)
+        if num_workers == 1 or len(todo) <= 1:
+            for shard in todo:
+                merge(_solve_shard(*model[:4], shard, *model[4:]))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=min(num_workers, len(todo)),
+                mp_context=multiprocessing.get_context(),
+                initializer=_init_shard_worker,
+                initargs=model,
+            ) as executor:
+                pending = {executor.submit(_solve_shard_in_worker, shard) for shard in todo}
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        merge(future.result())
+
+        codes = candidates.codes
+        samples = ((codes[:, None] >> np.arange(n)) & 1).astype(np.int8)
+        energies = binary.energies((samples, variables))
+
+        if ground_states:
+            keep = np.isclose(energies, energies.min(), rtol=0, atol=candidates.tolerance)
+            codes, samples, energies = codes[keep], samples[keep], energies[keep]
+
+        # Sort by energy, ties by state code, so that the output is deterministic.
+        order = np.lexsort((codes, energies))
+        samples, energies = samples[order], energies[order]
+
+        if bqm.vartype is dimod.SPIN:
+            samples = 2 * samples - 1
+        return dimod.SampleSet.from_samples(
+            (samples, variables),
+            vartype=bqm.vartype,
+            energy=energies,
+        )
@@ -0,0 +1,302 @@
+################################################################################
+# ilp_presolve.py
+#
+# Presolve of a 0/1 integer linear program before its QUBO compilation.
+#
+# Every variable and every row of the ILP ends up in the QUBO: a variable as
+# a qubit, a row as a squared penalty that couples all of its variables.
+# presolve_ilp() shrinks the program first, with reductions that keep every
+# feasible x (or, for the dual fixings, at least one optimal x):
+#
+#   - >= rows are negated into <= rows, and every row is divided by the gcd
+#     of its coefficients (rounding b down in <= rows);
+#   - variables forced by a single row are fixed (propagate_fixings() of
+#     ilp_qubo.py) and substituted into the right-hand sides;
+#   - a variable whose cost and coefficients all favour the same value is
+#     fixed to it (dual fixing): x_j = 0 when c_j >= 0 and a_ij >= 0 in every
+#     <= row and a_ij = 0 in every equality, symmetrically for x_j = 1;
+#   - empty rows, rows satisfied by every binary x and duplicated rows are
+#     removed (of two <= rows with the same coefficients the tighter stays);
+#   - big coefficients are tightened: in a <= row with maximum activity M, a
+#     coefficient a_j > 0 such that M - a_j < b (the row holds whenever
+#     x_j = 0) becomes a_j - d with b - d, d = b - (M - a_j); a coefficient
+#     a_j < 0 with M + a_j < b becomes a_j + d, d = b - (M + a_j).  Both keep
+#     the binary solutions of the row and shrink the range of the penalty.
+#
+# The passes repeat until none of them changes the program.  postsolve()
+# maps the x of the reduced program back to the original variables, and the
+# PresolveLog counts what was removed, including the couplings between x
+# variables that the penalty A'A would have had.
+################################################################################
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Sequence, Union
+
+import numpy as np
+from scipy import sparse
+
+from ilp_qubo import CompiledILP, compile_ilp, parse_senses, propagate_fixings
+
+
+@dataclass(frozen=True)
+class PresolveLog:
+    """What presolve_ilp() removed or changed."""
+
+    variables_before: int
+    variables_after: int
+    rows_before: int
+    rows_after: int
+    couplings_before: int
+    couplings_after: int
+    largest_coefficient_before: float
+    largest_coefficient_after: float
+    fixed_by_rows: int
+    fixed_by_cost: int
+    redundant_rows: int
+    duplicate_rows: int
+    tightened_coefficients: int
+
+    def __str__(self) -> str:
+        return '\n'.join((
+            f'variables: {self.variables_before} -> {self.variables_after} '
+            f'({self.fixed_by_rows} fixed by rows, {self.fixed_by_cost} by cost)',
+            f'rows: {self.rows_before} -> {self.rows_after} '
+            f'({self.redundant_rows} redundant, {self.duplicate_rows} duplicates)',
+            f'couplings between variables: {self.couplings_before} -> {self.couplings_after}',
+            f'largest |coefficient|: {self.largest_coefficient_before:g} -> '
+            f'{self.largest_coefficient_after:g} ({self.tightened_coefficients} tightened)',
+        ))
+
+
+@dataclass(frozen=True)
+class PresolvedILP:
+    """The reduced program and what is needed to undo the reduction.
+
+    columns[k] is the original index of reduced variable k; fixed[j] is the
+    value of original variable j, or -1 when it is kept.  The reduced
+    objective cost x differs from the original one by the constant offset.
+    """
+
+    cost: np.ndarray
+    matrix: sparse.csr_array
+    senses: tuple
+    rhs: np.ndarray
+    offset: float
+    columns: np.ndarray
+    fixed: np.ndarray
+    log: PresolveLog
+
+    def compile(self, **kwargs) -> CompiledILP:
+        """compile_ilp() of the reduced program."""
+
+        return compile_ilp(self.cost, self.matrix, list(self.senses), self.rhs, **kwargs)
+
+    def postsolve(self, x: np.ndarray) -> np.ndarray:
+        """Map reduced x (one row per sample) to the original variables."""
+
+        x = np.atleast_2d(x)
+        full = np.repeat(self.fixed[np.newaxis, :], len(x), axis=0)
+        full[:, self.columns] = x
+        return full
+
+
+def _couplings(a: sparse.csr_array) -> int:
+    """Pairs of variables sharing a row, i.e. off-diagonal entries of A'A."""
+
+    pattern = (a != 0).astype(np.int64)
+    return sparse.triu(pattern.T @ pattern, k=1).nnz
+
+
+def _largest(a: sparse.csr_array) -> float:
+    return float(np.abs(a.data).max()) if a.nnz else 0.0
+
+
+def presolve_ilp(
+    cost: Sequence[float],
+    matrix: Union[np.ndarray, sparse.sparray, sparse.spmatrix],
+    senses: Union[str, Sequence[str]],
+    rhs: Sequence[float],
+) -> PresolvedILP:
+    """Reduce  minimize cost x  s.t.  matrix x (senses) rhs,  x binary.
+
+    Arguments are as for compile_ilp(); the coefficients must be integers.
+    Raises ValueError when the reductions prove the program infeasible.
+    """
+
+    original = sparse.csr_array(matrix, dtype=float)
+    original.eliminate_zeros()
+    m, n = original.shape
+    cost = np.asarray(cost, dtype=float)
+    rhs = np.asarray(rhs, dtype=float)
+    if cost.shape != (n,) or rhs.shape != (m,):
+        raise ValueError('cost must have one entry per column and rhs one per row')
+    if not (np.all(np.mod(original.data, 1) == 0) and np.all(np.mod(rhs, 1) == 0)):
+        raise ValueError('presolve needs integer coefficients')
+    sense = parse_senses(senses, m)
+
+    # Rows as (columns, coefficients, sense, rhs), with >= negated into <=.
+    rows = []
+    for i in range(m):
+        start, stop = original.indptr[i], original.indptr[i + 1]
+        sign = -1 if sense[i] > 0 else 1
+        rows.append((
+            original.indices[start:stop].copy(),
+            sign * original.data[start:stop].astype(np.int64),
+            0 if sense[i] == 0 else -1,
+            sign * int(rhs[i]),
+        ))
+
+    fixed = np.full(n, -1, dtype=np.int64)
+    counts = dict(rows=0, cost=0, redundant=0, duplicates=0, tightened=0)
+
+    def infeasible() -> ValueError:
+        return ValueError('presolve proved the constraints infeasible')
+
+    def substitute() -> None:
+        for k, (cols, data, s, b) in enumerate(rows):
+            state = fixed[cols]
+            if (state >= 0).any():
+                rows[k] = (cols[state < 0], data[state < 0], s, b - int(data[state == 1].sum()))
+
+    changed = True
+    while changed:
+        before = dict(counts)
+
+        # Divide by the gcd; drop empty, redundant and duplicated rows.
+        unique: dict[tuple, int] = {}
+        kept = []
+        for cols, data, s, b in rows:
+            g = math.gcd(*data.tolist()) if len(data) else 1
+            if g > 1:
+                if s == 0 and b % g:
+                    raise infeasible()
+                data, b = data // g, b // g
+            if s == 0 and len(data) and data[0] < 0:
+                data, b = -data, -b
+            if not len(data):
+                if (s < 0 and b < 0) or (s == 0 and b != 0):
+                    raise infeasible()
+                counts['redundant'] += 1
+                continue
+            if s < 0 and np.maximum(data, 0).sum() <= b:
+                counts['redundant'] += 1
+                continue
+            key = (s, cols.tobytes(), data.tobytes())
+            if key in unique:
+                counts['duplicates'] += 1
+                index = unique[key]
+                other = kept[index]
+                if s == 0 and other[3] != b:
+                    raise infeasible()
+                if s < 0 and b < other[3]:
+                    kept[index] = (cols, data, s, b)
+                continue
+            unique[key] = len(kept)
+            kept.append((cols, data, s, b))
+        rows[:] = kept
+
+        # Coefficient tightening of the <= rows.
+        for k, (cols, data, s, b) in enumerate(rows):
+            if s < 0:
+                data = data.copy()
+                top = int(np.maximum(data, 0).sum())
+                for position, value in enumerate(data.tolist()):
+                    if value > 0 and top - value < b:
+                        d = b - (top - value)
+                        data[position] -= d
+                        b -= d
+                        top -= d
+                        counts['tightened'] += 1
+                    elif value < 0 and top + value < b:
+                        data[position] += b - (top + value)
+                        counts['tightened'] += 1
+                rows[k] = (cols, data, s, b)
+
+        # Fixings forced by single rows.
+        free = np.flatnonzero(fixed < 0)
+        local = np.full(n, -1, dtype=np.int64)
+        local[free] = np.arange(len(free))
+        if rows:
+            reduced = sparse.csr_array(
+                (
+                    np.concatenate([data for _, data, _, _ in rows]).astype(float),
+                    np.concatenate([local[cols] for cols, _, _, _ in rows]),
+                    np.cumsum([0] + [len(cols) for cols, _, _, _ in rows]),
+                ),
+                shape=(len(rows), len(free)),
+            )
+            try:
+                forced = propagate_fixings(
+                    reduced,
+                    np.array([s for _, _, s, _ in rows], dtype=np.int64),
+                    np.array([b for _, _, _, b in rows], dtype=float),
+                )
+            except ValueError:
+                raise infeasible() from None
+            newly = forced >= 0
+            if newly.any():
+                fixed[free[newly]] = forced[newly]
+                counts['rows'] += int(newly.sum())
+                substitute()
+                continue
+
+        # Dual fixings: the cost and every row prefer the same value.
+        lowest = np.zeros(n, dtype=np.int64)
+        highest = np.zeros(n, dtype=np.int64)
+        in_equality = np.zeros(n, dtype=bool)
+        for cols, data, s, _ in rows:
+            np.minimum.at(lowest, cols, data)
+            np.maximum.at(highest, cols, data)
+            if s == 0:
+                in_equality[cols] = True
+        candidates = (fixed < 0) & ~in_equality
+        to_zero = candidates & (cost >= 0) & (lowest >= 0)
+        to_one = candidates & (cost <= 0) & (highest <= 0) & ~to_zero
+        if to_zero.any() or to_one.any():
+            fixed[to_zero] = 0
+            fixed[to_one] = 1
+            counts['cost'] += int(to_zero.sum() + to_one.sum())
+            substitute()
+
+        changed = counts != before
+
+    columns = np.flatnonzero(fixed < 0)
+    local = np.full(n, -1, dtype=np.int64)
+    local[columns] = np.arange(len(columns))
+    reduced = sparse.csr_array(
+        (
+            np.concatenate([data for _, data, _, _ in rows] or [np.empty(0)]).astype(float),
+            np.concatenate([local[cols] for cols, _, _, _ in rows] or [np.empty(0, dtype=np.int64)]),
+            np.cumsum([0] + [len(cols) for cols, _, _, _ in rows]),
+        ),
+        shape=(len(rows), len(columns)),
+    )
+
+    log = PresolveLog(
+        variables_before=n,
+        variables_after=len(columns),
+        rows_before=m,
+        rows_after=len(rows),
+        couplings_before=_couplings(original),
+        couplings_after=_couplings(reduced),
+        largest_coefficient_before=_largest(original),
+        largest_coefficient_after=_largest(reduced),
+        fixed_by_rows=counts['rows'],
+        fixed_by_cost=counts['cost'],
+        redundant_rows=counts['redundant'],
+        duplicate_rows=counts['duplicates'],
+        tightened_coefficients=counts['tightened'],
+    )
+    return PresolvedILP(
+        cost=cost[columns],
+        matrix=reduced,
+        senses=tuple('=' if s == 0 else '<=' for _, _, s, _ in rows),
+        rhs=np.array([b for _, _, _, b in rows], dtype=float),
+        offset=float(cost[fixed == 1].sum()),
+        columns=columns,
+        fixed=fixed,
+        log=log,
+    )
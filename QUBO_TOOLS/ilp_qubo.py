@@ -0,0 +1,378 @@
+################################################################################
+# ilp_qubo.py
+#
+# Compilation of a 0/1 integer linear program into a QUBO, with matrices.
+#
+# The PLI2QUBO lessons write each constraint of
+#
+#   minimize  c x    subject to  A x (<=, =, >=) b,  x binary
+#
+# symbolically in pyqubo, add slack variables by hand and square the result.
+# compile_ilp() does the same with sparse matrix products.  Every inequality
+# row i receives a slack s_i >= 0 that turns it into an equality,
+#
+#   A_i x + s_i = b_i   (<=),        A_i x - s_i = b_i   (>=),
+#
+# where s_i ranges over 0, ..., U_i, with U_i the largest value the row can
+# need: b_i - min A_i x for <=, max A_i x - b_i for >=, the extremes taken over
+# binary x.  s_i is written with the bounded binary expansion
+#
+#   s_i = 1 t_0 + 2 t_1 + ... + 2^(k-2) t_(k-2) + (U_i - 2^(k-1) + 1) t_(k-1),
+#
+# k = bit length of U_i, which reaches exactly 0, ..., U_i with k bits.  With
+# the extended matrix M = [A | slack columns] and the vector z = (x, t), the
+# penalty sum_i w_i (M_i z - b_i)^2 expands to
+#
+#   z' M' W M z - 2 b' W M z + b' W b,
+#
+# whose diagonal folds into the linear biases because z_k^2 = z_k for binary z.
+# M' W M is one sparse product, so sparse programs with thousands of rows and
+# columns compile in about a second.  Inequality rows need integer
+# coefficients, since the slack is an integer.
+#
+# With presolve=True (the default) the slacks are sized on the activities a
+# row can actually attain, not only on its extremes:
+#
+#   - bound propagation fixes the variables that some row forces to 0 or 1,
+#     e.g. x_j = 0 when min A_i x + a_ij > b_i in a <= row;
+#   - the activities of a row with the remaining variables free are a subset
+#     sum, computed exactly with a bitset of all attainable values as in
+#     sisi_exact.py (up to MAX_SUBSET_SUM_BITS bits, otherwise the extremes
+#     are used);
+#   - all activities of a row differ by multiples of the gcd g of its free
+#     coefficients, so a slack s_i = lo_i + g t_i needs only the bits of t_i,
+#     and the constant lo_i (the smallest slack any state needs) moves to
+#     the right-hand side;
+#   - rows that every binary x satisfies are dropped from the penalty.
+#
+# For example 2 x0 + 4 x1 + 6 x2 + 9 x3 <= 16 attains at most 15, so its slack
+# ranges over 1, ..., 16 and is 1 + t with four bits instead of five.
+# Every feasible x still has a slack reaching penalty 0, because it respects
+# the fixings and attains one of the activities the slack was sized for.
+################################################################################
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Sequence, Union
+
+import dimod
+import numpy as np
+from scipy import sparse
+
+
+# Accepted spellings of the constraint senses.
+SENSES = {'<=': -1, '=': 0, '==': 0, '>=': 1}
+
+# Largest span (sum of |a_ij| / g) of a row whose activities are enumerated.
+MAX_SUBSET_SUM_BITS = 1 << 24
+
+
+@dataclass(frozen=True)
+class CompiledILP:
+    """A 0/1 ILP as an objective BQM plus a penalty BQM.
+
+    The first num_variables labels are the x variables, in column order; the
+    others are slack bits.  slack_rows[k] and slack_coefficients[k] give the
+    constraint of slack bit k and its weight in the expansion of the slack;
+    slack_offsets[i] is the constant part of the slack of row i.  Rows in
+    dropped_rows hold for every binary x and are not part of the penalty.
+    """
+
+    objective: dimod.BinaryQuadraticModel
+    penalty: dimod.BinaryQuadraticModel
+    labels: tuple
+    num_variables: int
+    matrix: sparse.csr_array
+    rhs: np.ndarray
+    senses: np.ndarray
+    slack_rows: np.ndarray
+    slack_coefficients: np.ndarray
+    slack_offsets: np.ndarray
+    dropped_rows: np.ndarray
+
+    def bqm(self, multiplier: float) -> dimod.BinaryQuadraticModel:
+        """Return objective + multiplier * penalty."""
+
+        model = self.penalty.copy()
+        model.scale(multiplier)
+        model.update(self.objective)
+        return model
+
+    def _columns(self, sampleset: Union[dimod.SampleSet, dimod.typing.SamplesLike]) -> np.ndarray:
+        samples, variables = dimod.as_samples(sampleset)
+        position = {v: i for i, v in enumerate(variables)}
+        return samples[:, [position[label] for label in self.labels]].astype(np.int64)
+
+    def decode(self, sampleset: Union[dimod.SampleSet, dimod.typing.SamplesLike]) -> tuple[np.ndarray, np.ndarray]:
+        """Return (x, slacks): one row per sample, x and the slack values.
+
+        The slack of an equality row, or of a row without slack bits, is its
+        offset (0 unless presolve found a forced value).
+        """
+
+        columns = self._columns(sampleset)
+        x = columns[:, :self.num_variables]
+        bits = columns[:, self.num_variables:]
+        expansion = sparse.csr_array(
+            (self.slack_coefficients, (np.arange(len(self.slack_rows)), self.slack_rows)),
+            shape=(len(self.slack_rows), len(self.rhs)),
+        )
+        return x, self.slack_offsets + np.asarray(bits @ expansion)
+
+    def violations(self, x: np.ndarray) -> np.ndarray:
+        """Amount by which each constraint is violated, one row per x."""
+
+        x = np.atleast_2d(x)
+        residual = (self.matrix @ x.T).T - self.rhs
+        return np.where(
+            self.senses < 0, np.maximum(residual, 0),
+            np.where(self.senses > 0, np.maximum(-residual, 0), np.abs(residual)),
+        )
+
+    def is_feasible(self, x: np.ndarray) -> np.ndarray:
+        """Feasibility of each row of x."""
+
+        return ~self.violations(x).any(axis=1)
+
+
+def _slack_expansion(upper: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Bounded binary expansions of slacks ranging over 0, ..., upper[i].
+
+    Returns (row of each bit, coefficient of each bit).
+    """
+
+    bits = np.array([int(u).bit_length() for u in upper], dtype=np.int64)
+    rows = np.repeat(np.arange(len(upper)), bits)
+    starts = np.repeat(np.cumsum(bits) - bits, bits)
+    position = np.arange(len(rows)) - starts
+    last = np.repeat(bits - 1, bits)
+    coefficients = np.where(
+        position < last,
+        np.left_shift(1, position),
+        upper[rows] - np.left_shift(1, last) + 1,
+    )
+    return rows, coefficients.astype(np.int64)
+
+
+def parse_senses(senses: Union[str, Sequence[str]], m: int) -> np.ndarray:
+    """Return the senses of m rows as -1 (<=), 0 (=) and 1 (>=)."""
+
+    if isinstance(senses, str):
+        senses = [senses] * m
+    if len(senses) != m:
+        raise ValueError('senses must have one entry per row')
+    try:
+        return np.array([SENSES[s] for s in senses], dtype=np.int64)
+    except KeyError as error:
+        raise ValueError(f'unknown constraint sense {error.args[0]!r}') from None
+
+
+def propagate_fixings(a: sparse.csr_array, sense: np.ndarray, rhs: np.ndarray) -> np.ndarray:
+    """Fix the variables that a single row forces; -1 marks a free variable.
+
+    Rows are revisited until no new variable is fixed.  Raises ValueError when
+    the fixings contradict each other or some row.
+    """
+
+    m, n = a.shape
+    coo = a.tocoo()
+    rows, cols, data = coo.row, coo.col, coo.data
+    fixed = np.full(n, -1, dtype=np.int64)
+
+    while True:
+        free = fixed[cols] < 0
+        at_one = (fixed[cols] == 1) * data
+        low = np.bincount(rows, at_one + free * np.minimum(data, 0), minlength=m)
+        high = np.bincount(rows, at_one + free * np.maximum(data, 0), minlength=m)
+        if ((sense <= 0) & (low > rhs)).any() or ((sense >= 0) & (high < rhs)).any():
+            raise ValueError('the constraints cannot be satisfied by binary variables')
+
+        # Moving x_j from its best value for the row would break the row: in
+        # a <= row the best value is 0 when a_ij > 0, in a >= row it is 1.
+        upper_side = free & (sense[rows] <= 0) & (low[rows] + np.abs(data) > rhs[rows])
+        lower_side = free & (sense[rows] >= 0) & (high[rows] - np.abs(data) < rhs[rows])
+        columns = np.concatenate((cols[upper_side], cols[lower_side]))
+        if not len(columns):
+            return fixed
+        values = np.concatenate((data[upper_side] < 0, data[lower_side] > 0)).astype(np.int64)
+        pairs = np.unique(2 * columns + values)
+        if len(np.unique(pairs // 2)) < len(pairs):
+            raise ValueError('the constraints cannot be satisfied by binary variables')
+        fixed[pairs // 2] = pairs % 2
+
+
+def _plan_slacks(
+    a: sparse.csr_array,
+    sense: np.ndarray,
+    rhs: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Size the slack of every row on its attainable activities.
+
+    Returns (kept, offset, step, span): row i stays in the penalty when
+    kept[i], and its slack is offset[i] + step[i] t with t = 0, ..., span[i].
+    """
+
+    m, _ = a.shape
+    low = np.asarray(a.minimum(0).sum(axis=1)).ravel()
+    high = np.asarray(a.maximum(0).sum(axis=1)).ravel()
+    kept = ~(((sense < 0) & (high <= rhs)) | ((sense > 0) & (low >= rhs)))
+
+    fixed = propagate_fixings(a, sense, rhs)
+    offset = np.zeros(m, dtype=np.int64)
+    step = np.ones(m, dtype=np.int64)
+    span = np.zeros(m, dtype=np.int64)
+
+    for i in np.flatnonzero(kept):
+        columns = a.indices[a.indptr[i]:a.indptr[i + 1]]
+        data = a.data[a.indptr[i]:a.indptr[i + 1]].astype(np.int64)
+        free = fixed[columns] < 0
+        # Activity = base + sum of |a_ij| z_j over the free variables, where
+        # z_j = x_j for a_ij > 0 and z_j = 1 - x_j for a_ij < 0.
+        base = int(data[fixed[columns] == 1].sum() + np.minimum(data[free], 0).sum())
+        weights = np.abs(data[free])
+        g = math.gcd(*weights.tolist()) if len(weights) else 1
+        weights //= g
+        total = int(weights.sum())
+        b = int(rhs[i])
+
+        if sense[i] == 0:
+            if (b - base) % g or not 0 <= (b - base) // g <= total:
+                raise ValueError(f'constraint {i} cannot be satisfied by binary variables')
+            continue
+
+        if total <= MAX_SUBSET_SUM_BITS:
+            sums = 1
+            for w in weights.tolist():
+                sums |= sums << w
+        else:
+            sums = (1 << (total + 1)) - 1
+        if sense[i] < 0:
+            # Largest attainable activity base + g k <= b.
+            limit = (b - base) // g
+            k = (sums & ((1 << (limit + 1)) - 1)).bit_length() - 1
+            offset[i] = b - base - g * k
+            span[i] = k
+        else:
+            # Smallest attainable activity base + g k >= b.
+            start = max(0, -(-(b - base) // g))
+            above = sums >> start
+            k = start + (above & -above).bit_length() - 1
+            offset[i] = base + g * k - b
+            span[i] = total - k
+        step[i] = g
+
+    return kept, offset, step, span
+
+
+def compile_ilp(
+    cost: Sequence[float],
+    matrix: Union[np.ndarray, sparse.sparray, sparse.spmatrix],
+    senses: Union[str, Sequence[str]],
+    rhs: Sequence[float],
+    weights: Union[float, Sequence[float]] = 1.0,
+    variable_prefix: str = 'x',
+    slack_prefix: str = 's',
+    presolve: bool = True,
+) -> CompiledILP:
+    """Compile  minimize cost x  s.t.  matrix x (senses) rhs,  x binary.
+
+    senses is one of '<=', '=', '>=' for all rows, or one per row.  weights
+    scales the penalty of each row (the penalty BQM is unweighted otherwise);
+    the multiplier of the whole penalty is chosen later, with bqm().
+    Variables are labelled variable_prefix + column, and the slack bits of
+    row i slack_prefix + 'i_k'.  presolve=False sizes every slack on the
+    extremes of its row and keeps every row.
+    """
+
+    a = sparse.csr_array(matrix, dtype=float)
+    m, n = a.shape
+    cost = np.asarray(cost, dtype=float)
+    rhs = np.asarray(rhs, dtype=float)
+    if cost.shape != (n,) or rhs.shape != (m,):
+        raise ValueError('cost must have one entry per column and rhs one per row')
+
+    sense = parse_senses(senses, m)
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), (m,))
+
+    inequality = sense != 0
+    integral = np.concatenate((a[inequality].data, rhs[inequality]))
+    if presolve:
+        integral = np.concatenate((a.data, rhs))
+    if not np.all(np.mod(integral, 1) == 0):
+        raise ValueError(
+            'presolve needs integer coefficients' if presolve
+            else 'inequality constraints need integer coefficients'
+        )
+
+    if presolve:
+        kept, offset, step, span = _plan_slacks(a, sense, rhs)
+    else:
+        # Range of A_i x over binary x, and the slack each inequality needs.
+        low = np.asarray(a.minimum(0).sum(axis=1)).ravel()
+        high = np.asarray(a.maximum(0).sum(axis=1)).ravel()
+        upper = np.where(sense < 0, rhs - low, np.where(sense > 0, high - rhs, 0))
+        if (upper < 0).any():
+            row = int(np.flatnonzero(upper < 0)[0])
+            raise ValueError(f'constraint {row} cannot be satisfied by binary variables')
+        kept = np.ones(m, dtype=bool)
+        offset = np.zeros(m, dtype=np.int64)
+        step = np.ones(m, dtype=np.int64)
+        span = upper.astype(np.int64)
+
+    slack_rows, slack_coefficients = _slack_expansion(np.where(kept, span, 0))
+    slack_coefficients = step[slack_rows] * slack_coefficients
+    kept_rows = np.flatnonzero(kept)
+    local = np.cumsum(kept) - 1
+    slack_columns = sparse.csr_array(
+        (-sense[slack_rows] * slack_coefficients, (local[slack_rows], np.arange(len(slack_rows)))),
+        shape=(len(kept_rows), len(slack_rows)),
+        dtype=float,
+    )
+    extended = sparse.hstack((a[kept_rows], slack_columns), format='csr')
+    # The constant part of the slack moves to the right-hand side.
+    target = (rhs + sense * offset)[kept_rows]
+
+    # Penalty z' M'WM z - 2 b'W M z + b'W b, with z_k^2 = z_k.
+    weighted = sparse.diags_array(weights[kept_rows]) @ extended
+    gram = sparse.triu(extended.T @ weighted, format='coo')
+    diagonal = gram.row == gram.col
+    linear = np.zeros(extended.shape[1])
+    np.add.at(linear, gram.row[diagonal], gram.data[diagonal])
+    linear -= 2 * (weighted.T @ target)
+    off = ~diagonal & (gram.data != 0)
+
+    positions = np.arange(len(slack_rows)) - np.searchsorted(slack_rows, slack_rows)
+    labels = tuple(
+        [f'{variable_prefix}{j}' for j in range(n)]
+        + [f'{slack_prefix}{i}_{k}' for i, k in zip(slack_rows.tolist(), positions.tolist())]
+    )
+    penalty = dimod.BinaryQuadraticModel.from_numpy_vectors(
+        linear,
+        (gram.row[off], gram.col[off], 2 * gram.data[off]),
+        float(weights[kept_rows] @ target ** 2),
+        dimod.BINARY,
+        variable_order=labels,
+    )
+    objective = dimod.BinaryQuadraticModel.from_numpy_vectors(
+        np.concatenate((cost, np.zeros(len(slack_rows)))),
+        (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)),
+        0.0,
+        dimod.BINARY,
+        variable_order=labels,
+    )
+
+    return CompiledILP(
+        objective=objective,
+        penalty=penalty,
+        labels=labels,
+        num_variables=n,
+        matrix=a,
+        rhs=rhs,
+        senses=sense,
+        slack_rows=slack_rows,
+        slack_coefficients=slack_coefficients,
+        slack_offsets=np.where(sense != 0, offset, 0),
+        dropped_rows=np.flatnonzero(~kept),
+    )
@@ -0,0 +1,360 @@
+################################################################################
+# lagrange_sweep.py
+#
+# Sweep of the Lagrange multiplier of a penalty model, with one compilation.
+#
+# The lesson scripts write H = objective + L * penalty with L = Placeholder('L')
+# and try one value of L at a time through to_bqm(feed_dict={'L': ...}).
+# Since H is linear in L, two expansions are enough for every value:
+#
+#   objective = H(L = 0),   penalty = H(L = 1) - H(L = 0).
+#
+# LagrangeSweep stores the two models as NumPy arrays over the same variables
+# and the same list of couplings, so the BQM for a value of L is the array
+# combination objective + L * penalty.  Each value of L is sampled separately,
+# in a process pool when num_workers > 1, and summarized by:
+#
+#   - the fraction of reads that are feasible, i.e. with zero penalty;
+#   - the best objective among the feasible reads;
+#   - whether every lowest-energy read is feasible;
+#   - the time spent sampling and evaluating.
+#
+# PenaltySearch looks for the smallest L whose lowest-energy reads are all
+# feasible.  It starts from an upper end that is either given, or the
+# analytic bound of penalty_upper_bound(), or found by doubling L from 1;
+# then it bisects between the largest infeasible and the smallest feasible L
+# seen.  Every value of L is sampled once: the summaries are kept in
+# PenaltySearch.results and reused by later searches.
+#
+# A read is feasible when its penalty energy is 0.  This presumes that the
+# penalty is non-negative and vanishes exactly on the feasible states, as the
+# sums of squared Constraint(...) terms in the lessons do.
+################################################################################
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional, Sequence
+
+import dimod
+import numpy as np
+
+
+@dataclass(frozen=True)
+class MultiplierResult:
+    """Summary of the reads obtained for one value of the multiplier."""
+
+    multiplier: float
+    num_reads: int
+    feasible_fraction: float
+    best_objective: Optional[float]
+    best_sample: Optional[dict]
+    lowest_energy: float
+    lowest_is_feasible: bool
+    seconds: float
+
+
+class LagrangeSweep:
+    """Objective and penalty of a model, combined for any multiplier."""
+
+    def __init__(self, objective: dimod.BinaryQuadraticModel, penalty: dimod.BinaryQuadraticModel) -> None:
+        if objective.vartype is not penalty.vartype:
+            penalty = penalty.change_vartype(objective.vartype, inplace=False)
+
+        self.objective = objective
+        self.penalty = penalty
+        self.vartype = objective.vartype
+        self.variables = list(objective.variables)
+        self.variables += [v for v in penalty.variables if v not in objective.variables]
+
+        n = len(self.variables)
+        parts = [model.to_numpy_vectors(self.variables) for model in (objective, penalty)]
+        keys = [np.minimum(rows, cols) * n + np.maximum(rows, cols) for _, (rows, cols, _), _ in parts]
+        pairs, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+        self._rows = pairs // n
+        self._cols = pairs % n
+
+        self._linear = []
+        self._quadratic = []
+        self._offset = []
+        start = 0
+        for (linear, (_, _, biases), offset), key in zip(parts, keys):
+            quadratic = np.zeros(len(pairs))
+            np.add.at(quadratic, inverse[start:start + len(key)], biases)
+            start += len(key)
+            self._linear.append(np.asarray(linear, dtype=float))
+            self._quadratic.append(quadratic)
+            self._offset.append(float(offset))
+
+        scale = 1.0 + sum(np.abs(q).sum() + np.abs(h).sum() + abs(c)
+                          for h, q, c in zip(self._linear, self._quadratic, self._offset))
+        self.tolerance = 1e-9 * scale
+
+    @classmethod
+    def from_model(
+        cls,
+        model: Any,
+        name: str = 'L',
+        feed_dict: Optional[Mapping[str, float]] = None,
+    ) -> 'LagrangeSweep':
+        """Split a compiled pyqubo model that is linear in Placeholder(name).
+
+        feed_dict gives the values of any other placeholder of the model.
+        """
+
+        def expand(value: float) -> dimod.BinaryQuadraticModel:
+            return model.to_bqm(feed_dict={**(feed_dict or {}), name: value})
+
+        at_zero = expand(0.0)
+        sweep = cls(at_zero, expand(1.0) - at_zero)
+
+        # A third expansion catches placeholders that enter non-linearly.
+        residual = expand(2.0) - sweep.bqm(2.0)
+        biases = [*residual.linear.values(), *residual.quadratic.values(), residual.offset]
+        if max(map(abs, biases)) > sweep.tolerance:
+            raise ValueError(f'the model is not linear in {name}')
+        return sweep
+
+    def bqm(self, multiplier: float) -> dimod.BinaryQuadraticModel:
+        """Return objective + multiplier * penalty."""
+
+        return dimod.BinaryQuadraticModel.from_numpy_vectors(
+            self._linear[0] + multiplier * self._linear[1],
+            (self._rows, self._cols, self._quadratic[0] + multiplier * self._quadratic[1]),
+            self._offset[0] + multiplier * self._offset[1],
+            self.vartype,
+            variable_order=self.variables,
+        )
+
+    def evaluate(self, multiplier: float, sampleset: dimod.SampleSet, seconds: float = 0.0) -> MultiplierResult:
+        """Summarize the reads of sampleset, obtained for multiplier."""
+
+        samples = dimod.as_samples(sampleset)
+        counts = sampleset.record.num_occurrences
+        objective = self.objective.energies(samples)
+        feasible = self.penalty.energies(samples) <= self.tolerance
+        energies = sampleset.record.energy
+        ground = energies <= energies.min() + self.tolerance
+
+        best_objective = None
+        best_sample = None
+        if feasible.any():
+            best = int(np.flatnonzero(feasible)[np.argmin(objective[feasible])])
+            best_objective = float(objective[best])
+            best_sample = dict(zip(samples[1], samples[0][best].tolist()))
+
+        return MultiplierResult(
+            multiplier=multiplier,
+            num_reads=int(counts.sum()),
+            feasible_fraction=float(counts[feasible].sum() / counts.sum()),
+            best_objective=best_objective,
+            best_sample=best_sample,
+            lowest_energy=float(energies.min()),
+            lowest_is_feasible=bool(feasible[ground].all()),
+            seconds=seconds,
+        )
+
+    def sample(self, multiplier: float, sampler: dimod.Sampler, **sample_kwargs) -> MultiplierResult:
+        """Sample the model for one multiplier and summarize the reads."""
+
+        started = time.perf_counter()
+        sampleset = sampler.sample(self.bqm(multiplier), **sample_kwargs)
+        return self.evaluate(multiplier, sampleset, time.perf_counter() - started)
+
+    def run(
+        self,
+        multipliers: Sequence[float],
+        sampler: Optional[dimod.Sampler] = None,
+        num_workers: int = 1,
+        **sample_kwargs,
+    ) -> list[MultiplierResult]:
+        """Sample every multiplier, in order, and return their summaries.
+
+        sampler defaults to neal's simulated annealing.  With num_workers > 1
+        the multipliers are sampled in a process pool, so the sampler must be
+        picklable.
+        """
+
+        if num_workers < 1:
+            raise ValueError('num_workers must be positive')
+        if sampler is None:
+            from neal import SimulatedAnnealingSampler
+            sampler = SimulatedAnnealingSampler()
+
+        if num_workers == 1 or len(multipliers) <= 1:
+            return [self.sample(value, sampler, **sample_kwargs) for value in multipliers]
+
+        with ProcessPoolExecutor(
+            max_workers=min(num_workers, len(multipliers)),
+            mp_context=multiprocessing.get_context(),
+            initializer=_init_sweep_worker,
+            initargs=(self, sampler, sample_kwargs),
+        ) as executor:
+            return list(executor.map(_sample_in_worker, multipliers))
+
+
+################################################################################
+# Smallest multiplier with feasible ground states.
+################################################################################
+def penalty_upper_bound(sweep: LagrangeSweep, min_violation: Optional[float] = None) -> float:
+    """Return U such that for every L > U all ground states are feasible.
+
+    An infeasible state has penalty at least min_violation, so for
+    L > (max objective - min objective) / min_violation its energy exceeds
+    that of every feasible state, provided one exists.  The objective range
+    is bounded by the sum of the absolute biases of its binary form.  When
+    the binary penalty has integer biases, min_violation defaults to 1.
+    """
+
+    objective = sweep.objective.change_vartype(dimod.BINARY, inplace=False)
+    penalty = sweep.penalty.change_vartype(dimod.BINARY, inplace=False)
+    if min_violation is None:
+        biases = [*penalty.linear.values(), *penalty.quadratic.values(), penalty.offset]
+        if not all(float(bias).is_integer() for bias in biases):
+            raise ValueError('min_violation is needed when the penalty has non-integer biases')
+        min_violation = 1.0
+    if min_violation <= 0:
+        raise ValueError('min_violation must be positive')
+
+    spread = sum(abs(bias) for bias in objective.linear.values())
+    spread += sum(abs(bias) for bias in objective.quadratic.values())
+    return spread / min_violation
+
+
+@dataclass(frozen=True)
+class SearchOutcome:
+    """Result of PenaltySearch.minimum_feasible().
+
+    multiplier is the smallest feasible L found, infeasible the largest L
+    seen to be infeasible below it (None if none was sampled).
+    """
+
+    multiplier: float
+    infeasible: Optional[float]
+    result: MultiplierResult
+
+
+class PenaltySearch:
+    """Memoized search of the smallest multiplier with feasible ground states.
+
+    sampler and sample_kwargs are used for every value of L; feasibility is
+    MultiplierResult.lowest_is_feasible, so it is only as reliable as the
+    sampler's ground states.
+    """
+
+    # Doublings of L tried before giving up, when no upper end is given.
+    MAX_DOUBLINGS = 60
+
+    def __init__(self, sweep: LagrangeSweep, sampler: Optional[dimod.Sampler] = None, **sample_kwargs) -> None:
+        if sampler is None:
+            from neal import SimulatedAnnealingSampler
+            sampler = SimulatedAnnealingSampler()
+        self.sweep = sweep
+        self.sampler = sampler
+        self.sample_kwargs = sample_kwargs
+        self.results: dict[float, MultiplierResult] = {}
+
+    def result(self, multiplier: float) -> MultiplierResult:
+        """Summary for multiplier, sampled only on the first request."""
+
+        multiplier = float(multiplier)
+        if multiplier not in self.results:
+            self.results[multiplier] = self.sweep.sample(multiplier, self.sampler, **self.sample_kwargs)
+        return self.results[multiplier]
+
+    def feasible(self, multiplier: float) -> bool:
+        return self.result(multiplier).lowest_is_feasible
+
+    def minimum_feasible(
+        self,
+        lower: float = 0.0,
+        upper: float | str | None = None,
+        resolution: Optional[float] = None,
+        integral: bool = False,
+    ) -> SearchOutcome:
+        """Find the smallest feasible L in (lower, upper], up to resolution.
+
+        upper='analytic' starts from penalty_upper_bound(); None doubles L from
+        max(1, lower) until it is feasible.  The search stops when the
+        feasible and infeasible ends are closer than resolution, which
+        defaults to 1% of the feasible end; with integral=True only integer
+        values of L are tried.
+        """
+
+        infeasible = None
+        if lower > 0:
+            if self.feasible(lower):
+                return SearchOutcome(float(lower), None, self.result(lower))
+            infeasible = float(lower)
+
+        if upper == 'analytic':
+            upper = penalty_upper_bound(self.sweep)
+            # Every L above the bound works; the bound itself may tie.
+            upper = math.floor(upper) + 1 if integral else upper * (1 + 1e-6) + 1e-9
+        if upper is None:
+            upper = max(1.0, float(lower))
+            if integral:
+                upper = math.ceil(upper)
+            for _ in range(self.MAX_DOUBLINGS):
+                if self.feasible(upper):
+                    break
+                infeasible = upper
+                upper *= 2
+            else:
+                raise RuntimeError(f'no feasible multiplier up to {upper}')
+        elif not self.feasible(upper):
+            raise RuntimeError(f'the upper end {upper} is not feasible')
+
+        feasible = float(upper)
+        low = 0.0 if infeasible is None else infeasible
+        while True:
+            step = 1.0 if integral else (resolution if resolution is not None else 0.01 * feasible)
+            if feasible - low <= step:
+                break
+            middle = (low + feasible) / 2
+            if integral:
+                middle = math.floor(middle)
+                if middle <= low:
+                    break
+            if self.feasible(middle):
+                feasible = middle
+            else:
+                low = infeasible = middle
+
+        return SearchOutcome(
+            float(feasible),
+            None if infeasible is None else float(infeasible),
+            self.result(feasible),
+        )
+
+
+# Sweep, sampler and sampling arguments of a worker process.
+_worker_state: Optional[tuple] = None
+
+
+def _init_sweep_worker(sweep: LagrangeSweep, sampler: dimod.Sampler, sample_kwargs: dict) -> None:
+    global _worker_state
+    _worker_state = (sweep, sampler, sample_kwargs)
+
+
+def _sample_in_worker(multiplier: float) -> MultiplierResult:
+    sweep, sampler, sample_kwargs = _worker_state
+    return sweep.sample(multiplier, sampler, **sample_kwargs)
+
+
+def format_results(results: Sequence[MultiplierResult]) -> str:
+    """Return a table with one line per multiplier."""
+
+    lines = [f'{"L":>10} {"feasible":>9} {"best objective":>15} {"lowest":>12} {"lowest ok":>9} {"seconds":>8}']
+    for result in results:
+        best = '-' if result.best_objective is None else f'{result.best_objective:g}'
+        lines.append(
+            f'{result.multiplier:>10g} {result.feasible_fraction:>9.1%} {best:>15} '
+            f'{result.lowest_energy:>12g} {"yes" if result.lowest_is_feasible else "no":>9} '
+            f'{result.seconds:>8.3f}'
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,315 @@
+################################################################################
+# local_hybrid.py
+#
+# Offline stand-ins for LeapHybridSampler and LeapHybridCQMSampler.
+#
+# The Leap hybrid solvers run in the cloud, so the lessons that use them
+# (Dwave_and_Hibrid_compared.py, LeapHybridSampler.py, DWAVE_knapsack.py)
+# cannot run without an account and a network.  LocalHybridSampler has the
+# same call, sample(bqm, time_limit=None, label=None), returns one sample
+# like Leap, and fills the same info fields (run_time and charge_time in
+# microseconds, qpu_access_time always 0) and solver.name.
+#
+# Models larger than one subproblem are solved as in dwave-hybrid's Kerberos
+# workflow, which races a full-model search against energy-impact
+# decomposition:
+#
+#   1. a simulated annealing run on the whole model gives a state x;
+#   2. each iteration first anneals the whole model again from x, at low
+#      temperature, and keeps the result if it is better;
+#   3. then it ranks the variables by the energy gain of flipping them in x,
+#      -(1 - 2 x_i) (h_i + sum_j J_ij x_j), and, taking seeds in this order,
+#      grows `subproblems` windows of subproblem_size variables by a
+#      breadth-first visit of the interaction graph (connected windows:
+#      isolated variables of a local minimum cannot improve together);
+#   4. the other variables are fixed to x, which folds their couplings into
+#      the linear biases of the window's subproblem; the subproblem is solved
+#      with sub_sampler (neal, or for instance dwave.samplers.TabuSampler)
+#      and its best state replaces x on the window unless it is worse;
+#   5. iterations go on until time_limit, or until `convergence` iterations
+#      in a row improve nothing.
+#
+# The model is kept as a SparseQUBO (sparse_qubo.py): the local fields are
+# updated with one sparse product per accepted subproblem, so the loop
+# scales to models with 10^5-10^6 couplings.
+#
+# LocalHybridCQMSampler.sample_cqm() converts the CQM with dimod.cqm_to_bqm()
+# and returns its answer as a CQM SampleSet, with is_feasible/is_satisfied.
+################################################################################
+
+from __future__ import annotations
+
+import math
+import time
+import uuid
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+
+import dimod
+import numpy as np
+
+from sparse_qubo import SparseQUBO
+
+
+# Minimum time_limit (seconds) as a function of the number of biases,
+# interpolated linearly as Leap's 'minimum_time_limit' property.
+MINIMUM_TIME_LIMIT = ((1, 0.1), (10_000, 1.0), (1_000_000, 30.0))
+
+# Default number of variables of a subproblem.
+SUBPROBLEM_SIZE = 50
+
+# Default num_reads of the sub-sampler on each subproblem.
+SUB_READS = 10
+
+# Sweeps of the simulated annealing run that gives the initial state.
+INITIAL_SWEEPS = 1000
+
+# Default number of subproblems solved per iteration.
+SUBPROBLEMS = 10
+
+# Sweeps and temperature range (coldest beta / REHEAT to coldest beta) of the
+# annealing runs that restart from the current state.
+REFINE_SWEEPS = 300
+REHEAT = 8.0
+
+# Default number of iterations without improvement that stop the search.
+CONVERGENCE = 3
+
+
+def _grow_window(seed: int, indptr: np.ndarray, indices: np.ndarray, taken: np.ndarray, size: int) -> np.ndarray:
+    """Breadth-first visit from seed over the variables not taken yet."""
+
+    window = [seed]
+    taken[seed] = True
+    queue = deque(window)
+    while queue and len(window) < size:
+        v = queue.popleft()
+        for u in indices[indptr[v]:indptr[v + 1]].tolist():
+            if not taken[u]:
+                taken[u] = True
+                window.append(u)
+                queue.append(u)
+                if len(window) == size:
+                    break
+    return np.sort(np.array(window))
+
+
+class LocalHybridSampler(dimod.Sampler):
+    """LeapHybridSampler look-alike that decomposes large BQMs locally.
+
+    See the module comment for the algorithm.
+    """
+
+    parameters = {
+        'time_limit': ['minimum_time_limit'],
+        'label': [],
+        'subproblem_size': [],
+        'subproblems': [],
+        'sub_sampler': [],
+        'sub_reads': [],
+        'convergence': [],
+        'seed': [],
+    }
+
+    solver = SimpleNamespace(name='local_hybrid_binary_quadratic_model')
+
+    properties = {
+        'category': 'hybrid',
+        'supported_problem_types': ['bqm'],
+        'minimum_time_limit': [list(point) for point in MINIMUM_TIME_LIMIT],
+    }
+
+    def min_time_limit(self, bqm: dimod.BinaryQuadraticModel) -> float:
+        """Smallest time_limit accepted for bqm, in seconds."""
+
+        biases, limits = zip(*MINIMUM_TIME_LIMIT)
+        return float(np.interp(bqm.num_variables + bqm.num_interactions, biases, limits))
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        time_limit: Optional[float] = None,
+        label: Optional[str] = None,
+        subproblem_size: int = SUBPROBLEM_SIZE,
+        subproblems: int = SUBPROBLEMS,
+        sub_sampler: Optional[dimod.Sampler] = None,
+        sub_reads: int = SUB_READS,
+        convergence: int = CONVERGENCE,
+        seed: Optional[int] = None,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Minimize bqm for at most time_limit seconds (default: the minimum).
+
+        sub_sampler defaults to neal's simulated annealing; it is called with
+        num_reads=sub_reads, and with a seed when it accepts one.
+        """
+
+        self.remove_unknown_kwargs(**kwargs)
+        started = time.perf_counter()
+        minimum = self.min_time_limit(bqm)
+        if time_limit is None:
+            time_limit = minimum
+        elif time_limit < minimum:
+            raise ValueError(f'time_limit must be at least {minimum:g} seconds for this model')
+        if subproblem_size < 1:
+            raise ValueError('subproblem_size must be positive')
+
+        from neal import SimulatedAnnealingSampler
+        if sub_sampler is None:
+            sub_sampler = SimulatedAnnealingSampler()
+        rng = np.random.default_rng(seed)
+
+        def sub_kwargs() -> dict:
+            kwargs = {'num_reads': sub_reads}
+            if 'seed' in sub_sampler.parameters:
+                kwargs['seed'] = int(rng.integers(2**31))
+            return kwargs
+
+        model = SparseQUBO.from_bqm(bqm)
+        variables = list(model.variables)
+        n = model.num_variables
+        iterations = 0
+        improvements = 0
+
+        def remaining() -> float:
+            return time_limit - (time.perf_counter() - started)
+
+        if n <= subproblem_size:
+            # The whole model is one subproblem: sample it again until
+            # convergence or time_limit, keeping the best state.
+            whole = model.to_bqm()
+            x, energy = np.zeros(n), math.inf
+            stale = 0
+            while n and stale < convergence and remaining() > 0:
+                result = sub_sampler.sample(whole, **sub_kwargs())
+                iterations += 1
+                candidate = model.sample_matrix(result)[int(np.argmin(result.record.energy))]
+                candidate_energy = model.energies(candidate)
+                if candidate_energy < energy - 1e-9:
+                    if iterations > 1:
+                        improvements += 1
+                    x, energy, stale = candidate, candidate_energy, 0
+                else:
+                    stale += 1
+        else:
+            annealer = SimulatedAnnealingSampler()
+            full = model.to_bqm()
+            initial = annealer.sample(full, num_reads=1, num_sweeps=INITIAL_SWEEPS, seed=int(rng.integers(2**31)))
+            cold = initial.info['beta_range'][1]
+            x = model.sample_matrix(initial)[0].astype(float)
+            energy = model.energies(x)
+            field = model.local_fields(x)[0]
+            symmetric = model.symmetric
+            refine_seconds = 0.0
+            stale = 0
+            while stale < convergence and remaining() > 0:
+                improved = False
+                iterations += 1
+
+                # Full-model branch: anneal again from x, at low temperature.
+                if remaining() > refine_seconds:
+                    clock = time.perf_counter()
+                    refined = annealer.sample(
+                        full,
+                        num_reads=1,
+                        num_sweeps=REFINE_SWEEPS,
+                        initial_states=(x[np.newaxis, :].astype(np.int8), variables),
+                        beta_range=(cold / REHEAT, cold),
+                        seed=int(rng.integers(2**31)),
+                    )
+                    refine_seconds = time.perf_counter() - clock
+                    candidate = model.sample_matrix(refined)[0].astype(float)
+                    candidate_energy = model.energies(candidate)
+                    if candidate_energy < energy - 1e-9:
+                        x, energy = candidate, candidate_energy
+                        field = model.local_fields(x)[0]
+                        improvements += 1
+                        improved = True
+
+                # Decomposed branch: subproblems around the highest-impact variables.
+                order = np.argsort((1 - 2 * x) * field, kind='stable')
+                taken = np.zeros(n, dtype=bool)
+                solved = 0
+                for seed_variable in order.tolist():
+                    if solved == subproblems or remaining() <= 0:
+                        break
+                    if taken[seed_variable]:
+                        continue
+                    window = _grow_window(seed_variable, symmetric.indptr, symmetric.indices, taken, subproblem_size)
+                    inner = symmetric[window][:, window]
+                    sub = SparseQUBO(
+                        field[window] - inner @ x[window],
+                        model.quadratic[window][:, window].tocsr(),
+                    )
+                    if not inner.nnz:
+                        continue
+                    result = sub_sampler.sample(sub.to_bqm(), **sub_kwargs())
+                    solved += 1
+                    candidate = sub.sample_matrix(result)[int(np.argmin(result.record.energy))]
+                    gain = sub.energies(x[window]) - sub.energies(candidate)
+                    # Equal-energy moves are kept too, to drift along plateaus.
+                    if gain >= -1e-9:
+                        field += (candidate - x[window]) @ symmetric[window]
+                        x[window] = candidate
+                        energy -= gain
+                        if gain > 1e-9:
+                            improvements += 1
+                            improved = True
+                stale = 0 if improved else stale + 1
+
+        run_time = int(1e6 * (time.perf_counter() - started))
+        info = {
+            'qpu_access_time': 0,
+            'charge_time': run_time,
+            'run_time': run_time,
+            'problem_id': str(uuid.uuid4()),
+            'problem_label': label,
+            'iterations': iterations,
+            'improvements': improvements,
+        }
+        sample = np.asarray(x, dtype=np.int8)
+        if bqm.vartype is dimod.SPIN:
+            sample = 2 * sample - 1
+        return dimod.SampleSet.from_samples_bqm((sample[np.newaxis, :], variables), bqm, info=info)
+
+
+class LocalHybridCQMSampler:
+    """LeapHybridCQMSampler look-alike built on LocalHybridSampler.
+
+    The CQM is converted with dimod.cqm_to_bqm(), whose default Lagrange
+    multiplier is 10 times the largest objective bias; the returned
+    SampleSet tells whether the answer satisfies the constraints.
+    """
+
+    solver = SimpleNamespace(name='local_hybrid_constrained_quadratic_model')
+
+    properties = {
+        'category': 'hybrid',
+        'supported_problem_types': ['cqm'],
+    }
+
+    def __init__(self) -> None:
+        self.bqm_sampler = LocalHybridSampler()
+
+    def min_time_limit(self, cqm: dimod.ConstrainedQuadraticModel) -> float:
+        bqm, _ = dimod.cqm_to_bqm(cqm)
+        return self.bqm_sampler.min_time_limit(bqm)
+
+    def sample_cqm(
+        self,
+        cqm: dimod.ConstrainedQuadraticModel,
+        time_limit: Optional[float] = None,
+        label: Optional[str] = None,
+        lagrange_multiplier: Optional[float] = None,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Minimize cqm; other keyword arguments go to LocalHybridSampler.sample()."""
+
+        bqm, invert = dimod.cqm_to_bqm(cqm, lagrange_multiplier)
+        sampleset = self.bqm_sampler.sample(bqm, time_limit=time_limit, label=label, **kwargs)
+        return dimod.SampleSet.from_samples_cqm(
+            [invert(sample) for sample in sampleset.samples()],
+            cqm,
+            info=sampleset.info,
+        )
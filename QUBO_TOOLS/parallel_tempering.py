@@ -0,0 +1,324 @@
+################################################################################
+# parallel_tempering.py
+#
+# Replica-exchange Monte Carlo (parallel tempering) for BQMs.
+#
+# Simulated annealing cools one state once: on penalty-heavy models, such as
+# KP2QUBO-PLI.py or the MVC lessons with a large L, the state freezes early
+# in a feasible but poor valley, and the usual remedy is more num_reads.
+# Parallel tempering keeps num_replicas copies of the state at fixed inverse
+# temperatures beta_1 < ... < beta_M and, every swap_interval sweeps,
+# proposes to exchange the states of neighbouring temperatures, accepting
+# with probability min(1, exp((beta_k - beta_(k+1)) (E_k - E_(k+1)))).  Hot
+# replicas cross the barriers, and good states percolate down to the cold
+# ones.
+#
+# Implementation:
+#
+#   - the replicas of all the reads are the rows of one matrix, and a
+#     Metropolis sweep updates a whole colour class of the interaction graph
+#     (variables with no coupling between them) at once, for every row; the
+#     local fields are updated with one sparse product per class;
+#   - the ladder starts geometric in beta_range (by default the range neal
+#     would use) and, during the first tune_fraction of the sweeps, is
+#     re-spaced every TUNE_ROUND sweeps so that every pair of neighbouring
+#     temperatures has the same swap acceptance: with r_k = -ln(acceptance)
+#     of gap k, the betas are moved to equal steps of the cumulative r;
+#   - each read is an independent ladder and returns the lowest-energy state
+#     seen by any of its replicas; with num_workers > 1 the reads are split
+#     among processes.
+#
+# ParallelTemperingSampler accepts neal's num_reads, num_sweeps, beta_range,
+# seed and initial_states, so it can replace SimulatedAnnealingSampler.
+################################################################################
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import dimod
+import numpy as np
+from scipy import sparse
+
+from sparse_qubo import SparseQUBO
+
+
+# Default number of temperatures of a ladder.
+DEFAULT_REPLICAS = 16
+
+# Sweeps between two adjustments of the ladder while it is tuned.
+TUNE_ROUND = 20
+
+# Above this fraction of nonzero couplings the model is handled as dense.
+DENSE_FRACTION = 0.1
+
+
+def default_beta_range(model: SparseQUBO) -> tuple[float, float]:
+    """(hot, cold) betas in neal's spirit.
+
+    At the hot end the largest possible flip is accepted with probability
+    1/2, at the cold end the smallest nonzero bias with probability 1/100.
+    """
+
+    symmetric = abs(model.symmetric)
+    largest = float((np.abs(model.linear) + symmetric.sum(axis=1)).max(initial=0))
+    biases = np.concatenate((np.abs(model.linear), symmetric.data))
+    biases = biases[biases > 0]
+    if not len(biases):
+        return 0.1, 1.0
+    return math.log(2) / largest, math.log(100) / float(biases.min())
+
+
+def _color_classes(symmetric: sparse.csr_array) -> list[np.ndarray]:
+    """Greedy colouring of the interaction graph, largest degree first."""
+
+    indptr, indices = symmetric.indptr, symmetric.indices
+    colors = np.full(symmetric.shape[0], -1, dtype=np.int64)
+    for v in np.argsort(-np.diff(indptr), kind='stable').tolist():
+        used = colors[indices[indptr[v]:indptr[v + 1]]]
+        free = np.ones(len(used) + 1, dtype=bool)
+        free[used[(used >= 0) & (used <= len(used))]] = False
+        colors[v] = int(np.argmax(free))
+    return [np.flatnonzero(colors == c) for c in range(int(colors.max(initial=-1)) + 1)]
+
+
+def _retune(betas: np.ndarray, acceptance: np.ndarray) -> np.ndarray:
+    """Re-space the inner betas for equal swap acceptance between neighbours."""
+
+    resistance = -np.log(np.clip(acceptance, 1e-3, 1.0)) + 1e-3
+    cumulative = np.concatenate(([0.0], np.cumsum(resistance)))
+    target = np.interp(np.linspace(0, cumulative[-1], len(betas)), cumulative, betas)
+    # Half steps keep the noisy acceptance estimates from making it oscillate.
+    return (betas + target) / 2
+
+
+class MetropolisSweeps:
+    """Colour classes and coupling blocks of a model, built once.
+
+    sweep() updates every row of a state matrix with one Metropolis sweep,
+    each row at its own beta; population_annealing.py uses it as well.
+    """
+
+    def __init__(self, model: SparseQUBO) -> None:
+        self.model = model
+        symmetric = model.symmetric
+        n = model.num_variables
+        dense = symmetric.nnz > DENSE_FRACTION * n * n
+        self.classes = _color_classes(symmetric)
+        # For each class: the columns its variables touch and the block of
+        # couplings between the two, so that a sweep updates only those fields.
+        # Slices instead of index arrays where possible: on dense models the
+        # classes are single variables, and copies would dominate a sweep.
+        self.blocks = []
+        for c, members in enumerate(self.classes):
+            rows = symmetric[members]
+            if dense:
+                self.blocks.append((slice(None), rows.toarray()))
+            else:
+                touched = np.unique(rows.indices)
+                self.blocks.append((touched, rows[:, touched].tocsr()))
+            if len(members) and members[-1] - members[0] == len(members) - 1:
+                self.classes[c] = slice(int(members[0]), int(members[-1]) + 1)
+
+    def sweep(
+        self,
+        x: np.ndarray,
+        field: np.ndarray,
+        energy: np.ndarray,
+        row_betas: np.ndarray,
+        rng: np.random.Generator,
+    ) -> None:
+        """One sweep of every row of x, updating x, field and energy in place."""
+
+        # Metropolis: flip when delta < -ln(u) / beta, u uniform in (0, 1].
+        threshold = -np.log1p(-rng.random(x.shape)) / row_betas[:, np.newaxis]
+        for members, (touched, block) in zip(self.classes, self.blocks):
+            spin = 1 - 2 * x[:, members]
+            delta = spin * field[:, members]
+            flip = delta < threshold[:, members]
+            if flip.any():
+                step = np.where(flip, spin, 0.0)
+                x[:, members] += step
+                energy += (delta * flip).sum(axis=1)
+                field[:, touched] += np.asarray(step @ block)
+
+
+class _Ladders(MetropolisSweeps):
+    """The tempering loop over the sweeps of MetropolisSweeps."""
+
+    def run(
+        self,
+        betas: np.ndarray,
+        starts: np.ndarray,
+        num_sweeps: int,
+        swap_interval: int,
+        tune_sweeps: int,
+        seed: Optional[int],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Run one ladder per row of starts (-1 entries are random).
+
+        Returns the best state of each ladder, the final betas and the swap
+        acceptance of each gap after tuning.
+        """
+
+        model = self.model
+        rng = np.random.default_rng(seed)
+        reads = len(starts)
+        m = len(betas)
+        betas = betas.copy()
+
+        x = np.repeat(starts, m, axis=0).astype(float)
+        random = x < 0
+        x[random] = rng.integers(0, 2, int(random.sum()))
+        field = model.local_fields(x)
+        energy = model.energies(x)
+        row_betas = np.tile(betas, reads)
+
+        by_read = energy.reshape(reads, m)
+        best_energy = by_read.min(axis=1)
+        best_state = x[np.arange(reads) * m + by_read.argmin(axis=1)].copy()
+
+        attempts = np.zeros(m - 1)
+        accepts = np.zeros(m - 1)
+        swaps = 0
+        for sweep in range(num_sweeps):
+            self.sweep(x, field, energy, row_betas, rng)
+
+            by_read = energy.reshape(reads, m)
+            lowest = by_read.min(axis=1)
+            better = lowest < best_energy
+            if better.any():
+                where = np.flatnonzero(better)
+                best_energy[where] = lowest[where]
+                best_state[where] = x[where * m + by_read[where].argmin(axis=1)]
+
+            if m > 1 and (sweep + 1) % swap_interval == 0:
+                gaps = np.arange(swaps % 2, m - 1, 2)
+                swaps += 1
+                low = (np.arange(reads)[:, np.newaxis] * m + gaps).ravel()
+                high = low + 1
+                gap = np.tile(gaps, reads)
+                log_ratio = (betas[gap] - betas[gap + 1]) * (energy[low] - energy[high])
+                accepted = np.log(rng.random(len(low))) < log_ratio
+                np.add.at(attempts, gap, 1)
+                np.add.at(accepts, gap, accepted)
+                i, j = low[accepted], high[accepted]
+                x[np.concatenate((i, j))] = x[np.concatenate((j, i))]
+                field[np.concatenate((i, j))] = field[np.concatenate((j, i))]
+                energy[np.concatenate((i, j))] = energy[np.concatenate((j, i))]
+
+            if sweep + 1 <= tune_sweeps and (sweep + 1) % TUNE_ROUND == 0 and m > 2 and attempts.all():
+                betas = _retune(betas, accepts / attempts)
+                row_betas = np.tile(betas, reads)
+                attempts[:] = 0
+                accepts[:] = 0
+
+        acceptance = np.divide(accepts, attempts, out=np.full(m - 1, np.nan), where=attempts > 0)
+        return best_state.astype(np.int8), betas, acceptance
+
+
+# Ladders of a worker process, set once by _init_tempering_worker.
+_worker_ladders: Optional[_Ladders] = None
+
+
+def _init_tempering_worker(ladders: _Ladders) -> None:
+    global _worker_ladders
+    _worker_ladders = ladders
+
+
+def _run_in_worker(arguments: tuple) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return _worker_ladders.run(*arguments)
+
+
+class ParallelTemperingSampler(dimod.Sampler):
+    """Replica-exchange sampler; see the module comment.
+
+    info['beta_ladders'] holds the final ladder of each worker (one row per
+    worker, hottest first) and info['swap_acceptance'] the swap acceptance
+    of each gap after tuning.
+    """
+
+    parameters = {
+        'num_reads': [],
+        'num_sweeps': [],
+        'num_replicas': [],
+        'beta_range': [],
+        'swap_interval': [],
+        'tune_fraction': [],
+        'initial_states': [],
+        'seed': [],
+        'num_workers': [],
+    }
+
+    properties: dict = {}
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        num_reads: Optional[int] = None,
+        num_sweeps: int = 1000,
+        num_replicas: int = DEFAULT_REPLICAS,
+        beta_range: Optional[tuple[float, float]] = None,
+        swap_interval: int = 1,
+        tune_fraction: float = 0.25,
+        initial_states: Optional[dimod.typing.SamplesLike] = None,
+        seed: Optional[int] = None,
+        num_workers: int = 1,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Run num_reads ladders of num_replicas temperatures for num_sweeps.
+
+        num_reads defaults to the number of initial states, or 1; the
+        replicas of a read with an initial state all start from it.
+        tune_fraction=0 keeps the geometric ladder.
+        """
+
+        self.remove_unknown_kwargs(**kwargs)
+        if num_replicas < 1 or swap_interval < 1 or num_workers < 1:
+            raise ValueError('num_replicas, swap_interval and num_workers must be positive')
+        if not 0 <= tune_fraction <= 1:
+            raise ValueError('tune_fraction must be in [0, 1]')
+
+        model = SparseQUBO.from_bqm(bqm)
+        n = model.num_variables
+        supplied = np.empty((0, n), dtype=np.int64)
+        if initial_states is not None:
+            supplied = model.sample_matrix(initial_states).astype(np.int64)
+        if num_reads is None:
+            num_reads = max(1, len(supplied))
+        starts = np.full((num_reads, n), -1, dtype=np.int64)
+        starts[:min(num_reads, len(supplied))] = supplied[:num_reads]
+
+        hot, cold = default_beta_range(model) if beta_range is None else beta_range
+        betas = np.geomspace(hot, cold, num_replicas) if num_replicas > 1 else np.array([float(cold)])
+        tune_sweeps = int(tune_fraction * num_sweeps)
+
+        ladders = _Ladders(model)
+        seeds = np.random.SeedSequence(seed).generate_state(num_workers)
+        chunks = [
+            (betas, part, num_sweeps, swap_interval, tune_sweeps, int(chunk_seed))
+            for part, chunk_seed in zip(np.array_split(starts, num_workers), seeds)
+            if len(part)
+        ]
+        if len(chunks) == 1:
+            results = [ladders.run(*chunks[0])]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=len(chunks),
+                mp_context=multiprocessing.get_context(),
+                initializer=_init_tempering_worker,
+                initargs=(ladders,),
+            ) as executor:
+                results = list(executor.map(_run_in_worker, chunks))
+
+        samples = np.concatenate([states for states, _, _ in results])
+        if bqm.vartype is dimod.SPIN:
+            samples = 2 * samples - 1
+        info = {
+            'beta_ladders': np.array([ladder for _, ladder, _ in results]),
+            'swap_acceptance': np.array([acceptance for _, _, acceptance in results]),
+        }
+        return dimod.SampleSet.from_samples_bqm((samples, list(model.variables)), bqm, info=info)
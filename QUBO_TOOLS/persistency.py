@@ -0,0 +1,153 @@
+################################################################################
+# persistency.py
+#
+# Preprocessing that fixes the variables whose optimal value is provable,
+# before any sampler sees the model.
+#
+# The root node of branch_bound.py already finds such variables; here the
+# same persistencies are applied, up to a fixed point, to shrink a BQM:
+#
+#   - dominance: if h_i + sum_j min(0, J_ij) >= 0, x_i = 0 never raises the
+#     energy, and if h_i + sum_j max(0, J_ij) <= 0 neither does x_i = 1;
+#   - roof duality: the integral components of an optimal solution of the
+#     roof-dual LP hold in some optimal binary solution.
+#
+# Each round fixes variables without losing every optimum of the model left
+# by the previous ones, so the reduced BQM on the free variables has the same
+# minimum as the original and some optimal state of the original extends one
+# of the reduced model.  MVC with a large L, and circuits such as the half
+# adders of CIRCUITI with their inputs fixed, often reduce a lot; models
+# with a symmetry, like MaxCut (x and its complement have the same energy),
+# do not reduce at all.
+#
+# PersistencyComposite wraps any sampler: it samples only the reduced BQM and
+# returns samples of the original one, with the fixed values filled in.  The
+# model is handled as a dense matrix, as in branch_bound.py, so this is meant
+# for models up to a few thousand variables.
+################################################################################
+
+from __future__ import annotations
+
+import math
+
+import dimod
+import numpy as np
+
+from branch_bound import INTEGRALITY_TOLERANCE, dominance_fixings, restrict, roof_dual, simple_bound
+
+
+def persistencies(bqm: dimod.BinaryQuadraticModel, roof_duality: bool = True) -> tuple[float, dict]:
+    """Return (lower bound on the minimum energy, {variable: fixed value}).
+
+    Values are in the vartype of bqm.  roof_duality=False applies only the
+    dominance rule, which needs no LP.
+    """
+
+    variables = list(bqm.variables)
+    n = len(variables)
+    binary = bqm.change_vartype(dimod.BINARY, inplace=False)
+    linear, (rows, cols, biases), offset = binary.to_numpy_vectors(variables)
+    linear = linear.astype(float)
+    couplings = np.zeros((n, n))
+    np.add.at(couplings, (rows, cols), biases)
+    couplings = couplings + couplings.T
+
+    fixed = np.full(n, -1, dtype=np.int8)
+    lower_bound = -math.inf
+    while True:
+        model = restrict(linear, couplings, offset, fixed)
+        # Every restricted model has the minimum of the original one.
+        lower_bound = max(lower_bound, simple_bound(model))
+        zeros, ones = dominance_fixings(model)
+        if len(zeros) or len(ones):
+            fixed[model.free[zeros]] = 0
+            fixed[model.free[ones]] = 1
+            continue
+        if not roof_duality or not len(model.free):
+            break
+        bound, x = roof_dual(model)
+        lower_bound = max(lower_bound, bound)
+        at_zero = x <= INTEGRALITY_TOLERANCE
+        at_one = x >= 1 - INTEGRALITY_TOLERANCE
+        if not at_zero.any() and not at_one.any():
+            break
+        fixed[model.free[at_zero]] = 0
+        fixed[model.free[at_one]] = 1
+
+    values = fixed if bqm.vartype is dimod.BINARY else 2 * fixed - 1
+    return float(lower_bound), {variables[i]: int(values[i]) for i in np.flatnonzero(fixed >= 0)}
+
+
+class PersistencyComposite(dimod.ComposedSampler):
+    """Fix the persistent variables, sample the rest with the child sampler.
+
+    The returned SampleSet has every variable of the original BQM and the
+    child's info, plus:
+
+      'fixed_variables'  {variable: value} of the fixed variables;
+      'reduction_ratio'  the fraction of the variables that were fixed;
+      'lower_bound'      the best bound on the minimum energy met on the way.
+
+    When every variable is fixed the child is not called and the SampleSet
+    holds the one optimal state.
+    """
+
+    def __init__(self, child_sampler: dimod.Sampler) -> None:
+        self._children = [child_sampler]
+
+    @property
+    def children(self) -> list:
+        return self._children
+
+    @property
+    def parameters(self) -> dict:
+        parameters = dict(self.child.parameters)
+        parameters['roof_duality'] = []
+        return parameters
+
+    @property
+    def properties(self) -> dict:
+        return {'child_properties': self.child.properties.copy()}
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        roof_duality: bool = True,
+        **parameters,
+    ) -> dimod.SampleSet:
+        """Sample bqm; the other keyword arguments go to the child sampler."""
+
+        variables = list(bqm.variables)
+        lower_bound, fixed = persistencies(bqm, roof_duality)
+        reduced = bqm.copy()
+        reduced.fix_variables(fixed)
+
+        info: dict = {}
+        vectors: dict = {}
+        free: list = []
+        samples = np.empty((1, 0), dtype=np.int8)
+        if reduced.num_variables:
+            sampleset = self.child.sample(reduced, **parameters)
+            info.update(sampleset.info)
+            free = list(sampleset.variables)
+            samples = sampleset.record.sample
+            vectors = {
+                name: sampleset.record[name]
+                for name in sampleset.record.dtype.names
+                if name not in ('sample', 'energy')
+            }
+
+        expanded = np.empty((len(samples), len(variables)), dtype=samples.dtype)
+        expanded[:, :len(free)] = samples
+        expanded[:, len(free):] = [value for value in fixed.values()]
+        info.update({
+            'fixed_variables': fixed,
+            'reduction_ratio': len(fixed) / len(variables) if variables else 0.0,
+            'lower_bound': lower_bound,
+        })
+        return dimod.SampleSet.from_samples_bqm(
+            (expanded, free + list(fixed)),
+            bqm,
+            info=info,
+            **vectors,
+        )
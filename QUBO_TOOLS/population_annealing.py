@@ -0,0 +1,181 @@
+################################################################################
+# population_annealing.py
+#
+# Population annealing for BQMs, with free-energy and ground-state degeneracy
+# estimates.
+#
+# A population of population_size states starts uniformly at random, which
+# is the equilibrium at beta = 0, and is taken through an increasing schedule
+# of inverse temperatures.  At each step from beta to beta':
+#
+#   1. every state i is weighted by w_i = exp(-(beta' - beta) E_i), and
+#
+#        ln Z(beta') = ln Z(beta) + ln mean(w),   ln Z(0) = n ln 2;
+#
+#   2. the population is resampled in proportion to w (systematic
+#      resampling, so its size stays population_size);
+#   3. every state makes sweeps_per_step Metropolis sweeps at beta', the
+#      colour-class sweeps of parallel_tempering.MetropolisSweeps on the whole
+#      population matrix; with num_threads > 1 the rows are split among
+#      threads, since the states are independent between two resamplings.
+#
+# At the last beta the fraction rho_0 of the population in the lowest energy
+# E_0 estimates the Boltzmann probability g e^(-beta E_0) / Z of the ground
+# states, hence their number
+#
+#   g = rho_0 Z e^(beta E_0),
+#
+# which the lessons otherwise count by reading the whole ExactSolver table.
+# The estimate is reliable when E_0 is the true minimum and the last beta is
+# cold enough for the ground states to hold most of the population; the
+# number of distinct ground states in the population is a lower bound.
+################################################################################
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import dimod
+import numpy as np
+
+from parallel_tempering import MetropolisSweeps, default_beta_range
+from sparse_qubo import SparseQUBO
+
+
+# Default number of states of the population.
+DEFAULT_POPULATION = 1000
+
+# Default number of temperatures of the schedule.
+DEFAULT_STEPS = 100
+
+# Default Metropolis sweeps at each temperature.
+DEFAULT_SWEEPS_PER_STEP = 10
+
+
+class PopulationAnnealingSampler(dimod.Sampler):
+    """Population annealing with resampling; see the module comment.
+
+    The returned SampleSet is the final population, aggregated: num_occurrences
+    is the number of copies of each state.  info holds:
+
+      'beta_schedule'          the inverse temperatures;
+      'log_partition'          ln Z at each of them;
+      'free_energy'            -ln Z / beta at the last one;
+      'ground_energy'          E_0, the lowest energy in the final population;
+      'ground_degeneracy'      the estimate of the number of states at E_0;
+      'distinct_ground_states' the states at E_0 present in the population;
+      'families'               the initial states that still have descendants.
+    """
+
+    parameters = {
+        'population_size': [],
+        'num_steps': [],
+        'sweeps_per_step': [],
+        'beta_range': [],
+        'beta_schedule': [],
+        'seed': [],
+        'num_threads': [],
+    }
+
+    properties: dict = {}
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        population_size: int = DEFAULT_POPULATION,
+        num_steps: int = DEFAULT_STEPS,
+        sweeps_per_step: int = DEFAULT_SWEEPS_PER_STEP,
+        beta_range: Optional[tuple[float, float]] = None,
+        beta_schedule: Optional[np.ndarray] = None,
+        seed: Optional[int] = None,
+        num_threads: int = 1,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Anneal a population of population_size states.
+
+        The schedule is beta_schedule if given, otherwise num_steps betas
+        evenly spaced in beta_range (by default the range of
+        parallel_tempering.default_beta_range); it must be increasing.
+        """
+
+        self.remove_unknown_kwargs(**kwargs)
+        if population_size < 1 or sweeps_per_step < 0 or num_threads < 1:
+            raise ValueError('population_size and num_threads must be positive, sweeps_per_step not negative')
+
+        model = SparseQUBO.from_bqm(bqm)
+        n = model.num_variables
+        if beta_schedule is None:
+            hot, cold = default_beta_range(model) if beta_range is None else beta_range
+            beta_schedule = np.linspace(hot, cold, num_steps)
+        beta_schedule = np.asarray(beta_schedule, dtype=float)
+        if not len(beta_schedule) or beta_schedule[0] < 0 or (np.diff(beta_schedule) < 0).any():
+            raise ValueError('beta_schedule must be a nonempty increasing sequence of nonnegative betas')
+
+        sweeps = MetropolisSweeps(model)
+        sequence = np.random.SeedSequence(seed)
+        rng = np.random.default_rng(sequence)
+        thread_rngs = [np.random.default_rng(child) for child in sequence.spawn(num_threads)]
+        bounds = np.linspace(0, population_size, num_threads + 1).astype(int)
+
+        x = rng.integers(0, 2, (population_size, n)).astype(float)
+        field = model.local_fields(x)
+        energy = model.energies(x)
+        family = np.arange(population_size)
+        log_partition = []
+        log_z = n * math.log(2)
+        beta = 0.0
+
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            for next_beta in beta_schedule:
+                # Reweight: ln mean(exp(-d (E - E_min))) - d E_min, without overflow.
+                step = next_beta - beta
+                lowest = energy.min()
+                weights = np.exp(-step * (energy - lowest))
+                log_z += math.log(weights.mean()) - step * lowest
+                log_partition.append(log_z)
+                beta = next_beta
+
+                # Systematic resampling: one uniform offset, population_size
+                # evenly spaced positions on the cumulative weights.
+                cumulative = np.cumsum(weights)
+                positions = (rng.random() + np.arange(population_size)) * (cumulative[-1] / population_size)
+                chosen = np.minimum(np.searchsorted(cumulative, positions), population_size - 1)
+                x, field, energy, family = x[chosen], field[chosen], energy[chosen], family[chosen]
+
+                row_betas = np.full(population_size, beta)
+                for _ in range(sweeps_per_step):
+                    if num_threads == 1:
+                        sweeps.sweep(x, field, energy, row_betas, rng)
+                    else:
+                        # Row slices are views: each thread updates its rows in place.
+                        list(executor.map(
+                            lambda part: sweeps.sweep(
+                                x[bounds[part]:bounds[part + 1]],
+                                field[bounds[part]:bounds[part + 1]],
+                                energy[bounds[part]:bounds[part + 1]],
+                                row_betas[bounds[part]:bounds[part + 1]],
+                                thread_rngs[part],
+                            ),
+                            range(num_threads),
+                        ))
+
+        samples = x.astype(np.int8)
+        ground_energy = float(energy.min()) if population_size else math.nan
+        ground = np.isclose(energy, ground_energy, rtol=0.0, atol=1e-9 * max(1.0, abs(ground_energy)))
+        log_degeneracy = math.log(ground.mean()) + log_z + beta * ground_energy
+        info = {
+            'beta_schedule': beta_schedule,
+            'log_partition': np.array(log_partition),
+            'free_energy': -log_z / beta if beta > 0 else -math.inf,
+            'ground_energy': ground_energy,
+            'ground_degeneracy': math.exp(log_degeneracy),
+            'distinct_ground_states': len(np.unique(samples[ground], axis=0)),
+            'families': len(np.unique(family)),
+        }
+
+        if bqm.vartype is dimod.SPIN:
+            samples = 2 * samples - 1
+        sampleset = dimod.SampleSet.from_samples_bqm((samples, list(model.variables)), bqm, info=info)
+        return sampleset.aggregate()
@@ -0,0 +1,234 @@
+################################################################################
+# sparse_qubo.py
+#
+# QUBO stored in SciPy sparse arrays, for graph problems with many edges.
+#
+# The lessons build MVC, MaxCut and Max2SAT models as pyqubo expressions and
+# inspect samples one at a time.  That is clear for a handful of vertices and
+# unusable for graphs with 10^5-10^6 edges.  SparseQUBO keeps
+#
+#   E(x) = offset + h x + x' Q x,     Q strictly upper triangular (CSR),
+#
+# for binary x, so that:
+#
+#   - models are built from edge lists with array operations: self-loops
+#     fold into h because x_i^2 = x_i, and repeated edges are summed;
+#   - the energies of R samples, an R x n matrix X, are
+#     offset + X h + rowsum((X Q) * X), one sparse product per chunk of rows;
+#   - conversion to and from dimod.BinaryQuadraticModel goes through
+#     from_numpy_vectors() and to_numpy_vectors(), without Python loops over
+#     the terms.
+#
+# max_cut(), vertex_cover() and max2sat() build the lesson models from edges
+# and clauses.
+################################################################################
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional, Union
+
+import dimod
+import numpy as np
+from scipy import sparse
+
+
+# Entries of a sample chunk processed by one sparse product in energies().
+CHUNK_ENTRIES = 1 << 24
+
+
+@dataclass(frozen=True)
+class SparseQUBO:
+    """Binary quadratic model with a strictly upper-triangular CSR matrix.
+
+    labels[i] is the dimod label of variable i; by default the integers
+    0, ..., n - 1.
+    """
+
+    linear: np.ndarray
+    quadratic: sparse.csr_array
+    offset: float = 0.0
+    labels: Optional[tuple] = None
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.linear)
+
+    @property
+    def num_interactions(self) -> int:
+        return self.quadratic.nnz
+
+    @property
+    def variables(self) -> tuple:
+        return self.labels if self.labels is not None else tuple(range(self.num_variables))
+
+    @cached_property
+    def symmetric(self) -> sparse.csr_array:
+        """Q + Q': row i holds the couplings of variable i."""
+
+        return (self.quadratic + self.quadratic.T).tocsr()
+
+    @classmethod
+    def from_terms(
+        cls,
+        num_variables: int,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        biases: Union[float, np.ndarray],
+        linear: Optional[np.ndarray] = None,
+        offset: float = 0.0,
+        labels: Optional[tuple] = None,
+    ) -> 'SparseQUBO':
+        """Build the model offset + h x + sum_k biases[k] x_rows[k] x_cols[k]."""
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        biases = np.broadcast_to(np.asarray(biases, dtype=float), rows.shape)
+        h = np.zeros(num_variables) if linear is None else np.array(linear, dtype=float)
+
+        loops = rows == cols
+        np.add.at(h, rows[loops], biases[loops])
+        rows, cols, biases = rows[~loops], cols[~loops], biases[~loops]
+        quadratic = sparse.csr_array(
+            (biases, (np.minimum(rows, cols), np.maximum(rows, cols))),
+            shape=(num_variables, num_variables),
+        )
+        quadratic.sum_duplicates()
+        quadratic.eliminate_zeros()
+        return cls(h, quadratic, float(offset), labels)
+
+    @classmethod
+    def from_edges(
+        cls,
+        num_variables: int,
+        edges: np.ndarray,
+        weights: Union[float, np.ndarray] = 1.0,
+        linear: Optional[np.ndarray] = None,
+        offset: float = 0.0,
+        labels: Optional[tuple] = None,
+    ) -> 'SparseQUBO':
+        """Build the model with coupling weights[k] on edge edges[k] = (i, j)."""
+
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        return cls.from_terms(num_variables, edges[:, 0], edges[:, 1], weights, linear, offset, labels)
+
+    @classmethod
+    def from_bqm(cls, bqm: dimod.BinaryQuadraticModel) -> 'SparseQUBO':
+        """Convert a BQM; SPIN models are converted to their binary form."""
+
+        if bqm.vartype is not dimod.BINARY:
+            bqm = bqm.change_vartype(dimod.BINARY, inplace=False)
+        labels = tuple(bqm.variables)
+        linear, (rows, cols, biases), offset = bqm.to_numpy_vectors(labels)
+        return cls.from_terms(len(labels), rows, cols, biases, linear, offset, labels)
+
+    def to_bqm(self, vartype: dimod.Vartype = dimod.BINARY) -> dimod.BinaryQuadraticModel:
+        """Return the model as a dimod BQM, with the requested vartype."""
+
+        coo = self.quadratic.tocoo()
+        bqm = dimod.BinaryQuadraticModel.from_numpy_vectors(
+            self.linear,
+            (coo.row, coo.col, coo.data),
+            self.offset,
+            dimod.BINARY,
+            variable_order=list(self.variables),
+        )
+        if vartype is not dimod.BINARY:
+            bqm.change_vartype(vartype, inplace=True)
+        return bqm
+
+    def sample_matrix(self, sampleset: Union[dimod.SampleSet, dimod.typing.SamplesLike]) -> np.ndarray:
+        """Binary R x n matrix of the samples, columns in variable order."""
+
+        samples, variables = dimod.as_samples(sampleset)
+        if tuple(variables) != self.variables:
+            position = {v: i for i, v in enumerate(variables)}
+            samples = samples[:, [position[v] for v in self.variables]]
+        if samples.min(initial=0) < 0:
+            samples = (samples + 1) // 2
+        return samples
+
+    def energies(self, samples: np.ndarray) -> np.ndarray:
+        """Energies of the rows of a binary R x n matrix (or of one vector)."""
+
+        samples = np.asarray(samples)
+        single = samples.ndim == 1
+        samples = np.atleast_2d(samples)
+        result = np.empty(len(samples))
+        step = max(1, CHUNK_ENTRIES // max(1, self.num_variables))
+        for start in range(0, len(samples), step):
+            chunk = samples[start:start + step].astype(float)
+            coupled = np.asarray(chunk @ self.quadratic)
+            result[start:start + step] = self.offset + chunk @ self.linear + (coupled * chunk).sum(axis=1)
+        return result[0] if single else result
+
+    def local_fields(self, samples: np.ndarray) -> np.ndarray:
+        """h_i + sum_j (Q + Q')_ij x_j for every row of samples.
+
+        Flipping x_i changes the energy by (1 - 2 x_i) times this field.
+        """
+
+        samples = np.atleast_2d(np.asarray(samples, dtype=float))
+        return self.linear + np.asarray(samples @ self.symmetric)
+
+
+################################################################################
+# Graph models of the lessons.
+################################################################################
+def max_cut(num_vertices: int, edges: np.ndarray, weights: Union[float, np.ndarray] = 1.0) -> SparseQUBO:
+    """MaxCut: minimize -sum_(i,j) w_ij (x_i + x_j - 2 x_i x_j).
+
+    The energy of a state is minus the weight of its cut.
+    """
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    weights = np.broadcast_to(np.asarray(weights, dtype=float), len(edges))
+    linear = np.zeros(num_vertices)
+    np.add.at(linear, edges[:, 0], -weights)
+    np.add.at(linear, edges[:, 1], -weights)
+    return SparseQUBO.from_edges(num_vertices, edges, 2 * weights, linear)
+
+
+def vertex_cover(num_vertices: int, edges: np.ndarray, penalty: float = 2.0) -> SparseQUBO:
+    """Minimum vertex cover: sum_i x_i + P sum_(i,j) (1 - x_i - x_j + x_i x_j).
+
+    penalty > 1 makes every minimum a vertex cover, as in the MVC lessons.
+    """
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    linear = np.ones(num_vertices)
+    np.add.at(linear, edges[:, 0], -penalty)
+    np.add.at(linear, edges[:, 1], -penalty)
+    return SparseQUBO.from_edges(num_vertices, edges, penalty, linear, offset=penalty * len(edges))
+
+
+def max2sat(num_variables: int, clauses: np.ndarray) -> SparseQUBO:
+    """Max 2-SAT: the energy of a state is the number of clauses it violates.
+
+    clauses is a C x 2 array of DIMACS literals: k stands for x_(k-1) and -k
+    for its negation.  A clause (a or b) is violated exactly when both
+    literals are false, i.e. its penalty is false(a) false(b), where
+    false(x) = 1 - x and false(not x) = x.
+    """
+
+    clauses = np.asarray(clauses, dtype=np.int64).reshape(-1, 2)
+    if (clauses == 0).any() or (np.abs(clauses) > num_variables).any():
+        raise ValueError('literals must be +-1, ..., +-num_variables')
+    index = np.abs(clauses) - 1
+    negated = clauses < 0
+    # false(literal) = alpha + beta x.
+    alpha = (~negated).astype(float)
+    beta = np.where(negated, 1.0, -1.0)
+
+    linear = np.zeros(num_variables)
+    np.add.at(linear, index[:, 0], beta[:, 0] * alpha[:, 1])
+    np.add.at(linear, index[:, 1], alpha[:, 0] * beta[:, 1])
+    return SparseQUBO.from_terms(
+        num_variables,
+        index[:, 0],
+        index[:, 1],
+        beta[:, 0] * beta[:, 1],
+        linear,
+        offset=float((alpha[:, 0] * alpha[:, 1]).sum()),
+    )
@@ -0,0 +1,213 @@
+################################################################################
+# tabu_search.py
+#
+# One-flip tabu search for BQMs, with the interface of dwave-samplers'
+# TabuSampler (num_reads, tenure, timeout in milliseconds, num_restarts,
+# energy_threshold, initial_states, seed).
+#
+# The search keeps, for the current binary state x, the vector of flip gains
+#
+#   delta_i = (1 - 2 x_i) (h_i + sum_j J_ij x_j),
+#
+# the energy change of flipping x_i.  A move flips the variable with the
+# smallest delta that is not tabu, or a tabu one when it leads below the best
+# energy found (aspiration); the flipped variable stays tabu for `tenure`
+# moves.  Flipping x_k changes delta_k into -delta_k and, for every neighbour
+# j of k, adds (1 - 2 x_j) (1 - 2 x_k) J_jk (with x_k before the flip) to
+# delta_j, so a move costs O(degree of k) plus one argmin over n entries.
+# J is a dense array for dense models, like the SiSi number-partitioning
+# QUBO, and CSR rows otherwise.
+#
+# When stall_limit moves in a row do not improve the best energy of the
+# current restart, the search restarts, alternately from the best state of the
+# read with a random tenth of its variables flipped (intensification) and from
+# a random state (diversification).  A read ends when timeout expires,
+# after num_restarts restarts, or when energy_threshold is reached.
+################################################################################
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Optional
+
+import dimod
+import numpy as np
+
+from sparse_qubo import SparseQUBO
+
+
+# Default search time of one read, in milliseconds (as TabuSampler).
+DEFAULT_TIMEOUT = 100
+
+# Above this fraction of nonzero couplings J is stored as a dense array.
+DENSE_FRACTION = 0.1
+
+# Moves without improvement before a restart: max(STALL_MIN, STALL_FACTOR n).
+STALL_MIN = 100
+STALL_FACTOR = 10
+
+# Fraction of the variables flipped at random by a restart.
+PERTURBATION = 0.1
+
+
+class TabuSampler(dimod.Sampler):
+    """One-flip tabu search with an incremental gain vector.
+
+    See the module comment for the algorithm.
+    """
+
+    parameters = {
+        'num_reads': [],
+        'tenure': [],
+        'timeout': [],
+        'num_restarts': [],
+        'energy_threshold': [],
+        'initial_states': [],
+        'seed': [],
+        'stall_limit': [],
+    }
+
+    properties: dict = {}
+
+    def sample(
+        self,
+        bqm: dimod.BinaryQuadraticModel,
+        num_reads: Optional[int] = None,
+        tenure: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        num_restarts: int = 1_000_000,
+        energy_threshold: Optional[float] = None,
+        initial_states: Optional[dimod.typing.SamplesLike] = None,
+        seed: Optional[int] = None,
+        stall_limit: Optional[int] = None,
+        **kwargs,
+    ) -> dimod.SampleSet:
+        """Return the best state of each of num_reads independent searches.
+
+        num_reads defaults to the number of initial states, or 1; reads
+        without an initial state start from a random one.  tenure defaults
+        to min(n // 4, max(20, n // 10)): TabuSampler's min(20, n // 4) cycles
+        on the plateaus of sparse models with a few hundred variables.
+        """
+
+        self.remove_unknown_kwargs(**kwargs)
+        model = SparseQUBO.from_bqm(bqm)
+        n = model.num_variables
+        rng = np.random.default_rng(seed)
+
+        starts = np.empty((0, n), dtype=np.int8)
+        if initial_states is not None:
+            starts = model.sample_matrix(initial_states).astype(np.int8)
+        if num_reads is None:
+            num_reads = max(1, len(starts))
+        if tenure is None:
+            tenure = min(n // 4, max(20, n // 10))
+        if not 0 <= tenure < max(n, 1):
+            raise ValueError('tenure must be in [0, number of variables)')
+        if stall_limit is None:
+            stall_limit = max(STALL_MIN, STALL_FACTOR * n)
+
+        symmetric = model.symmetric
+        dense = symmetric.toarray() if symmetric.nnz > DENSE_FRACTION * n * n else None
+
+        samples = np.empty((num_reads, n), dtype=np.int8)
+        moves = 0
+        for read in range(num_reads):
+            if read < len(starts):
+                state = starts[read].copy()
+            else:
+                state = rng.integers(0, 2, n, dtype=np.int8)
+            samples[read], read_moves = _search(
+                model, dense, state, tenure, timeout / 1000, num_restarts, energy_threshold, stall_limit, rng
+            )
+            moves += read_moves
+
+        if bqm.vartype is dimod.SPIN:
+            samples = 2 * samples - 1
+        return dimod.SampleSet.from_samples_bqm((samples, list(model.variables)), bqm, info={'moves': moves})
+
+
+def _search(
+    model: SparseQUBO,
+    dense: Optional[np.ndarray],
+    state: np.ndarray,
+    tenure: int,
+    seconds: float,
+    num_restarts: int,
+    energy_threshold: Optional[float],
+    stall_limit: int,
+    rng: np.random.Generator,
+) -> tuple[np.ndarray, int]:
+    """One read: return its best state and the number of moves made."""
+
+    n = model.num_variables
+    if not n:
+        return state, 0
+    deadline = time.perf_counter() + seconds
+    indptr, indices, data = model.symmetric.indptr, model.symmetric.indices, model.symmetric.data
+    threshold = -math.inf if energy_threshold is None else energy_threshold
+
+    x = state.astype(float)
+    spin = 1 - 2 * x
+    delta = spin * model.local_fields(x)[0]
+    energy = float(model.energies(x))
+    best_state, best_energy = x.copy(), energy
+    tabu_until = np.zeros(n, dtype=np.int64)
+    restart_best = energy
+    stall = 0
+    restarts = 0
+    move = 0
+
+    while best_energy > threshold:
+        move += 1
+        allowed = np.where(tabu_until < move, delta, math.inf)
+        candidate = int(np.argmin(delta))
+        if energy + delta[candidate] < best_energy - 1e-9 or allowed.min() == math.inf:
+            k = candidate
+        else:
+            # Ties are broken at random, or plateaus make the search cycle.
+            ties = np.flatnonzero(allowed <= allowed.min() + 1e-12)
+            k = int(ties[rng.integers(len(ties))]) if len(ties) > 1 else int(ties[0])
+
+        # Flip x_k and update the gains of k and of its neighbours.
+        if dense is not None:
+            delta += spin * spin[k] * dense[k]
+        else:
+            row = indices[indptr[k]:indptr[k + 1]]
+            delta[row] += spin[row] * spin[k] * data[indptr[k]:indptr[k + 1]]
+        energy += delta[k]
+        delta[k] = -delta[k]
+        x[k] = 1 - x[k]
+        spin[k] = -spin[k]
+        tabu_until[k] = move + tenure
+
+        if energy < restart_best - 1e-9:
+            restart_best = energy
+            stall = 0
+            if energy < best_energy - 1e-9:
+                best_state, best_energy = x.copy(), energy
+        else:
+            stall += 1
+
+        if stall >= stall_limit:
+            restarts += 1
+            if restarts > num_restarts:
+                break
+            if restarts % 2:
+                x = best_state.copy()
+                flips = rng.random(n) < PERTURBATION
+                x[flips] = 1 - x[flips]
+            else:
+                x = rng.integers(0, 2, n).astype(float)
+            spin = 1 - 2 * x
+            delta = spin * model.local_fields(x)[0]
+            energy = float(model.energies(x))
+            tabu_until[:] = 0
+            restart_best = energy
+            stall = 0
+
+        if time.perf_counter() >= deadline:
+            break
+
+    return best_state.astype(np.int8), move